@@ -166,9 +166,8 @@ export async function exportOrderJSONToFile(params) {
     // 1. JSON-Daten erzeugen (wie in deinem Originalcode)
     const jsonData = generateOrderJSON(params);
     const jsonString = JSON.stringify(jsonData, null, 2);
-    window.location.href = 'http://localhost:5000/api/ladebalken';
 
-    // 2. Daten per POST an den Server senden
+    // 2. Daten per POST an den Server senden; die Optimierung läuft dort als Hintergrund-Job
     const response = await fetch('http://localhost:5000/api/optimize', {
       method: 'POST',
       headers: {
@@ -177,7 +176,15 @@ export async function exportOrderJSONToFile(params) {
       body: jsonString,
     });
 
-    console.log(response)
+    if (!response.ok) {
+      const fehler = await response.json();
+      alert(`Optimierung konnte nicht gestartet werden: ${fehler.error}`);
+      return;
+    }
+
+    // 3. Zur Ladeseite weiterleiten, die den Fortschritt des Jobs abfragt
+    const { job_id } = await response.json();
+    window.location.href = `http://localhost:5000/api/ladebalken?job=${encodeURIComponent(job_id)}`;
 
   } catch (error) {
     // Falls ein Netzwerkfehler auftritt (z.B. keine Verbindung)
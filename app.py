@@ -1,7 +1,15 @@
 import json
+import os
+import sys
 
+# Die Optimierung (backend/src) nutzt Skript-Importe wie "from pipeline import ..."
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend", "src"))
+
+from backend_connector.job_manager import JobManager
 from backend_connector.pdf_generator import generate_packing_list_pdf
-from flask import Flask, request, jsonify, send_file, redirect, url_for, render_template
+from backend_connector.result_store import ResultStore
+from pipeline import warmup_kernels
+from flask import Flask, Response, request, jsonify, send_file, redirect, url_for, render_template, stream_with_context
 from flask_cors import CORS
 
 ######### from my_optimizer import optimize_loading
@@ -13,6 +21,15 @@ app = Flask(__name__)
 
 CORS(app)
 
+# Fertige Ladepläne, adressiert über den Hash der Bestellung
+results = ResultStore(os.path.join(os.path.dirname(os.path.abspath(__file__)), "results"))
+
+# Hintergrund-Jobs für /api/optimize
+jobs = JobManager(results, pipeline_kwargs={"multi_container": True})
+
+# 3D-Ansicht (frontend_3D)
+VIEWER_URL = "http://localhost:3000"
+
 # Definiere die API-Endpunkte (Routen)
 
 @app.route('/')
@@ -22,29 +39,67 @@ def index():
 @app.route('/api/optimize', methods=['POST'])
 def optimize_route():
     """
-    Dieser Endpunkt nimmt die initialen JSON-Daten vom Frontend entgegen,
-    führt den Optimierungsalgorithmus aus und gibt das Ergebnis zurück.
+    Nimmt die Bestell-JSON vom Frontend entgegen und startet die Optimierung als
+    Hintergrund-Job. Antwortet sofort mit der Job-ID; den Fortschritt liefert
+    /api/optimize/<job_id>, den fertigen Ladeplan /api/optimize/<job_id>/result
+    bzw. /api/plans/<plan_id>.
     """
     if not request.is_json:
         return jsonify({"error": "Anfrage muss JSON-Daten enthalten"}), 400
 
     initial_data = request.get_json()
-
-    # Rufe deine Logik auf
-    #optimized_data = run_optimization_algorithm(initial_data)
-    optimized_data = initial_data
-
-    
-    print()
-    if optimized_data is None:
-        return jsonify({"error": "Bei der Optimierung ist ein Fehler aufgetreten"}), 500
-        
-        # JSON-Datei lokal speichern
-    with open('optimized_output.json', 'w', encoding='utf-8') as f:
-        json.dump(optimized_data, f, ensure_ascii=False, indent=4)
-
-    # Optional: nur Bestätigung zurücksenden
-    return {"status": "gespeichert"}, 200
+    if not isinstance(initial_data, dict) or "order" not in initial_data:
+        return jsonify({"error": "JSON muss ein 'order'-Objekt enthalten"}), 400
+
+    job_id = jobs.submit(initial_data)
+    return jsonify({
+        "job_id": job_id,
+        "status_url": url_for('optimize_status_route', job_id=job_id),
+        "result_url": url_for('optimize_result_route', job_id=job_id),
+    }), 202
+
+@app.route('/api/optimize/<job_id>')
+def optimize_status_route(job_id):
+    """Phase, Fortschritt (0..1), beste Kosten und geschätzte Restzeit eines Jobs."""
+    status = jobs.status(job_id)
+    if status is None:
+        return jsonify({"error": f"Unbekannter Job '{job_id}'"}), 404
+    return jsonify(status)
+
+@app.route('/api/optimize/<job_id>/result')
+def optimize_result_route(job_id):
+    status = jobs.status(job_id)
+    if status is None:
+        return jsonify({"error": f"Unbekannter Job '{job_id}'"}), 404
+    if status["state"] != "done":
+        return jsonify({"error": "Job ist noch nicht fertig", "state": status["state"]}), 409
+    return plan_route(status["plan_id"])
+
+@app.route('/api/plans/<plan_id>')
+def plan_route(plan_id):
+    """Gespeicherter Ladeplan als kompaktes JSON; mit If-None-Match und passendem ETag 304."""
+    eintrag = results.lade(plan_id)
+    if eintrag is None:
+        return jsonify({"error": f"Unbekannter Plan '{plan_id}'"}), 404
+    daten, etag = eintrag
+    response = Response(daten, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+@app.route('/api/optimize/<job_id>/stream')
+def optimize_stream_route(job_id):
+    """
+    Server-Sent Events mit den Zwischenständen eines Jobs: Phase, Stapelinhalte und
+    gedrosselte Layout-Deltas (neu platzierte/verschobene Stapel), zuletzt 'done'.
+    """
+    stream = jobs.stream(job_id)
+    if stream is None:
+        return jsonify({"error": f"Unbekannter Job '{job_id}'"}), 404
+    return Response(
+        stream_with_context(stream.events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
 
 @app.route('/api/ladebalken')
 def routeToLadebalken():
@@ -52,12 +107,28 @@ def routeToLadebalken():
     # Gibt ladebalken.html aus dem templates-Ordner zurück
     return send_file('./backend_connector/ladebalken.html')
 
-@app.route('/api/generate-pdf', methods=['POST'])
+@app.route('/api/generate-pdf', methods=['GET', 'POST'])
 def generate_pdf_route():
-    if not request.is_json:
-        return jsonify({"error": "Anfrage muss JSON-Daten enthalten"}), 400
-        
-    optimized_data = request.get_json()
+    """
+    PDF-Ladeliste. GET ?plan_id=... nutzt einen gespeicherten Plan (mit ETag, ein
+    wiederholter Abruf erzeugt das PDF nicht neu); POST nimmt den Plan weiterhin als JSON.
+    """
+    etag = None
+    if request.method == 'GET':
+        plan_id = request.args.get('plan_id')
+        eintrag = results.lade(plan_id) if plan_id else None
+        if eintrag is None:
+            return jsonify({"error": f"Unbekannter Plan '{plan_id}'"}), 404
+        etag = eintrag[1]
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+        optimized_data = json.loads(eintrag[0])
+    else:
+        if not request.is_json:
+            return jsonify({"error": "Anfrage muss JSON-Daten enthalten"}), 400
+        optimized_data = request.get_json()
     
     pdf_buffer = generate_packing_list_pdf(optimized_data)
     
@@ -66,25 +137,41 @@ def generate_pdf_route():
     
     order_id = optimized_data.get("order", {}).get("order_id", "plan")
     
-    return send_file(
+    response = send_file(
         pdf_buffer,
         as_attachment=True,
         download_name=f'ladeplan_{order_id}.pdf',
         mimetype='application/pdf'
     )
+    if etag is not None:
+        response.set_etag(etag)
+    return response
 
 # Endpunkt, der die Umleitung durchführt
-# Z. B. /api/3d-view?order_id=ORD-123&container_id=C1-40HC-01.
+# Z. B. /api/3d-view?order_id=ORD-123&container_id=C1-40HC-01 oder /api/3d-view?plan_id=<plan_id>.
+# Mit plan_id führt die Umleitung zur Bestellung des Plans; ?plan= nennt dazu /api/plans/<plan_id>.
 @app.route('/api/3d-view')
 def routeTo3d():
     order_id_param = request.args.get('order_id')
-    full_redirect_url = f"http://localhost:3000/{order_id_param}"
+    plan_id = request.args.get('plan_id')
+    
+    if plan_id:
+        plan = results.lade_plan(plan_id)
+        if plan is None:
+            return jsonify({"error": f"Unbekannter Plan '{plan_id}'"}), 404
+        order_id = plan.get("order", {}).get("order_id", "")
+        return redirect(f"{VIEWER_URL}/{order_id}?plan={url_for('plan_route', plan_id=plan_id)}")
     
     if not order_id_param:
-        return jsonify({"error": "Fehlende Parameter 'order_id' oder 'container_id'"}), 400
+        return jsonify({"error": "Fehlende Parameter 'order_id' oder 'plan_id'"}), 400
     
-    return redirect(url_for(full_redirect_url))
+    return redirect(f"{VIEWER_URL}/{order_id_param}")
 
 if __name__ == '__main__':
-    app.run(host='localhost', port=5000, debug=True)
+    debug = True
+    # Numba-Kernel vor der ersten Anfrage laden (beim allerersten Start: kompilieren). Mit
+    # Reloader läuft der Server im Kindprozess (WERKZEUG_RUN_MAIN); der Elternprozess überspringt das.
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        warmup_kernels()
+    app.run(host='localhost', port=5000, debug=debug)
     
@@ -7,7 +7,10 @@ import numpy as np
 import json
 import os
 import multiprocessing
-from numba import jit
+import multiprocessing.util
+from collections import namedtuple
+from multiprocessing import shared_memory
+from numba import jit, objmode
 
 # --- WICHTIG: Importieren Sie Ihren Parser ---
 from order_parser import OrderParser
@@ -31,7 +34,7 @@ GEOM_CIRCLE = 1
 
 # -------------------- JIT-KOMPILIERTE KERNFUNKTIONEN --------------------
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def overlap_rect_rect_jit(r1_x, r1_y, r1_w_bb, r1_h_bb, r2_x, r2_y, r2_w_bb, r2_h_bb):
     """Prüft Überlappung von zwei Rechtecken (Zentrum-Koordinaten)."""
     return not (r1_x + r1_w_bb/2 <= r2_x - r2_w_bb/2 or
@@ -39,14 +42,14 @@ def overlap_rect_rect_jit(r1_x, r1_y, r1_w_bb, r1_h_bb, r2_x, r2_y, r2_w_bb, r2_
                 r1_y + r1_h_bb/2 <= r2_y - r2_h_bb/2 or
                 r1_y - r1_h_bb/2 >= r2_y + r2_h_bb/2)
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def overlap_circle_circle_jit(c1_x, c1_y, c1_r, c2_x, c2_y, c2_r):
     """Prüft Überlappung von zwei Kreisen."""
     dist_sq = (c1_x - c2_x)**2 + (c1_y - c2_y)**2
     radius_sum_sq = (c1_r + c2_r)**2
     return dist_sq < radius_sum_sq
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def overlap_rect_circle_jit(r_x, r_y, r_w_bb, r_h_bb, c_x, c_y, c_r):
     """Prüft Überlappung von Rechteck und Kreis."""
     half_w = r_w_bb / 2
@@ -60,41 +63,168 @@ def overlap_rect_circle_jit(r_x, r_y, r_w_bb, r_h_bb, c_x, c_y, c_r):
     return dist_sq < radius_sq
 
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
+def overlap_items_jit(item, other):
+    """Prüft Überlappung zweier Items (Zeilen der Konfiguration), unabhängig von der Geometrie."""
+    item_type = int(item[IDX_GEOM_TYPE])
+    other_type = int(other[IDX_GEOM_TYPE])
+    if item_type == GEOM_RECT and other_type == GEOM_RECT:
+        return overlap_rect_rect_jit(
+            item[IDX_X], item[IDX_Y], item[IDX_W], item[IDX_H],
+            other[IDX_X], other[IDX_Y], other[IDX_W], other[IDX_H]
+        )
+    elif item_type == GEOM_CIRCLE and other_type == GEOM_CIRCLE:
+        return overlap_circle_circle_jit(
+            item[IDX_X], item[IDX_Y], item[IDX_RADIUS],
+            other[IDX_X], other[IDX_Y], other[IDX_RADIUS]
+        )
+    elif item_type == GEOM_RECT and other_type == GEOM_CIRCLE:
+        return overlap_rect_circle_jit(
+            item[IDX_X], item[IDX_Y], item[IDX_W], item[IDX_H],
+            other[IDX_X], other[IDX_Y], other[IDX_RADIUS]
+        )
+    elif item_type == GEOM_CIRCLE and other_type == GEOM_RECT:
+        return overlap_rect_circle_jit(
+            other[IDX_X], other[IDX_Y], other[IDX_W], other[IDX_H],
+            item[IDX_X], item[IDX_Y], item[IDX_RADIUS]
+        )
+    return False
+
+@jit(nopython=True, cache=True)
 def check_overlap_jit(item, config, item_index):
     """
     Prüft, ob 'item' irgendein anderes Item in 'config' überlappt.
-    Wählt die korrekte Geometrie-Prüffunktion aus.
+    Lineare Referenzprüfung ohne Gitter (O(n)).
     """
-    item_type = int(item[IDX_GEOM_TYPE])
     for j in range(config.shape[0]):
         if j == item_index: continue
-        other = config[j]
-        other_type = int(other[IDX_GEOM_TYPE])
-
-        if item_type == GEOM_RECT and other_type == GEOM_RECT:
-            if overlap_rect_rect_jit(
-                item[IDX_X], item[IDX_Y], item[IDX_W], item[IDX_H],
-                other[IDX_X], other[IDX_Y], other[IDX_W], other[IDX_H]
-            ): return True
-        elif item_type == GEOM_CIRCLE and other_type == GEOM_CIRCLE:
-            if overlap_circle_circle_jit(
-                item[IDX_X], item[IDX_Y], item[IDX_RADIUS],
-                other[IDX_X], other[IDX_Y], other[IDX_RADIUS]
-            ): return True
-        elif item_type == GEOM_RECT and other_type == GEOM_CIRCLE:
-            if overlap_rect_circle_jit(
-                item[IDX_X], item[IDX_Y], item[IDX_W], item[IDX_H],
-                other[IDX_X], other[IDX_Y], other[IDX_RADIUS]
-            ): return True
-        elif item_type == GEOM_CIRCLE and other_type == GEOM_RECT:
-            if overlap_rect_circle_jit(
-                other[IDX_X], other[IDX_Y], other[IDX_W], other[IDX_H],
-                item[IDX_X], item[IDX_Y], item[IDX_RADIUS]
-            ): return True
+        if overlap_items_jit(item, config[j]): return True
+    return False
+
+
+# -------------------- RÄUMLICHES GITTER (BROAD PHASE) --------------------
+# Uniformes Gitter über AREA_W x AREA_H. Jede Zelle hält eine doppelt verkettete
+# Liste der Items, deren Bounding Box sie berührt. Jedes Item besitzt einen festen
+# Block von Listeneinträgen (groß genug für beide Ausrichtungen), daher sind
+# Einfügen und Entfernen ohne Speicherverwaltung in O(Zellen des Items) möglich.
+
+SpatialGrid = namedtuple("SpatialGrid", [
+    "cell_size", "nx", "ny",
+    "cell_head",                              # Erster Eintrag je Zelle (-1 = leer)
+    "entry_next", "entry_prev", "entry_cell", "entry_item",
+    "item_offset", "item_used",               # Eintragsblock je Item
+    "item_mark", "stamp",                     # Besuchsmarken gegen Doppelprüfung
+])
+
+GRID_MAX_CELLS_PER_ITEM = 4  # Untergrenze der Zellgröße: ca. 4 Zellen pro Item
+
+@jit(nopython=True, cache=True)
+def _grid_cell_range_jit(grid, x, y, w_bb, h_bb):
+    """Gibt den (geklemmten) Zellbereich (cx0, cx1, cy0, cy1) einer Bounding Box zurück."""
+    cx0 = int(math.floor((x - w_bb / 2) / grid.cell_size))
+    cx1 = int(math.floor((x + w_bb / 2) / grid.cell_size))
+    cy0 = int(math.floor((y - h_bb / 2) / grid.cell_size))
+    cy1 = int(math.floor((y + h_bb / 2) / grid.cell_size))
+    cx0 = min(max(cx0, 0), grid.nx - 1); cx1 = min(max(cx1, 0), grid.nx - 1)
+    cy0 = min(max(cy0, 0), grid.ny - 1); cy1 = min(max(cy1, 0), grid.ny - 1)
+    return cx0, cx1, cy0, cy1
+
+@jit(nopython=True, cache=True)
+def grid_insert_item_jit(grid, config, i):
+    """Trägt Item 'i' in alle Zellen ein, die seine Bounding Box berührt."""
+    it = config[i]
+    cx0, cx1, cy0, cy1 = _grid_cell_range_jit(grid, it[IDX_X], it[IDX_Y], it[IDX_W], it[IDX_H])
+    e = grid.item_offset[i]
+    for cy in range(cy0, cy1 + 1):
+        for cx in range(cx0, cx1 + 1):
+            cell = cy * grid.nx + cx
+            head = grid.cell_head[cell]
+            grid.entry_cell[e] = cell
+            grid.entry_item[e] = i
+            grid.entry_prev[e] = -1
+            grid.entry_next[e] = head
+            if head != -1:
+                grid.entry_prev[head] = e
+            grid.cell_head[cell] = e
+            e += 1
+    grid.item_used[i] = e - grid.item_offset[i]
+
+@jit(nopython=True, cache=True)
+def grid_remove_item_jit(grid, i):
+    """Entfernt Item 'i' aus allen Zellen (O(1) je Zelle)."""
+    start = grid.item_offset[i]
+    for e in range(start, start + grid.item_used[i]):
+        prev = grid.entry_prev[e]; nxt = grid.entry_next[e]
+        if prev != -1:
+            grid.entry_next[prev] = nxt
+        else:
+            grid.cell_head[grid.entry_cell[e]] = nxt
+        if nxt != -1:
+            grid.entry_prev[nxt] = prev
+    grid.item_used[i] = 0
+
+@jit(nopython=True, cache=True)
+def grid_update_item_jit(grid, config, i):
+    """Synchronisiert das Gitter nach Verschieben, Tauschen oder Rotieren von Item 'i'."""
+    grid_remove_item_jit(grid, i)
+    grid_insert_item_jit(grid, config, i)
+
+@jit(nopython=True, cache=True)
+def grid_insert_all_jit(grid, config):
+    for i in range(config.shape[0]):
+        grid_insert_item_jit(grid, config, i)
+
+@jit(nopython=True, cache=True)
+def check_overlap_grid_jit(item, config, item_index, grid):
+    """
+    Wie check_overlap_jit, prüft aber nur Items aus den Zellen, die 'item' berührt.
+    'grid' muss den aktuellen Stand von 'config' abbilden.
+    """
+    grid.stamp[0] += 1
+    stamp = grid.stamp[0]
+    cx0, cx1, cy0, cy1 = _grid_cell_range_jit(grid, item[IDX_X], item[IDX_Y], item[IDX_W], item[IDX_H])
+    for cy in range(cy0, cy1 + 1):
+        for cx in range(cx0, cx1 + 1):
+            e = grid.cell_head[cy * grid.nx + cx]
+            while e != -1:
+                j = grid.entry_item[e]
+                e = grid.entry_next[e]
+                if j == item_index or grid.item_mark[j] == stamp: continue
+                grid.item_mark[j] = stamp
+                if overlap_items_jit(item, config[j]): return True
     return False
 
-@jit(nopython=True)
+def create_spatial_grid(config, AREA_W, AREA_H, cell_size=None):
+    """
+    Baut das Gitter für 'config' auf. Ohne 'cell_size' wird die mittlere
+    Item-Kantenlänge verwendet (nach unten begrenzt, damit das Gitter klein bleibt).
+    """
+    n = config.shape[0]
+    dims = np.maximum(config[:, IDX_W_ORIG], config[:, IDX_H_ORIG]) if n > 0 else np.zeros(0)
+    if cell_size is None:
+        min_cell = math.sqrt(AREA_W * AREA_H / (GRID_MAX_CELLS_PER_ITEM * max(n, 1)))
+        cell_size = max(float(np.mean(dims)) if n > 0 else 0.0, min_cell)
+    nx = max(1, int(math.ceil(AREA_W / cell_size)))
+    ny = max(1, int(math.ceil(AREA_H / cell_size)))
+
+    # Eintragsblock je Item: max. Zellen pro Achse = floor(D / cell_size) + 2
+    per_axis = np.minimum((dims // cell_size).astype(np.int64) + 2, max(nx, ny))
+    item_offset = np.zeros(n + 1, dtype=np.int64)
+    item_offset[1:] = np.cumsum(per_axis * per_axis)
+    total = int(item_offset[-1])
+
+    grid = SpatialGrid(
+        float(cell_size), nx, ny,
+        np.full(nx * ny, -1, dtype=np.int64),
+        np.full(total, -1, dtype=np.int64), np.full(total, -1, dtype=np.int64),
+        np.zeros(total, dtype=np.int64), np.zeros(total, dtype=np.int64),
+        item_offset, np.zeros(n, dtype=np.int64),
+        np.zeros(n, dtype=np.int64), np.zeros(1, dtype=np.int64),
+    )
+    grid_insert_all_jit(grid, config)
+    return grid
+
+@jit(nopython=True, cache=True)
 def bottom_left_density_cost_jit(config, num_types, AREA_W, AREA_H, WEIGHT_Y, WEIGHT_X, WEIGHT_BOX_AREA, WEIGHT_GROUPING):
     """Numba-kompatible Kostenfunktion mit balancierten Gewichten und Dichtestrafe."""
     if config.shape[0] == 0: return 0.0
@@ -141,9 +271,121 @@ def bottom_left_density_cost_jit(config, num_types, AREA_W, AREA_H, WEIGHT_Y, WE
 
     return cost_pos + cost_box + (WEIGHT_GROUPING * cost_group)
 
-@jit(nopython=True)
-def greedy_local_packing_jit(config, AREA_W, AREA_H, step=0.5, max_iterations=200):
-    """Numba-kompatible 'Jiggle'-Funktion für eine gute Startlösung."""
+# -------------------- INKREMENTELLE KOSTEN --------------------
+# Laufende Summen für bottom_left_density_cost_jit, damit ein Zug (1-2 Zeilen)
+# in O(1) bewertet wird. Die Bounding Box hält je Kante den Extremwert und wie
+# viele Items ihn erreichen; fällt die Anzahl auf 0 (Extrem-Item hat den Rand
+# verlassen), wird nur diese Kante beim nächsten Auswerten neu berechnet.
+# Gruppierung: sum |p - c|^2 je Typ = Q - (Sx^2 + Sy^2) / count.
+
+CostState = namedtuple("CostState", [
+    "pos_sums",     # [sum(area*x), sum(area*y)]
+    "type_sums",    # (num_types, 4): [sum x, sum y, sum(x^2+y^2), count]
+    "box",          # [min_x, max_x, min_y, max_y]
+    "box_count",    # Multiplizität der Extremwerte (0 = neu berechnen)
+])
+
+BOX_MIN_X = 0; BOX_MAX_X = 1; BOX_MIN_Y = 2; BOX_MAX_Y = 3
+
+@jit(nopython=True, cache=True)
+def _item_edges_jit(it):
+    half_w = it[IDX_W] / 2; half_h = it[IDX_H] / 2
+    return it[IDX_X] - half_w, it[IDX_X] + half_w, it[IDX_Y] - half_h, it[IDX_Y] + half_h
+
+@jit(nopython=True, cache=True)
+def cost_state_add_jit(state, it):
+    """Nimmt die Zeile 'it' in die laufenden Summen auf."""
+    x, y, area = it[IDX_X], it[IDX_Y], it[IDX_AREA]
+    state.pos_sums[0] += area * x
+    state.pos_sums[1] += area * y
+    t = int(it[IDX_TYPE_ID])
+    state.type_sums[t, 0] += x
+    state.type_sums[t, 1] += y
+    state.type_sums[t, 2] += x * x + y * y
+    state.type_sums[t, 3] += 1
+    edges = _item_edges_jit(it)
+    for k in range(4):
+        if state.box_count[k] == 0: continue # Kante wird ohnehin neu berechnet
+        is_min = (k == BOX_MIN_X or k == BOX_MIN_Y)
+        if edges[k] == state.box[k]:
+            state.box_count[k] += 1
+        elif (edges[k] < state.box[k]) == is_min:
+            state.box[k] = edges[k]; state.box_count[k] = 1
+
+@jit(nopython=True, cache=True)
+def cost_state_remove_jit(state, it):
+    """Entfernt die Zeile 'it' (mit den Werten, mit denen sie aufgenommen wurde)."""
+    x, y, area = it[IDX_X], it[IDX_Y], it[IDX_AREA]
+    state.pos_sums[0] -= area * x
+    state.pos_sums[1] -= area * y
+    t = int(it[IDX_TYPE_ID])
+    state.type_sums[t, 0] -= x
+    state.type_sums[t, 1] -= y
+    state.type_sums[t, 2] -= x * x + y * y
+    state.type_sums[t, 3] -= 1
+    edges = _item_edges_jit(it)
+    for k in range(4):
+        if state.box_count[k] > 0 and edges[k] == state.box[k]:
+            state.box_count[k] -= 1
+
+@jit(nopython=True, cache=True)
+def _cost_state_rebuild_box_jit(state, config):
+    """Berechnet die als ungültig markierten Bounding-Box-Kanten aus 'config' neu (O(n))."""
+    for k in range(4):
+        if state.box_count[k] > 0: continue
+        is_min = (k == BOX_MIN_X or k == BOX_MIN_Y)
+        state.box[k] = 999999.0 if is_min else -999999.0
+        for i in range(config.shape[0]):
+            edge = _item_edges_jit(config[i])[k]
+            if edge == state.box[k]:
+                state.box_count[k] += 1
+            elif (edge < state.box[k]) == is_min:
+                state.box[k] = edge; state.box_count[k] = 1
+
+@jit(nopython=True, cache=True)
+def cost_state_reset_jit(state, config):
+    """Initialisiert den Zustand vollständig aus 'config'."""
+    state.pos_sums[:] = 0.0
+    state.type_sums[:, :] = 0.0
+    state.box_count[:] = 0
+    for i in range(config.shape[0]):
+        cost_state_add_jit(state, config[i])
+    _cost_state_rebuild_box_jit(state, config)
+
+@jit(nopython=True, cache=True)
+def cost_state_total_jit(state, config, num_types, WEIGHT_Y, WEIGHT_X, WEIGHT_BOX_AREA, WEIGHT_GROUPING):
+    """
+    Liefert denselben Wert wie bottom_left_density_cost_jit für 'config',
+    aus den laufenden Summen. 'config' wird nur für ungültige Kanten gelesen.
+    """
+    n = config.shape[0]
+    if n == 0: return 0.0
+    _cost_state_rebuild_box_jit(state, config)
+    cost_pos = WEIGHT_Y * state.pos_sums[1] + WEIGHT_X * state.pos_sums[0]
+    cost_box = WEIGHT_BOX_AREA * ((state.box[BOX_MAX_X] - state.box[BOX_MIN_X]) *
+                                  (state.box[BOX_MAX_Y] - state.box[BOX_MIN_Y]))
+    cost_group = 0.0
+    if WEIGHT_GROUPING > 0 and num_types > 0:
+        for t in range(num_types):
+            count = state.type_sums[t, 3]
+            if count > 1:
+                sx = state.type_sums[t, 0]; sy = state.type_sums[t, 1]
+                cost_group += state.type_sums[t, 2] - (sx * sx + sy * sy) / count
+        cost_group /= n # Normalisieren
+    return cost_pos + cost_box + (WEIGHT_GROUPING * cost_group)
+
+def create_cost_state(config, num_types):
+    """Legt den inkrementellen Kostenzustand für 'config' an."""
+    state = CostState(
+        np.zeros(2), np.zeros((max(num_types, 1), 4)),
+        np.zeros(4), np.zeros(4, dtype=np.int64),
+    )
+    cost_state_reset_jit(state, config)
+    return state
+
+@jit(nopython=True, cache=True)
+def greedy_local_packing_jit(config, AREA_W, AREA_H, grid, step=0.5, max_iterations=200):
+    """Numba-kompatible 'Jiggle'-Funktion für eine gute Startlösung. Hält 'grid' synchron."""
     moved = True; iteration = 0; temp_step = step
     moves = np.array([[0.0, -temp_step], [-temp_step, 0.0], [-temp_step, -temp_step]])
     while moved and iteration < max_iterations:
@@ -159,36 +401,73 @@ def greedy_local_packing_jit(config, AREA_W, AREA_H, step=0.5, max_iterations=20
                     continue
                 candidate = obj.copy()
                 candidate[IDX_X], candidate[IDX_Y] = new_x, new_y
-                if not check_overlap_jit(candidate, config, i):
+                if not check_overlap_grid_jit(candidate, config, i, grid):
                     obj[IDX_X], obj[IDX_Y] = new_x, new_y
+                    grid_update_item_jit(grid, config, i)
                     moved = True
         temp_step *= 0.98
         moves[0, 1] = -temp_step; moves[1, 0] = -temp_step
         moves[2, 0] = -temp_step; moves[2, 1] = -temp_step
     return config
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
+def _grid_restore_jit(grid, config, i1, i2):
+    """Setzt die Gitter-Einträge der Zeilen i1/i2 (-1 = keine) auf den Stand von 'config' zurück."""
+    if i1 >= 0: grid_update_item_jit(grid, config, i1)
+    if i2 >= 0: grid_update_item_jit(grid, config, i2)
+
+@jit(nopython=True, cache=True)
+def _cost_state_replace_rows_jit(cost_state, config, undo_rows, i1, i2, to_config):
+    """
+    Tauscht im Kostenzustand die Zeilen i1/i2 (-1 = keine) zwischen Undo-Puffer
+    (alter Stand) und 'config' (neuer Stand) aus. to_config=True: alt -> neu.
+    """
+    if i1 >= 0:
+        if to_config:
+            cost_state_remove_jit(cost_state, undo_rows[0]); cost_state_add_jit(cost_state, config[i1])
+        else:
+            cost_state_remove_jit(cost_state, config[i1]); cost_state_add_jit(cost_state, undo_rows[0])
+    if i2 >= 0:
+        if to_config:
+            cost_state_remove_jit(cost_state, undo_rows[1]); cost_state_add_jit(cost_state, config[i2])
+        else:
+            cost_state_remove_jit(cost_state, config[i2]); cost_state_add_jit(cost_state, undo_rows[1])
+
+@jit(nopython=True, cache=True)
+def _undo_rows_jit(config, undo_rows, i1, i2):
+    """Schreibt die im Undo-Puffer gesicherten Zeilen i1/i2 (-1 = keine) zurück."""
+    if i1 >= 0: config[i1, :] = undo_rows[0]
+    if i2 >= 0: config[i2, :] = undo_rows[1]
+
+@jit(nopython=True, cache=True)
 def try_mutation_sa_jit(
     config, old_cost, temp, num_types, AREA_W, AREA_H, COOLING_RATE,
     SWAP_PROB, TELEPORT_PROB, ROTATE_PROB, MAX_MOVE_MULTIPLIER,
-    WEIGHT_Y, WEIGHT_X, WEIGHT_BOX, WEIGHT_GROUP
+    WEIGHT_Y, WEIGHT_X, WEIGHT_BOX, WEIGHT_GROUP, grid, cost_state, undo_rows
 ):
-    """Die Numba-kompilierte SA-Hauptschleife, inkl. Rotation."""
-    new_conf = config.copy()
-    num_items = new_conf.shape[0]
+    """
+    Die Numba-kompilierte SA-Hauptschleife, inkl. Rotation.
+    Verändert 'config' direkt; die berührten Zeilen werden vorher in 'undo_rows'
+    (2 x Spalten) gesichert und bei Ablehnung zurückgeschrieben. 'grid' und
+    'cost_state' bilden danach immer den Stand von 'config' ab.
+    Gibt (Kosten, neue Temperatur, akzeptiert) zurück.
+    """
+    num_items = config.shape[0]
     if num_items < 2:
         new_temp = temp * (COOLING_RATE**0.01)
-        return config, old_cost, new_temp, False, old_cost
+        return old_cost, new_temp, False
 
     mutated = False
     r = random.random()
+    i1 = -1; i2 = -1 # Veränderte Zeilen (i2 nur beim Swap)
 
     if r < SWAP_PROB:
         # --- SWAP MUTATION ---
         i1 = random.randint(0, num_items - 1)
         i2 = random.randint(0, num_items - 1)
         while i1 == i2: i2 = random.randint(0, num_items - 1)
-        o1 = new_conf[i1]; o2 = new_conf[i2]
+        undo_rows[0, :] = config[i1]; undo_rows[1, :] = config[i2]
+        o1 = config[i1]; o2 = config[i2]
         x1, y1 = o1[IDX_X], o1[IDX_Y]
         o1[IDX_X], o1[IDX_Y] = o2[IDX_X], o2[IDX_Y]
         o2[IDX_X], o2[IDX_Y] = x1, y1
@@ -196,20 +475,23 @@ def try_mutation_sa_jit(
         o1[IDX_Y] = min(max(o1[IDX_H]/2, o1[IDX_Y]), AREA_H - o1[IDX_H]/2)
         o2[IDX_X] = min(max(o2[IDX_W]/2, o2[IDX_X]), AREA_W - o2[IDX_W]/2)
         o2[IDX_Y] = min(max(o2[IDX_H]/2, o2[IDX_Y]), AREA_H - o2[IDX_H]/2)
-        if check_overlap_jit(o1, new_conf, i1) or check_overlap_jit(o2, new_conf, i2):
+        grid_update_item_jit(grid, config, i1); grid_update_item_jit(grid, config, i2)
+        if check_overlap_grid_jit(o1, config, i1, grid) or check_overlap_grid_jit(o2, config, i2, grid):
             mutated = True
     elif r < SWAP_PROB + TELEPORT_PROB:
         # --- TELEPORT MUTATION ---
-        i = random.randint(0, num_items - 1)
-        o = new_conf[i]; old_x, old_y = o[IDX_X], o[IDX_Y]
+        i1 = random.randint(0, num_items - 1)
+        undo_rows[0, :] = config[i1]
+        o = config[i1]
         o[IDX_X] = random.uniform(o[IDX_W]/2, AREA_W - o[IDX_W]/2)
         o[IDX_Y] = random.uniform(o[IDX_H]/2, AREA_H - o[IDX_H]/2)
-        if check_overlap_jit(o, new_conf, i):
-            mutated = True; o[IDX_X], o[IDX_Y] = old_x, old_y
+        if check_overlap_grid_jit(o, config, i1, grid):
+            mutated = True
     elif r < SWAP_PROB + TELEPORT_PROB + ROTATE_PROB:
         # --- ROTATION MUTATION (NUR FÜR RECHTECKE) ---
-        i = random.randint(0, num_items - 1)
-        o = new_conf[i]
+        i1 = random.randint(0, num_items - 1)
+        undo_rows[0, :] = config[i1]
+        o = config[i1]
         if o[IDX_GEOM_TYPE] == GEOM_RECT:
             old_w, old_h = o[IDX_W], o[IDX_H]
             new_w, new_h = o[IDX_H_ORIG], o[IDX_W_ORIG]
@@ -218,84 +500,501 @@ def try_mutation_sa_jit(
                 o[IDX_W_ORIG], o[IDX_H_ORIG] = old_w, old_h
                 o[IDX_X] = min(max(o[IDX_W]/2, o[IDX_X]), AREA_W - o[IDX_W]/2)
                 o[IDX_Y] = min(max(o[IDX_H]/2, o[IDX_Y]), AREA_H - o[IDX_H]/2)
-                if check_overlap_jit(o, new_conf, i):
-                    mutated = True # Ungültig, mache rückgängig
-                    o[IDX_W], o[IDX_H] = old_w, old_h
-                    o[IDX_W_ORIG], o[IDX_H_ORIG] = new_w, new_h
+                if check_overlap_grid_jit(o, config, i1, grid):
+                    mutated = True # Ungültig, wird unten rückgängig gemacht
     else:
         # --- TRANSLATION MUTATION ---
-        i = random.randint(0, num_items - 1)
-        o = new_conf[i]
+        i1 = random.randint(0, num_items - 1)
+        undo_rows[0, :] = config[i1]
+        o = config[i1]
         max_move = max(0.1, MAX_MOVE_MULTIPLIER * temp * (0.8 + 0.2*random.random()))
         dx = random.uniform(-max_move, max_move); dy = random.uniform(-max_move, max_move)
         o[IDX_X] += dx; o[IDX_Y] += dy
         o[IDX_X] = min(max(o[IDX_W]/2, o[IDX_X]), AREA_W - o[IDX_W]/2)
         o[IDX_Y] = min(max(o[IDX_H]/2, o[IDX_Y]), AREA_H - o[IDX_H]/2)
-        if check_overlap_jit(o, new_conf, i):
+        if check_overlap_grid_jit(o, config, i1, grid):
             mutated = True
 
     # --- KOSTENBERECHNUNG ---
     if mutated: # Ungültiger Zug
+        _undo_rows_jit(config, undo_rows, i1, i2)
+        if i2 >= 0: _grid_restore_jit(grid, config, i1, i2) # Nur Swap hat das Gitter vorab geändert
         new_temp = temp * (COOLING_RATE**0.01)
-        return config, old_cost, new_temp, False, old_cost
+        return old_cost, new_temp, False
 
-    # Gültiger Zug, Kosten berechnen
-    new_cost = bottom_left_density_cost_jit(
-        new_conf, num_types, AREA_W, AREA_H,
+    # Gültiger Zug: Gitter nachziehen, Kosten inkrementell berechnen
+    if i2 < 0: grid_update_item_jit(grid, config, i1)
+    _cost_state_replace_rows_jit(cost_state, config, undo_rows, i1, i2, True)
+    new_cost = cost_state_total_jit(
+        cost_state, config, num_types,
         WEIGHT_Y, WEIGHT_X, WEIGHT_BOX, WEIGHT_GROUP
     )
     delta = old_cost - new_cost
     # Metropolis-Kriterium
     if delta > 0 or random.random() < math.exp(delta / max(1e-8, temp)):
         new_temp = temp * COOLING_RATE # Akzeptiert -> Kühlen
-        return new_conf, new_cost, new_temp, True, new_cost
+        return new_cost, new_temp, True
     else:
+        _cost_state_replace_rows_jit(cost_state, config, undo_rows, i1, i2, False)
+        _undo_rows_jit(config, undo_rows, i1, i2)
+        _grid_restore_jit(grid, config, i1, i2)
         new_temp = temp * (COOLING_RATE**0.01) # Abgelehnt -> Leicht kühlen
-        return config, old_cost, new_temp, False, old_cost
+        return old_cost, new_temp, False
+
+# -------------------- KOMPILIERTER SA-LAUF --------------------
+
+# Typisierter Parametersatz für run_sa_jit (aus dem params-Dict, siehe make_sa_params)
+SAParams = namedtuple("SAParams", [
+    "AREA_W", "AREA_H", "INITIAL_TEMP", "COOLING_RATE", "ITER_LIMIT",
+    "SWAP_PROBABILITY", "TELEPORT_PROBABILITY", "ROTATE_PROBABILITY", "MAX_MOVE_MULTIPLIER",
+    "WEIGHT_Y", "WEIGHT_X", "WEIGHT_BOX_AREA", "WEIGHT_GROUPING",
+    "STALL_ITERATIONS", "MIN_TEMP", "ROUND_TIME_BUDGET",
+])
+
+# Abbruchkriterien sind optional; 0 schaltet das jeweilige Kriterium ab
+SA_PARAM_DEFAULTS = {"STALL_ITERATIONS": 0, "MIN_TEMP": 0.0, "ROUND_TIME_BUDGET": 0.0}
+SA_INT_PARAMS = ("ITER_LIMIT", "STALL_ITERATIONS")
+
+# Indizes im Statistik-Array eines Laufs
+STAT_ITERATIONS = 0   # Ausgeführte Iterationen
+STAT_ACCEPTED = 1     # Akzeptierte Züge
+STAT_IMPROVED = 2     # Verbesserungen des besten Standes
+STAT_FINAL_TEMP = 3   # Temperatur am Ende
+STAT_STOP_REASON = 4  # Welches Kriterium den Lauf beendet hat (STOP_*)
+NUM_STATS = 5
+
+# Abbruchgründe eines Laufs
+STOP_ITER_LIMIT = 0   # ITER_LIMIT erreicht
+STOP_STALL = 1        # STALL_ITERATIONS ohne neuen Bestwert
+STOP_MIN_TEMP = 2     # Temperatur unter MIN_TEMP gefallen
+STOP_TIME_BUDGET = 3  # ROUND_TIME_BUDGET (Sekunden) überschritten
+STOP_REASON_NAMES = ("Iterationslimit", "Stagnation", "Mindesttemperatur", "Zeitbudget")
+
+TIME_CHECK_MASK = 1023 # Uhr nur alle 1024 Iterationen abfragen (objmode ist teuer)
+
+def make_sa_params(params):
+    """Überführt das params-Dict in den typisierten SAParams-Satz."""
+    values = dict(SA_PARAM_DEFAULTS, **params)
+    return SAParams(*(
+        int(values[name]) if name in SA_INT_PARAMS else float(values[name])
+        for name in SAParams._fields
+    ))
+
+@jit(nopython=True, cache=True)
+def _perf_counter_jit():
+    with objmode(now='float64'):
+        now = time.perf_counter()
+    return now
+
+@jit(nopython=True, cache=True)
+def run_sa_jit(config, num_types, sa, grid, cost_state, seed, jiggle=True):
+    """
+    Kompletter Annealing-Lauf in nopython: Zufallsgenerator seeden, Jiggle-Startlösung,
+    höchstens ITER_LIMIT Mutationen. Vorzeitiger Abbruch nach STALL_ITERATIONS ohne
+    Verbesserung, unter MIN_TEMP oder nach ROUND_TIME_BUDGET Sekunden (Grund in
+    stats[STAT_STOP_REASON]). 'grid' und 'cost_state' müssen zu 'config' gehören;
+    'config' wird direkt verändert und enthält danach den aktuellen (nicht den besten)
+    Stand. Gibt (best_conf, best_cost, stats) zurück.
+    """
+    start_time = _perf_counter_jit() if sa.ROUND_TIME_BUDGET > 0 else 0.0
+    random.seed(seed)
+    if jiggle:
+        greedy_local_packing_jit(config, sa.AREA_W, sa.AREA_H, grid, 1.0, 500)
+    cost_state_reset_jit(cost_state, config)
+    current_cost = cost_state_total_jit(
+        cost_state, config, num_types,
+        sa.WEIGHT_Y, sa.WEIGHT_X, sa.WEIGHT_BOX_AREA, sa.WEIGHT_GROUPING
+    )
+    temp = sa.INITIAL_TEMP
+    best_conf = config.copy(); best_cost = current_cost
+    undo_rows = np.empty((2, config.shape[1]))
+    stats = np.zeros(NUM_STATS)
+    stop_reason = STOP_ITER_LIMIT
+    last_improvement = 0
+
+    for i in range(sa.ITER_LIMIT):
+        current_cost, temp, accepted = try_mutation_sa_jit(
+            config, current_cost, temp, num_types,
+            sa.AREA_W, sa.AREA_H, sa.COOLING_RATE,
+            sa.SWAP_PROBABILITY, sa.TELEPORT_PROBABILITY, sa.ROTATE_PROBABILITY,
+            sa.MAX_MOVE_MULTIPLIER,
+            sa.WEIGHT_Y, sa.WEIGHT_X, sa.WEIGHT_BOX_AREA, sa.WEIGHT_GROUPING,
+            grid, cost_state, undo_rows
+        )
+        stats[STAT_ITERATIONS] += 1
+        if accepted: stats[STAT_ACCEPTED] += 1
+        if current_cost < best_cost: # Snapshot nur bei Verbesserung
+            best_cost = current_cost; best_conf[:] = config
+            stats[STAT_IMPROVED] += 1
+            last_improvement = i
+
+        # --- ABBRUCHKRITERIEN ---
+        if sa.STALL_ITERATIONS > 0 and i - last_improvement >= sa.STALL_ITERATIONS:
+            stop_reason = STOP_STALL; break
+        if temp < sa.MIN_TEMP:
+            stop_reason = STOP_MIN_TEMP; break
+        if sa.ROUND_TIME_BUDGET > 0 and (i & TIME_CHECK_MASK) == 0:
+            if _perf_counter_jit() - start_time > sa.ROUND_TIME_BUDGET:
+                stop_reason = STOP_TIME_BUDGET; break
+
+    stats[STAT_FINAL_TEMP] = temp
+    stats[STAT_STOP_REASON] = stop_reason
+    return best_conf, best_cost, stats
 
 # -------------------- "WORKER" FÜR PARALLELISIERUNG --------------------
 
 def _run_sa_worker(args):
     """Diese Funktion wird von jedem CPU-Kern parallel ausgeführt."""
     initial_config, num_types, params = args
-    # Lokalen Zufallsgenerator initialisieren
-    random.seed(os.getpid() + int(time.time() * 1000) % 1000)
+    # Seed für den Numba-Zufallsgenerator dieses Laufs
+    seed = os.getpid() + int(time.time() * 1000) % 1000
 
-    # Jiggle-Startlösung
-    current_conf = greedy_local_packing_jit(
-        initial_config, params['AREA_W'], params['AREA_H'],
-        step=1.0, max_iterations=500
-    )
-    current_cost = bottom_left_density_cost_jit(
-        current_conf, num_types, params['AREA_W'], params['AREA_H'],
-        params['WEIGHT_Y'], params['WEIGHT_X'], params['WEIGHT_BOX_AREA'], params['WEIGHT_GROUPING']
+    config = initial_config.copy()
+    grid = create_spatial_grid(config, params['AREA_W'], params['AREA_H'])
+    cost_state = create_cost_state(config, num_types)
+    return run_sa_jit(config, num_types, make_sa_params(params), grid, cost_state, seed)
+
+def _run_tempering_worker(args):
+    """
+    Ein Segment einer Replika im Parallel-Tempering: ITER_LIMIT Iterationen bei fester
+    Temperatur (COOLING_RATE = 1). Stagnation und Mindesttemperatur prüft der Koordinator,
+    hier greift nur das Zeitbudget. Gibt zusätzlich den aktuellen Stand und dessen Kosten
+    zurück, die der Koordinator für den Replika-Tausch braucht.
+    """
+    config, num_types, params, temp, seed, jiggle = args
+    sa = make_sa_params(params)._replace(INITIAL_TEMP=temp, COOLING_RATE=1.0, STALL_ITERATIONS=0, MIN_TEMP=0.0)
+    grid = create_spatial_grid(config, params['AREA_W'], params['AREA_H'])
+    cost_state = create_cost_state(config, num_types)
+    best_conf, best_cost, stats = run_sa_jit(config, num_types, sa, grid, cost_state, seed, jiggle)
+    current_cost = cost_state_total_jit(
+        cost_state, config, num_types,
+        sa.WEIGHT_Y, sa.WEIGHT_X, sa.WEIGHT_BOX_AREA, sa.WEIGHT_GROUPING
     )
-    temp = params['INITIAL_TEMP']
-    best_conf = current_conf; best_cost = current_cost
-
-    # SA-Hauptschleife
-    for i in range(params['ITER_LIMIT']):
-        new_conf, new_cost, new_temp, accepted, resulting_cost = try_mutation_sa_jit(
-            current_conf, current_cost, temp, num_types,
-            params['AREA_W'], params['AREA_H'], params['COOLING_RATE'],
-            params['SWAP_PROBABILITY'], params['TELEPORT_PROBABILITY'], params['ROTATE_PROBABILITY'],
-            params['MAX_MOVE_MULTIPLIER'],
-            params['WEIGHT_Y'], params['WEIGHT_X'], params['WEIGHT_BOX_AREA'], params['WEIGHT_GROUPING']
-        )
-        current_conf = new_conf; current_cost = resulting_cost; temp = new_temp
-        if current_cost < best_cost:
-            best_cost = current_cost; best_conf = current_conf
-    return best_conf, best_cost
+    return config, current_cost, best_conf, best_cost, stats
+
+# -------------------- WARM-UP DER NUMBA-KERNEL --------------------
+
+def _warmup_layout():
+    """Kleines Layout (zwei Rechtecke, ein Kreis) in der Spaltenbelegung der PackerEngine."""
+    layout = np.zeros((3, IDX_WEIGHT + 1))
+    for i, (x, y, w, h, geom) in enumerate(((1.0, 1.0, 2.0, 2.0, GEOM_RECT), (4.0, 1.0, 2.0, 1.0, GEOM_RECT),
+                                            (1.0, 4.0, 2.0, 2.0, GEOM_CIRCLE))):
+        layout[i, [IDX_X, IDX_Y, IDX_W, IDX_H, IDX_W_ORIG, IDX_H_ORIG]] = x, y, w, h, w, h
+        layout[i, IDX_TYPE_ID] = i
+        layout[i, IDX_AREA] = w * h
+        layout[i, IDX_GEOM_TYPE] = geom
+        layout[i, IDX_RADIUS] = w / 2 if geom == GEOM_CIRCLE else 0.0
+        layout[i, IDX_WEIGHT] = 1.0
+    return layout
+
+# True, sobald warmup_kernels in diesem Prozess gelaufen ist (per fork an Worker vererbt)
+_kernels_bereit = False
+
+def warmup_kernels():
+    """
+    Ruft alle Kernel einmal mit den Argumenttypen der PackerEngine auf. Mit cache=True
+    werden sie nur beim allerersten Start kompiliert (Cache in __pycache__), danach aus
+    dem Cache geladen. Gibt die Dauer in Sekunden zurück.
+    """
+    global _kernels_bereit
+    start = time.perf_counter()
+    AREA_W, AREA_H = 10.0, 10.0
+    layout = _warmup_layout()
+    num_types = layout.shape[0]
+    params = dict(default_parameters(AREA_W, AREA_H, num_cpus=1), ITER_LIMIT=10)
+
+    # SA-Kernel über dieselben Einstiege wie die Worker (inkl. ausgelassenem 'jiggle')
+    _run_sa_worker((layout, num_types, params))
+    _run_tempering_worker((layout.copy(), num_types, params, 0.5, 0, False))
+    sa = make_sa_params(params)
+    bottom_left_density_cost_jit(layout, num_types, AREA_W, AREA_H,
+                                 sa.WEIGHT_Y, sa.WEIGHT_X, sa.WEIGHT_BOX_AREA, sa.WEIGHT_GROUPING)
+
+    # Platzierer der PackerEngine
+    grid = create_spatial_grid(layout, AREA_W, AREA_H)
+    corners = PackerEngine._compute_corner_points_jit(layout)
+    PackerEngine._find_corner_position_jit(layout[0].copy(), layout, grid, corners, AREA_W, AREA_H)
+    PackerEngine._find_best_position_jit(layout[0].copy(), layout, grid, 10, AREA_W, AREA_H)
+    _kernels_bereit = True
+    return time.perf_counter() - start
+
+def _init_sa_worker():
+    """Pool-Initializer: Kernel einmal pro Prozess laden (Inline-Pools entstehen je Container neu)."""
+    if not _kernels_bereit:
+        warmup_kernels()
+
+# -------------------- SA-RUNNER (RUNDEN-AUSFÜHRUNG) --------------------
+
+class _InlinePool:
+    """Ersatz für multiprocessing.Pool mit einem Prozess: map() läuft im aufrufenden Prozess."""
+
+    def map(self, func, iterable):
+        return list(map(func, iterable))
+
+    def close(self): pass
+    def join(self): pass
+    def terminate(self): pass
+
+def _create_pool(processes, initializer=_init_sa_worker, initargs=()):
+    """
+    Pool für die SA-Läufe. Bei einem Prozess ohne Kindprozesse, damit ein Packer in einem
+    Worker der Pipeline (ProcessPoolExecutor) keinen verschachtelten Pool startet.
+    """
+    if processes <= 1:
+        initializer(*initargs)
+        return _InlinePool()
+    return multiprocessing.Pool(processes=processes, initializer=initializer, initargs=initargs)
+
+def _pick_best_result(results):
+    """Wählt aus [(conf, cost, stats), ...] das Ergebnis mit den niedrigsten Kosten."""
+    best_conf, best_cost = None, float('inf')
+    for conf, cost, stats in results:
+        if cost < best_cost:
+            best_cost = cost; best_conf = conf
+    return best_conf, best_cost, [stats for _, _, stats in results]
+
+class PoolSARunner:
+    """Standardmodus: Jede Runde wird die Konfiguration für alle Läufe gepickelt (pool.map)."""
+
+    def __init__(self, initial_config, num_types, params, processes):
+        self.config = initial_config
+        self.num_types = num_types
+        self.params = params
+        self.pool = _create_pool(processes)
+
+    def add_item(self, item_row):
+        self.config = np.vstack([self.config, item_row])
+
+    def optimize(self, iter_limit=None):
+        """Führt NUM_SA_RUNS Läufe aus. Gibt (best_conf, best_cost, [stats, ...]) zurück."""
+        params = self.params if iter_limit is None else dict(self.params, ITER_LIMIT=iter_limit)
+        worker_args = [(self.config.copy(), self.num_types, params)
+                       for _ in range(self.params['NUM_SA_RUNS'])]
+        best_conf, best_cost, stats = _pick_best_result(self.pool.map(_run_sa_worker, worker_args))
+        self.config = best_conf
+        return best_conf, best_cost, stats
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.pool.terminate()
+
+
+class TemperingSARunner:
+    """
+    Replica-Exchange-Modus: NUM_SA_RUNS Replikas laufen bei festen Temperaturen einer
+    geometrischen Leiter (PT_TEMP_MIN .. PT_TEMP_MAX). Nach jedem Segment von
+    PT_SEGMENT_ITER Iterationen tauschen benachbarte Replikas ihre Konfigurationen
+    nach dem Metropolis-Kriterium (abwechselnd gerade/ungerade Paare). Keine Replika
+    wird verworfen; das Ergebnis ist der beste Stand über alle Replikas.
+    """
+
+    def __init__(self, initial_config, num_types, params, processes):
+        self.config = initial_config
+        self.num_types = num_types
+        self.params = params
+        num_replicas = max(2, params['NUM_SA_RUNS'])
+        t_max = params.get('PT_TEMP_MAX', params['INITIAL_TEMP'])
+        t_min = params.get('PT_TEMP_MIN', params['INITIAL_TEMP'] * 0.01)
+        self.temps = np.geomspace(t_min, t_max, num_replicas) # Index 0 = kälteste Replika
+        self.segment_iter = params.get('PT_SEGMENT_ITER', 2000)
+        self.swaps_tried = 0; self.swaps_accepted = 0
+        self.pool = _create_pool(processes)
+
+    def add_item(self, item_row):
+        self.config = np.vstack([self.config, item_row])
+
+    def _exchange(self, replicas, costs, parity):
+        """Metropolis-Tausch benachbarter Replikas: min(1, exp((b_k - b_k+1) * (E_k - E_k+1)))."""
+        for k in range(parity, len(self.temps) - 1, 2):
+            delta = (1.0 / self.temps[k] - 1.0 / self.temps[k + 1]) * (costs[k] - costs[k + 1])
+            self.swaps_tried += 1
+            if delta >= 0 or random.random() < math.exp(delta):
+                replicas[k], replicas[k + 1] = replicas[k + 1], replicas[k]
+                costs[k], costs[k + 1] = costs[k + 1], costs[k]
+                self.swaps_accepted += 1
+
+    def optimize(self, iter_limit=None):
+        """
+        Verteilt das Iterationsbudget einer Runde (pro Replika) auf Segmente.
+        Die Runde endet vorzeitig, wenn STALL_ITERATIONS lang keine Replika den
+        Bestwert verbessert hat oder ROUND_TIME_BUDGET aufgebraucht ist.
+        Gibt (best_conf, best_cost, [stats je Temperatur]) zurück.
+        """
+        start_time = time.perf_counter()
+        iter_limit = self.params['ITER_LIMIT'] if iter_limit is None else iter_limit
+        num_segments = max(1, iter_limit // self.segment_iter)
+        segment_iter = max(1, iter_limit // num_segments)
+        stall_limit = self.params.get('STALL_ITERATIONS', 0)
+        time_budget = self.params.get('ROUND_TIME_BUDGET', 0.0)
+        params = dict(self.params, ITER_LIMIT=segment_iter)
+        num_replicas = len(self.temps)
+        replicas = [self.config.copy() for _ in range(num_replicas)]
+        costs = [0.0] * num_replicas
+        run_stats = [np.zeros(NUM_STATS) for _ in range(num_replicas)]
+        best_conf, best_cost = self.config, float('inf')
+        stop_reason = STOP_ITER_LIMIT; stalled_iter = 0
+
+        for segment in range(num_segments):
+            if time_budget > 0:
+                remaining = time_budget - (time.perf_counter() - start_time)
+                if remaining <= 0:
+                    stop_reason = STOP_TIME_BUDGET; break
+                params['ROUND_TIME_BUDGET'] = remaining
+            worker_args = [(replicas[k], self.num_types, params, self.temps[k], random.randrange(2**31), segment == 0)
+                           for k in range(num_replicas)]
+            results = self.pool.map(_run_tempering_worker, worker_args)
+            stalled_iter += segment_iter
+            for k, (config, current_cost, seg_best_conf, seg_best_cost, stats) in enumerate(results):
+                replicas[k] = config; costs[k] = current_cost
+                run_stats[k][:STAT_FINAL_TEMP] += stats[:STAT_FINAL_TEMP]
+                if seg_best_cost < best_cost:
+                    best_cost = seg_best_cost; best_conf = seg_best_conf
+                    stalled_iter = 0
+            if stall_limit > 0 and stalled_iter >= stall_limit:
+                stop_reason = STOP_STALL; break
+            self._exchange(replicas, costs, segment % 2)
+
+        for k in range(num_replicas):
+            run_stats[k][STAT_FINAL_TEMP] = self.temps[k]
+            run_stats[k][STAT_STOP_REASON] = stop_reason
+        self.config = best_conf
+        return best_conf, best_cost, run_stats
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.swaps_tried:
+            print(f"Parallel Tempering: {self.swaps_accepted}/{self.swaps_tried} Replika-Tausche akzeptiert.")
+        self.pool.terminate()
+
+
+# Pro Worker-Prozess: angehängter Shared-Memory-Block und kompilierte Parameter
+_shared_worker_state = {}
+
+def _set_shared_state(slots, num_types, params, shm=None):
+    _shared_worker_state.update(shm=shm, slots=slots, num_types=num_types, sa=make_sa_params(params), params=params)
+
+def _clear_shared_state():
+    """Gibt die Slots frei und schließt ein eigenes Handle auf den Block (nur in Pool-Workern)."""
+    shm = _shared_worker_state.get("shm")
+    _shared_worker_state.clear() # Erst die Slots, sonst scheitert close() an exportierten Puffern
+    if shm is not None:
+        shm.close()
+
+def _init_shared_sa_worker(shm_name, shape, num_types, params):
+    """Pool-Initializer: hängt den Layout-Block an und lädt die Kernel, einmal pro Worker-Prozess."""
+    _init_sa_worker()
+    shm = shared_memory.SharedMemory(name=shm_name) # Referenz halten, sonst wird der Puffer freigegeben
+    _set_shared_state(np.ndarray(shape, dtype=np.float64, buffer=shm.buf), num_types, params, shm)
+    # Läuft beim geordneten Ende des Workers (pool.close/join im Runner)
+    multiprocessing.util.Finalize(None, _clear_shared_state, exitpriority=10)
+
+def _init_shared_sa_inline(slots, num_types, params):
+    """Initializer ohne Kindprozesse: nutzt die Slots des Runners statt eines zweiten Handles."""
+    _init_sa_worker()
+    _set_shared_state(slots, num_types, params)
+
+def _run_shared_sa_worker(task):
+    """
+    Ein SA-Lauf im Shared-Memory-Modus. Liest das beste Layout der Vorrunde aus
+    Slot [read_parity, source_run], hängt die neuen Items an und schreibt das
+    Ergebnis nach [1 - read_parity, run_idx]. Zurück gehen nur Kosten und Statistik.
+    """
+    run_idx, read_parity, source_run, n_items, added_rows, iter_limit, seed = task
+    slots = _shared_worker_state["slots"]; params = _shared_worker_state["params"]
+    num_types = _shared_worker_state["num_types"]
+    sa = _shared_worker_state["sa"]
+    if iter_limit is not None:
+        sa = sa._replace(ITER_LIMIT=int(iter_limit))
+
+    config = np.empty((n_items, slots.shape[3]))
+    n_prev = n_items - added_rows.shape[0]
+    config[:n_prev] = slots[read_parity, source_run, :n_prev]
+    config[n_prev:] = added_rows
+
+    grid = create_spatial_grid(config, params['AREA_W'], params['AREA_H'])
+    cost_state = create_cost_state(config, num_types)
+    best_conf, best_cost, stats = run_sa_jit(config, num_types, sa, grid, cost_state, seed)
+    slots[1 - read_parity, run_idx, :n_items] = best_conf
+    return run_idx, best_cost, stats
+
+class SharedMemorySARunner:
+    """
+    Persistenter Modus: Die Worker bleiben über alle Runden am Leben (inkl. ihres
+    kompilierten Zustands) und lesen das aktuelle Layout aus multiprocessing.shared_memory.
+    Pro Runde werden nur (Quell-Slot, neues Item, Seed) verschickt. Die Slots sind
+    doppelt gepuffert (Parität), damit kein Lauf das Layout überschreibt, das ein
+    anderer Lauf noch liest.
+    """
+
+    def __init__(self, initial_config, num_types, params, processes, capacity):
+        self.params = params
+        self.num_runs = params['NUM_SA_RUNS']
+        shape = (2, self.num_runs, capacity, initial_config.shape[1])
+        self.shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+        self.slots = np.ndarray(shape, dtype=np.float64, buffer=self.shm.buf)
+        self.slots[0, 0, :initial_config.shape[0]] = initial_config
+        self.parity = 0; self.source_run = 0
+        self.n_items = initial_config.shape[0]
+        self.pending_rows = []
+        if processes <= 1:
+            self.pool = _create_pool(processes, _init_shared_sa_inline, (self.slots, num_types, params))
+        else:
+            self.pool = _create_pool(processes, _init_shared_sa_worker, (self.shm.name, shape, num_types, params))
+
+    def add_item(self, item_row):
+        # Delta für die nächste Runde; das Layout selbst liegt bereits im Shared Memory
+        self.pending_rows.append(np.asarray(item_row, dtype=np.float64))
+        self.n_items += 1
+
+    def optimize(self, iter_limit=None):
+        """Führt NUM_SA_RUNS Läufe aus. Gibt (best_conf, best_cost, [stats, ...]) zurück."""
+        added_rows = np.array(self.pending_rows).reshape(len(self.pending_rows), self.slots.shape[3])
+        tasks = [(run_idx, self.parity, self.source_run, self.n_items, added_rows, iter_limit, random.randrange(2**31))
+                 for run_idx in range(self.num_runs)]
+        results = self.pool.map(_run_shared_sa_worker, tasks)
+        self.parity = 1 - self.parity; self.pending_rows = []
+        best_run, best_cost = min(((run_idx, cost) for run_idx, cost, _ in results), key=lambda r: r[1])
+        self.source_run = best_run
+        best_conf = self.slots[self.parity, best_run, :self.n_items].copy()
+        return best_conf, best_cost, [stats for _, _, stats in results]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Ohne Fehler regulär beenden, damit die Worker ihre Handles schließen
+        if exc_type is None:
+            self.pool.close()
+        else:
+            self.pool.terminate()
+        self.pool.join()
+        if _shared_worker_state.get("slots") is self.slots: # Inline-Modus
+            _clear_shared_state()
+        del self.slots
+        self.shm.close(); self.shm.unlink()
+
+# -------------------- FORM-SCHLÜSSEL --------------------
+
+def _shape_key(item_row):
+    """Schlüssel einer Item-Form in fester Ausrichtung (alle Spalten außer X/Y)."""
+    return tuple(item_row[IDX_W:].tolist())
 
 # -------------------- HAUPTKLASSE (ENGINE - Aktualisiert) --------------------
 
+# Platzierer, wenn params keinen 'PLACEMENT_STRATEGY' nennt: 'corner' (Eckpunkte, deterministisch) oder 'random'
+DEFAULT_PLACEMENT_STRATEGY = "corner"
+
 class PackerEngine:
     """Steuert den "headless" Packprozess unter Berücksichtigung des Gewichts."""
 
     def __init__(self, params, object_definitions_list, max_container_weight):
         self.params = params
         self.max_container_weight = max_container_weight if max_container_weight is not None else float('inf')
-        self.num_cpus = multiprocessing.cpu_count()
+        self.num_cpus = params.get('NUM_PROCESSES') or multiprocessing.cpu_count()
         print(f"PackerEngine initialisiert. Max Container Gewicht: {self.max_container_weight if self.max_container_weight != float('inf') else 'Unbegrenzt'} kg.")
         print(f"Nutze {self.num_cpus} CPU-Kerne für {self.params['NUM_SA_RUNS']} SA-Läufe.")
 
@@ -314,11 +1013,36 @@ class PackerEngine:
             } for d in self.pallet_types
         }
         self.num_types = len(self.pallet_types)
+        self.item_rows = None
+        self.progress_callback = None # Optional: erhält nach jeder Runde ein Fortschritts-Dict
         print(f"{self.num_types} eindeutige Objekttypen werden verarbeitet.")
 
+    @classmethod
+    def from_item_rows(cls, params, item_rows, type_names, max_container_weight):
+        """
+        Engine direkt aus fertigen 11-Spalten-Zeilen (z.B. ObjectTable.packer_rows) statt
+        aus Definitions-Dicts. 'type_names' bildet IDX_TYPE_ID auf den Export-Namen ab.
+        """
+        item_rows = np.asarray(item_rows, dtype=np.float64)
+        geom_types = np.zeros(len(type_names), dtype=np.int64)
+        geom_types[item_rows[:, IDX_TYPE_ID].astype(np.int64)] = item_rows[:, IDX_GEOM_TYPE]
+        definitions = [{
+            "sequential_type_id": type_id, "original_json_id": name, "name": name,
+            "geom_type": int(geom_types[type_id]),
+        } for type_id, name in enumerate(type_names)]
+        engine = cls(params, definitions, max_container_weight)
+        engine.item_rows = item_rows
+        return engine
+
 
     def _create_initial_pool(self):
         """Erstellt den Pool exakt nach Vorgaben, inkl. Gewicht."""
+        if self.item_rows is not None:
+            rows = self.item_rows.copy()
+            rows[:, IDX_X] = self.params['AREA_W'] / 2; rows[:, IDX_Y] = self.params['AREA_H'] / 2
+            # Sortiere größte zuerst (stabil wie list.sort)
+            return list(rows[np.argsort(-rows[:, IDX_AREA], kind='stable')])
+
         pool = []
         if not self.pallet_types:
             print("FEHLER: Keine Palettentypen geladen, Pool kann nicht erstellt werden.")
@@ -354,11 +1078,11 @@ class PackerEngine:
         return pool
 
     @staticmethod
-    @jit(nopython=True)
-    def _find_best_position_jit(item_template, current_layout, MAX_TRIES, AREA_W, AREA_H):
+    @jit(nopython=True, cache=True)
+    def _find_best_position_jit(item_template, current_layout, grid, MAX_TRIES, AREA_W, AREA_H):
         """
         Numba-JIT-Version, um die beste Startposition für ein NEUES Item zu finden.
-        Gibt (position, metric) zurück.
+        'grid' muss 'current_layout' abbilden. Gibt (position, metric) zurück.
         """
         w_bb, h_bb = item_template[IDX_W], item_template[IDX_H] # Bounding Box
         x_min, x_max = w_bb / 2, AREA_W - w_bb / 2
@@ -376,7 +1100,7 @@ class PackerEngine:
             candidate = item_template.copy()
             candidate[IDX_X], candidate[IDX_Y] = x, y
 
-            if not check_overlap_jit(candidate, current_layout, -1): # -1 = kein Index-Skip
+            if not check_overlap_grid_jit(candidate, current_layout, -1, grid): # -1 = kein Index-Skip
                 # Metrik: y + x*0.1 (bevorzugt unten links)
                 metric = y + x * 0.1
                 if metric < best_metric:
@@ -386,10 +1110,163 @@ class PackerEngine:
 
         return (best_pos, best_metric)
 
+    @staticmethod
+    @jit(nopython=True, cache=True)
+    def _compute_corner_points_jit(current_layout):
+        """
+        Erzeugt die Eckpunkt-Kandidaten (untere linke Ecke) für neue Items: (0, 0) und
+        je Item die Punkte rechts-unten und links-oben, jeweils auch bis zum nächsten
+        Hindernis bzw. zur Wand projiziert (nach unten bzw. nach links).
+        Kreise gehen über ihre Bounding Box ein. Sortiert nach y + 0.1*x (bottom-left).
+        """
+        n = current_layout.shape[0]
+        corners = np.zeros((4 * n + 1, 2))
+        for j in range(n):
+            left_j, right_j, bottom_j, top_j = _item_edges_jit(current_layout[j])
+            proj_x = 0.0; proj_y = 0.0
+            for k in range(n):
+                left_k, right_k, bottom_k, top_k = _item_edges_jit(current_layout[k])
+                # Links-oben-Punkt nach links schieben, bis ein Item in Höhe top_j blockiert
+                if bottom_k <= top_j < top_k and right_k <= left_j:
+                    proj_x = max(proj_x, right_k)
+                # Rechts-unten-Punkt nach unten fallen lassen, bis ein Item darunter blockiert
+                if left_k <= right_j < right_k and top_k <= bottom_j:
+                    proj_y = max(proj_y, top_k)
+            corners[4 * j + 1, 0] = right_j; corners[4 * j + 1, 1] = bottom_j
+            corners[4 * j + 2, 0] = left_j;  corners[4 * j + 2, 1] = top_j
+            corners[4 * j + 3, 0] = right_j; corners[4 * j + 3, 1] = proj_y
+            corners[4 * j + 4, 0] = proj_x;  corners[4 * j + 4, 1] = top_j
+        order = np.argsort(corners[:, 1] + 0.1 * corners[:, 0])
+        return corners[order]
+
+    @staticmethod
+    @jit(nopython=True, cache=True)
+    def _find_corner_position_jit(item_template, current_layout, grid, corners, AREA_W, AREA_H):
+        """
+        Konstruktive Alternative zu _find_best_position_jit: prüft die sortierten
+        Eckpunkte exakt und liefert den ersten gültigen, also den besten
+        bottom-left-Punkt (gleiche Metrik y + x*0.1 auf das Zentrum). Gibt (position, metric) zurück.
+        """
+        w_bb, h_bb = item_template[IDX_W], item_template[IDX_H]
+        candidate = item_template.copy()
+        for c in range(corners.shape[0]):
+            x = corners[c, 0] + w_bb / 2
+            y = corners[c, 1] + h_bb / 2
+            if x + w_bb / 2 > AREA_W or y + h_bb / 2 > AREA_H:
+                continue
+            candidate[IDX_X], candidate[IDX_Y] = x, y
+            if not check_overlap_grid_jit(candidate, current_layout, -1, grid):
+                return (np.array([x, y]), y + x * 0.1)
+        return (np.array([-1.0, -1.0]), 9e18)
+
+    def _find_position(self, item_template, layout, layout_grid, corners):
+        """Wählt den Platzierer nach params['PLACEMENT_STRATEGY'] ('corner' oder 'random')."""
+        # Feste Argumenttypen, damit die beim Warm-up kompilierte Signatur greift
+        if corners is not None:
+            return self._find_corner_position_jit(
+                item_template, layout, layout_grid, corners,
+                float(self.params['AREA_W']), float(self.params['AREA_H'])
+            )
+        return self._find_best_position_jit(
+            item_template, layout, layout_grid,
+            int(self.params['MAX_PLACEMENT_TRIES']),
+            float(self.params['AREA_W']), float(self.params['AREA_H'])
+        )
+
+    def _create_sa_runner(self, initial_config, capacity):
+        """Wählt die Runden-Ausführung: pickelnder Pool, Parallel Tempering oder persistente Shared-Memory-Worker."""
+        if self.params.get('PARALLEL_TEMPERING', False):
+            print(f"SA-Worker: Parallel Tempering mit {max(2, self.params['NUM_SA_RUNS'])} Replikas.")
+            return TemperingSARunner(initial_config, self.num_types, self.params, self.num_cpus)
+        if self.params.get('USE_SHARED_MEMORY', False):
+            print("SA-Worker: persistenter Pool mit Shared-Memory-Layout.")
+            return SharedMemorySARunner(initial_config, self.num_types, self.params, self.num_cpus, capacity)
+        return PoolSARunner(initial_config, self.num_types, self.params, self.num_cpus)
+
     # Innerhalb der PackerEngine Klasse in Algorithm2d - Kopie.py
 
+    def _find_best_insertion(self, layout, unplaced_pool, current_weight):
+        """
+        "Best-Fit": Sucht über alle Pool-Items (beide Ausrichtungen) die Einfügung
+        mit der besten Metrik. Gibt ((new_item, pool_index, metric, weight) | None,
+        skipped_due_to_weight) zurück.
+        """
+        best_item_to_add = None; best_item_pos = None
+        best_item_metric = 9e18; best_item_index_in_pool = -1
+        best_item_weight = 0.0
+        skipped_due_to_weight = False
+        layout_grid = create_spatial_grid(layout, self.params['AREA_W'], self.params['AREA_H'])
+        corners = None
+        if self.params.get('PLACEMENT_STRATEGY', DEFAULT_PLACEMENT_STRATEGY) == 'corner':
+            corners = self._compute_corner_points_jit(layout)
+        evaluated_shapes = set()
+
+        for i, item_template in enumerate(unplaced_pool):
+            item_weight = item_template[IDX_WEIGHT]
+
+            if current_weight + item_weight > self.max_container_weight:
+                skipped_due_to_weight = True
+                continue # Zu schwer
+
+            # Identische Items (Typ, Maße, Gewicht) nur einmal pro Scan bewerten
+            shape_key = _shape_key(item_template)
+            if shape_key in evaluated_shapes:
+                continue
+            evaluated_shapes.add(shape_key)
+
+            pos_1, metric_1 = self._find_position(item_template, layout, layout_grid, corners)
+
+            pos_2 = np.array([-1.0, -1.0]); metric_2 = 9e18
+            rotated_template = None
+            is_rect = item_template[IDX_GEOM_TYPE] == GEOM_RECT
+            is_not_square = item_template[IDX_W] != item_template[IDX_H]
+
+            if is_rect and is_not_square:
+                rotated_template = item_template.copy()
+                rotated_template[IDX_W] = item_template[IDX_H_ORIG]
+                rotated_template[IDX_H] = item_template[IDX_W_ORIG]
+                rotated_template[IDX_W_ORIG] = item_template[IDX_W]
+                rotated_template[IDX_H_ORIG] = item_template[IDX_H]
+
+                pos_2, metric_2 = self._find_position(rotated_template, layout, layout_grid, corners)
+
+            # --- Entscheidung: Beste Ausrichtung ---
+            current_best_metric = 9e18; current_best_pos = None; current_best_template = None
+            pos1_valid = pos_1[0] != -1.0
+            pos2_valid = pos_2[0] != -1.0
+
+            if pos1_valid and (not pos2_valid or metric_1 <= metric_2):
+                current_best_metric = metric_1; current_best_pos = pos_1; current_best_template = item_template
+            elif pos2_valid:
+                current_best_metric = metric_2; current_best_pos = pos_2; current_best_template = rotated_template
+
+            # --- Entscheidung: Bester Kandidat bisher? ---
+            if current_best_metric < best_item_metric and current_best_pos is not None:
+                best_item_metric = current_best_metric; best_item_pos = current_best_pos
+                best_item_to_add = current_best_template; best_item_index_in_pool = i
+                best_item_weight = item_weight
+
+        if best_item_to_add is None:
+            return None, skipped_due_to_weight
+        new_item = best_item_to_add.copy()
+        new_item[IDX_X], new_item[IDX_Y] = best_item_pos[0], best_item_pos[1]
+        return (new_item, best_item_index_in_pool, best_item_metric, best_item_weight), skipped_due_to_weight
+
+    def _batch_iteration_budget(self, added_area, layout):
+        """SA-Budget im Batch-Modus: ITER_LIMIT skaliert mit dem Flächenanteil der neuen Items (höchstens ITER_LIMIT)."""
+        placed_area = float(np.sum(layout[:, IDX_AREA]))
+        fraction = min(1.0, added_area / max(placed_area, 1e-9))
+        iter_limit = self.params['ITER_LIMIT']
+        return min(iter_limit, max(self.params.get('BATCH_MIN_ITER', 1000), int(iter_limit * fraction)))
+
     def run_packing_process(self):
-        """Führt den Packprozess durch, prüft Gewichtslimit und testet Rotation."""
+        """
+        Führt den Packprozess durch, prüft Gewichtslimit und testet Rotation.
+        Mit params['BATCH_INSERTION'] werden pro Runde bis zu BATCH_MAX_ITEMS Items
+        eingefügt; das SA-Budget richtet sich nach der Änderung, ein volles Re-Annealing
+        gibt es erst, wenn das Einfügen scheitert. Die Rundenstatistik liegt danach
+        in self.round_report.
+        """
 
         unplaced_pool = self._create_initial_pool()
         if not unplaced_pool:
@@ -407,110 +1284,124 @@ class PackerEngine:
         global_best_config = np.array([start_item])
         current_packing_round = 1
 
+        batch_mode = self.params.get('BATCH_INSERTION', False)
+        max_items_per_round = self.params.get('BATCH_MAX_ITEMS', 8) if batch_mode else 1
+        full_iter_limit = self.params['ITER_LIMIT']
+        iter_budget = full_iter_limit
+        self.round_report = []
+        process_start = time.time()
+
         print("--- INKREMENTELLE PACKUNG START (Largest First) ---")
         print(f"Gesamte Objekte im Pool: {total_items_in_pool + 1}. Start mit 1 Objekt (Gewicht: {current_weight:.2f} kg).")
 
-        with multiprocessing.Pool(processes=self.num_cpus) as pool:
+        with self._create_sa_runner(global_best_config, total_items_in_pool) as runner:
             while True:
                 weight_limit_str = f"{self.max_container_weight if self.max_container_weight != float('inf') else 'inf'}"
                 print(f"\n--- Runde {current_packing_round} (Platziert: {global_best_config.shape[0]}, Gewicht: {current_weight:.2f}/{weight_limit_str} kg) ---")
                 start_time = time.time()
 
                 # 1. OPTIMIERUNG
-                worker_args = [(global_best_config.copy(), self.num_types, self.params)
-                             for _ in range(self.params['NUM_SA_RUNS'])]
-                results = pool.map(_run_sa_worker, worker_args)
-                best_cost_this_round = float('inf')
-                best_config_this_round = None
-                for conf, cost in results:
-                    if cost < best_cost_this_round:
-                        best_cost_this_round = cost
-                        best_config_this_round = conf
-                global_best_config = best_config_this_round
+                global_best_config, best_cost_this_round, run_stats = runner.optimize(iter_budget)
+                accepted_total = sum(stats[STAT_ACCEPTED] for stats in run_stats)
+                iterations_total = sum(stats[STAT_ITERATIONS] for stats in run_stats)
                 duration = time.time() - start_time
-                print(f" -> SA-Optimierung abgeschlossen in {duration:.2f}s. Beste Kosten: {best_cost_this_round:.2f}")
+                acceptance = accepted_total / max(1, iterations_total)
+                iterations_used = int(iterations_total / max(1, len(run_stats)))
+                print(f" -> SA-Optimierung ({iterations_used}/{iter_budget} Iterationen) abgeschlossen in {duration:.2f}s. Beste Kosten: {best_cost_this_round:.2f} (Akzeptanzrate: {acceptance:.1%})")
+                print(f"    Abbruch: {self._format_stop_reasons(run_stats)}")
 
                 # 2. PRÜFUNG: Pool leer?
                 if not unplaced_pool:
+                    self._record_round(current_packing_round, 0, iterations_used, start_time)
+                    self._report_progress(current_packing_round, global_best_config, total_items_in_pool,
+                                          best_cost_this_round, process_start, finished=True)
                     print("\n!!! ENDE: Alle Objekte aus dem Pool wurden platziert (oder konnten nicht platziert werden). !!!")
                     break
 
-                # 3. "BEST-FIT" PLATZIERUNGSLOGIK
-                package_added = False
-                best_item_to_add = None; best_item_pos = None
-                best_item_metric = 9e18; best_item_index_in_pool = -1
-                best_item_weight = 0.0
+                # 3. "BEST-FIT" PLATZIERUNGSLOGIK (im Batch-Modus mehrere Items pro Runde)
+                items_added = 0; added_area = 0.0
                 skipped_due_to_weight = False
-
-                for i, item_template in enumerate(unplaced_pool):
-                    item_weight = item_template[IDX_WEIGHT]
-
-                    if current_weight + item_weight > self.max_container_weight:
-                        skipped_due_to_weight = True
-                        continue # Zu schwer
-
-                    # --- KORREKTUR 1: Argumente hier übergeben ---
-                    pos_1, metric_1 = self._find_best_position_jit(
-                        item_template, global_best_config,
-                        self.params['MAX_PLACEMENT_TRIES'],
-                        self.params['AREA_W'], self.params['AREA_H']
+                while items_added < max_items_per_round and unplaced_pool:
+                    insertion, skipped_due_to_weight = self._find_best_insertion(
+                        global_best_config, unplaced_pool, current_weight
                     )
-
-                    pos_2 = np.array([-1.0, -1.0]); metric_2 = 9e18
-                    rotated_template = None
-                    is_rect = item_template[IDX_GEOM_TYPE] == GEOM_RECT
-                    is_not_square = item_template[IDX_W] != item_template[IDX_H]
-
-                    if is_rect and is_not_square:
-                        rotated_template = item_template.copy()
-                        rotated_template[IDX_W] = item_template[IDX_H_ORIG]
-                        rotated_template[IDX_H] = item_template[IDX_W_ORIG]
-                        rotated_template[IDX_W_ORIG] = item_template[IDX_W]
-                        rotated_template[IDX_H_ORIG] = item_template[IDX_H]
-
-                        # --- KORREKTUR 2: Argumente hier übergeben ---
-                        pos_2, metric_2 = self._find_best_position_jit(
-                            rotated_template, global_best_config,
-                            self.params['MAX_PLACEMENT_TRIES'],
-                            self.params['AREA_W'], self.params['AREA_H']
-                        )
-
-                    # --- Entscheidung: Beste Ausrichtung ---
-                    current_best_metric = 9e18; current_best_pos = None; current_best_template = None
-                    pos1_valid = pos_1[0] != -1.0
-                    pos2_valid = pos_2[0] != -1.0
-
-                    if pos1_valid and (not pos2_valid or metric_1 <= metric_2):
-                        current_best_metric = metric_1; current_best_pos = pos_1; current_best_template = item_template
-                    elif pos2_valid:
-                        current_best_metric = metric_2; current_best_pos = pos_2; current_best_template = rotated_template
-
-                    # --- Entscheidung: Bester Kandidat bisher? ---
-                    if current_best_metric < best_item_metric and current_best_pos is not None:
-                        best_item_metric = current_best_metric; best_item_pos = current_best_pos
-                        best_item_to_add = current_best_template; best_item_index_in_pool = i
-                        best_item_weight = item_weight
-
-                # 4. HINZUFÜGEN / ENDE
-                if best_item_to_add is not None:
-                    new_item = best_item_to_add.copy()
-                    new_item[IDX_X], new_item[IDX_Y] = best_item_pos[0], best_item_pos[1]
+                    if insertion is None:
+                        break
+                    new_item, pool_index, metric, item_weight = insertion
                     global_best_config = np.vstack([global_best_config, new_item])
-                    current_weight += best_item_weight
-                    unplaced_pool.pop(best_item_index_in_pool)
+                    runner.add_item(new_item)
+                    current_weight += item_weight
+                    unplaced_pool.pop(pool_index)
+                    items_added += 1; added_area += new_item[IDX_AREA]
+                    print(f" -> Objekt {global_best_config.shape[0]} hinzugefügt (Metrik: {metric:.2f}, Gewicht: {item_weight:.2f} kg).")
+
+                self._record_round(current_packing_round, items_added, iterations_used, start_time)
+                self._report_progress(current_packing_round, global_best_config, total_items_in_pool,
+                                      best_cost_this_round, process_start)
+
+                # 4. WEITER / RE-ANNEALING / ENDE
+                if items_added > 0:
                     current_packing_round += 1
-                    package_added = True
-                    print(f" -> Objekt {global_best_config.shape[0]} hinzugefügt (Metrik: {best_item_metric:.2f}, Gewicht: {best_item_weight:.2f} kg).")
-
-                if not package_added:
-                    if skipped_due_to_weight:
-                        print(f"\n!!! ENDE: Gewichtslimit erreicht. Konnte kein weiteres Objekt hinzufügen, ohne {self.max_container_weight} kg zu überschreiten (Pool: {len(unplaced_pool)} übrig). !!!")
-                    else:
-                        print(f"\n!!! ENDE: Kein Platz gefunden. Konnte für keines der verbleibenden Objekte eine gültige Position finden (Pool: {len(unplaced_pool)} übrig). !!!")
-                    break
+                    if batch_mode:
+                        iter_budget = self._batch_iteration_budget(added_area, global_best_config)
+                    continue
+
+                if batch_mode and iter_budget < full_iter_limit:
+                    print(" -> Einfügen gescheitert. Vollständiges Re-Annealing vor dem nächsten Versuch.")
+                    current_packing_round += 1
+                    iter_budget = full_iter_limit
+                    continue
 
+                if skipped_due_to_weight:
+                    print(f"\n!!! ENDE: Gewichtslimit erreicht. Konnte kein weiteres Objekt hinzufügen, ohne {self.max_container_weight} kg zu überschreiten (Pool: {len(unplaced_pool)} übrig). !!!")
+                else:
+                    print(f"\n!!! ENDE: Kein Platz gefunden. Konnte für keines der verbleibenden Objekte eine gültige Position finden (Pool: {len(unplaced_pool)} übrig). !!!")
+                break
+
+        self._print_round_report()
         return global_best_config, current_weight
 
+    def _report_progress(self, packing_round, layout, total, best_cost, process_start, finished=False):
+        """
+        Meldet den Stand an self.progress_callback, inkl. des aktuell besten Layouts
+        (nicht kopieren, nur lesen). Die Restzeit wird aus der Zeit je platziertem Item geschätzt.
+        """
+        if self.progress_callback is None:
+            return
+        elapsed = time.time() - process_start
+        placed = layout.shape[0]
+        self.progress_callback({
+            "round": packing_round, "placed": int(placed), "total": int(total), "layout": layout,
+            "best_cost": float(best_cost), "elapsed": elapsed,
+            "eta": 0.0 if finished else elapsed / max(1, placed) * (total - placed),
+        })
+
+    @staticmethod
+    def _format_stop_reasons(run_stats):
+        """Zählt die Abbruchgründe der Läufe einer Runde, z.B. '3x Stagnation, 1x Iterationslimit'."""
+        counts = {}
+        for stats in run_stats:
+            name = STOP_REASON_NAMES[int(stats[STAT_STOP_REASON])]
+            counts[name] = counts.get(name, 0) + 1
+        return ", ".join(f"{count}x {name}" for name, count in counts.items())
+
+    def _record_round(self, round_number, items_added, iterations, start_time):
+        self.round_report.append({
+            "round": round_number,
+            "items_added": items_added,
+            "sa_iterations": iterations,
+            "duration_s": time.time() - start_time,
+        })
+
+    def _print_round_report(self):
+        """Zusammenfassung zum Tunen des Schedulers: Runden, Items/Runde, Zeit/Runde."""
+        if not self.round_report:
+            return
+        rounds = len(self.round_report)
+        items = sum(r["items_added"] for r in self.round_report)
+        total_time = sum(r["duration_s"] for r in self.round_report)
+        print(f"Runden: {rounds} | Items/Runde: {items / rounds:.2f} | Zeit/Runde: {total_time / rounds:.2f}s | Gesamt: {total_time:.2f}s")
+
 # --- EXPORT-FUNKTIONEN ---
 
 def plot_final_solution(config, params, type_desc, output_filename="final_packing_plan.png"):
@@ -636,6 +1527,35 @@ def update_and_save_order_json(original_data_root, final_solution_numpy, id_map,
         print(f"JSON-Datei ('{os.path.basename(output_filename)}') erfolgreich mit Platzierungen aktualisiert.")
     except Exception as e:
         print(f"FEHLER beim Speichern der finalen JSON-Datei: {e}")
+# -------------------- STANDARD-PARAMETER --------------------
+
+def default_parameters(AREA_W, AREA_H, num_cpus=None):
+    """Standard-Parametersatz der PackerEngine für eine Containerfläche AREA_W x AREA_H."""
+    if num_cpus is None:
+        num_cpus = multiprocessing.cpu_count()
+    return {
+        "NUM_SA_RUNS": num_cpus * 2, "NUM_PROCESSES": num_cpus, "RANDOM_SEED": 1,
+        "AREA_W": AREA_W, "AREA_H": AREA_H,
+        "INITIAL_TEMP": 1.0, "COOLING_RATE": 0.9997,
+        "ITER_LIMIT": 100000, # Ggf. erhöhen
+        "SWAP_PROBABILITY": 0.20, "TELEPORT_PROBABILITY": 0.15,
+        "ROTATE_PROBABILITY": 0.10, "MAX_MOVE_MULTIPLIER": 8.0,
+        "WEIGHT_Y": 1.0, "WEIGHT_X": 1.0,
+        "WEIGHT_BOX_AREA": 500.0,
+        "WEIGHT_GROUPING": 0.5,
+        "MAX_PLACEMENT_TRIES": 3000, # Nur für PLACEMENT_STRATEGY 'random'
+        "PLACEMENT_STRATEGY": DEFAULT_PLACEMENT_STRATEGY,
+        "USE_SHARED_MEMORY": False, # True: persistente Worker, Layout via shared_memory
+        "BATCH_INSERTION": False,   # True: mehrere Items pro Runde, SA-Budget nach Änderung
+        "BATCH_MAX_ITEMS": 8, "BATCH_MIN_ITER": 2000,
+        "PARALLEL_TEMPERING": False, # True: Replikas auf fester Temperaturleiter mit Tausch
+        "PT_TEMP_MIN": 0.01, "PT_TEMP_MAX": 1.0, "PT_SEGMENT_ITER": 2000,
+        # Vorzeitiger Abbruch der SA-Läufe, standardmäßig aus wie in SA_PARAM_DEFAULTS (0 = aus)
+        "STALL_ITERATIONS": 0,     # Iterationen ohne neuen Bestwert, z. B. 20000
+        "MIN_TEMP": 0.0,           # Mindesttemperatur, z. B. 1e-4
+        "ROUND_TIME_BUDGET": 0.0,  # Sekunden pro Runde und Lauf
+    }
+
 # -------------------- HAUPTPROGRAMM (Headless) --------------------
 if __name__ == "__main__":
 
@@ -668,18 +1588,7 @@ if __name__ == "__main__":
     original_json_data_root = parser.get_raw_data() # <<< NEUER NAME DER GETTER-FUNKTION
 
     # --- SCHRITT 2: PARAMETER ERSTELLEN ---
-    parameters = {
-        "NUM_SA_RUNS": num_cpus * 2, "RANDOM_SEED": 1,
-        "AREA_W": AREA_W, "AREA_H": AREA_H,
-        "INITIAL_TEMP": 1.0, "COOLING_RATE": 0.9997,
-        "ITER_LIMIT": 100000, # Ggf. erhöhen
-        "SWAP_PROBABILITY": 0.20, "TELEPORT_PROBABILITY": 0.15,
-        "ROTATE_PROBABILITY": 0.10, "MAX_MOVE_MULTIPLIER": 8.0,
-        "WEIGHT_Y": 1.0, "WEIGHT_X": 1.0,
-        "WEIGHT_BOX_AREA": 500.0,
-        "WEIGHT_GROUPING": 0.5,
-        "MAX_PLACEMENT_TRIES": 3000,
-    }
+    parameters = default_parameters(AREA_W, AREA_H, num_cpus)
 
     # --- SCHRITT 3: BERECHNUNG STARTEN ---
     random.seed(parameters['RANDOM_SEED'])
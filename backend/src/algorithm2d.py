@@ -0,0 +1,12 @@
+"""
+Importierbarer Name für den 2D-Packer. "Algorithm2d - Kopie.py" lässt sich wegen der
+Leerzeichen nicht per import laden; dieses Modul führt die Datei in seinem eigenen
+Namensraum aus. Damit finden auch Pool-Worker, die per spawn starten (Standard unter
+Windows und macOS), Funktionen wie algorithm2d._run_sa_worker beim Entpickeln.
+"""
+import os
+
+PACKER_PFAD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Algorithm2d - Kopie.py")
+
+with open(PACKER_PFAD, encoding="utf-8") as _datei:
+    exec(compile(_datei.read(), PACKER_PFAD, "exec"))
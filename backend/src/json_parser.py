@@ -1,7 +1,7 @@
 
 import json
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import json
 from typing import Dict, Any
 import os
@@ -13,6 +13,7 @@ import sys
 import os
 # import the Objekt class from the 3dimensional.py file
 from three_dimensional import Objekt
+from object_table import ObjectTable
 
 @dataclass
 class ContainerDim:
@@ -20,6 +21,7 @@ class ContainerDim:
     width: float
     height: float
     max_weight: float
+    type: str = ""
 
 
 class JSONParser:
@@ -31,6 +33,10 @@ class JSONParser:
         with open(file_path, "r", encoding="utf-8") as f:
             self.json_data =  json.load(f)
         return
+
+    def load_data(self, json_data: Dict[str, Any]) -> None:
+        """Use an already parsed order dict instead of reading a file."""
+        self.json_data = json_data
     
     def get_container_dimensions(self) -> ContainerDim:
         order = self.json_data.get("order")
@@ -48,9 +54,30 @@ class JSONParser:
             length=container_length,
             width=container_width, 
             height=container_height,
-            max_weight=container_weight
+            max_weight=container_weight,
+            type=container.get("type", "")
             )
         return container_dim
+
+    def get_container_list(self) -> List[ContainerDim]:
+        """One ContainerDim per usable container instance.
+
+        Definitions with use == false are skipped, the others are repeated
+        'numbers' times (missing or null fields: use = true, numbers = 1).
+        """
+        containers = []
+        for container in self.json_data.get("order", {}).get("container_definitions", []):
+            if not container.get("use", True):
+                continue
+            for _ in range(int(container.get("numbers") or 1)):
+                containers.append(ContainerDim(
+                    length=container["inner_dimensions"]["length"],
+                    width=container["inner_dimensions"]["width"],
+                    height=container["inner_dimensions"]["height"],
+                    max_weight=container["max_weight_kg"],
+                    type=container.get("type", ""),
+                ))
+        return containers
     
     def get_objects(self) -> List[Objekt]:
         order = self.json_data.get("order")
@@ -59,41 +86,59 @@ class JSONParser:
         all_objects = []
         for obj in objects_data:
             quantity = obj.get("quantity", 1)
-            form = obj.get("form", {})
             for i in range(quantity):
-                obj_height = form.get("height", 0)
                 obj_name = obj.get("product_name", "Unnamed")
-                obj_name = f"{obj_name}_{i+1}"
-                obj_type = form.get("type", "rectangle")
-                obj_weight = obj.get("weight_kg", 0)
-                objekt = None
-                if str.__eq__(str(obj_type), "rectangle"):
-                    # make list of params
-                    params = [form.get("length", 0), form.get("width", 0)]
-                    objekt = Objekt(
-                    name=obj_name,
-                    form="Quader",
-                    params=params,
-                    hoehe=obj_height,
-                    gewicht_kg=obj_weight,
-                    )
-                    all_objects.append(objekt)
-                elif str.__eq__(str(obj_type), "cylinder"):
-                    radius = form.get("radius", 0)
-                    params = [radius]
-                    objekt = Objekt(
-                    name=obj_name,
-                    form="Zylinder",
-                    params=params,
-                    hoehe=obj_height,
-                    gewicht_kg=obj_weight,
-                )
-                    all_objects.append(objekt)
-                else:
-                    raise ValueError(f"Unknown object type: Check JSON input for object", obj_type)
+                all_objects.append(self._create_objekt(obj, f"{obj_name}_{i+1}"))
 
         return all_objects
 
+    def get_object_types(self) -> List[Tuple[Objekt, int]]:
+        """Like get_objects, but one Objekt per order line (named after the product) with its quantity."""
+        order = self.json_data.get("order")
+        objects_data = order.get("objects", [])
+        print("Number of objects in JSON:", len(objects_data))
+        object_types = []
+        for obj in objects_data:
+            quantity = obj.get("quantity", 1)
+            if quantity <= 0:
+                continue
+            object_types.append((self._create_objekt(obj, obj.get("product_name", "Unnamed")), quantity))
+
+        return object_types
+
+    def get_object_table(self) -> ObjectTable:
+        """All pieces of the order as one array-backed ObjectTable (no Objekt instance per piece)."""
+        return ObjectTable.from_order(self.json_data)
+
+    def _create_objekt(self, obj: Dict[str, Any], obj_name: str) -> Objekt:
+        """Create one Objekt instance from an order line of the JSON."""
+        form = obj.get("form", {})
+        obj_height = form.get("height", 0)
+        obj_type = form.get("type", "rectangle")
+        obj_weight = obj.get("weight_kg", 0)
+        if str.__eq__(str(obj_type), "rectangle"):
+            # make list of params
+            params = [form.get("length", 0), form.get("width", 0)]
+            return Objekt(
+                name=obj_name,
+                form="Quader",
+                params=params,
+                hoehe=obj_height,
+                gewicht_kg=obj_weight,
+            )
+        elif str.__eq__(str(obj_type), "cylinder"):
+            radius = form.get("radius", 0)
+            params = [radius]
+            return Objekt(
+                name=obj_name,
+                form="Zylinder",
+                params=params,
+                hoehe=obj_height,
+                gewicht_kg=obj_weight,
+            )
+        else:
+            raise ValueError(f"Unknown object type: Check JSON input for object", obj_type)
+
     def object_to_dir(self, object:Objekt):
         """Convert Objekt instance to dictionary for JSON serialization."""
         obj_dir = {
@@ -220,6 +265,7 @@ class JSONParser:
             
             # ID des Objekts direkt darunter (für stack_level)
             id_unten = None 
+            basis_objekt = None # Basis des Stapels (j == 0), bleibt für die Objekte darüber gesetzt
             
             # Die ID (integer) muss aus dem Namen extrahiert werden (z.B. "Produkt_1" -> 1)
             def get_obj_id(obj_name):
@@ -267,7 +313,6 @@ class JSONParser:
                 # Da alle Objekte zentriert sind und die Basisposition die untere linke Ecke der Basis ist, 
                 # muss die Position des aktuellen Objekts (j) so angepasst werden, dass:
                 # (position_x + obj_len/2) = (base_position_x + basis_len/2)
-                basis_objekt = None
                 if j == 0:
                     # Basis: Nimmt die Platzierung des Aggregierten Stapels an.
                     position_x = base_position_x
@@ -1,186 +1,268 @@
-from ast import List
-import networkx as nx
+import copy
 import math
 import time
 
-from pyparsing import Dict
+import numpy as np
 from three_dimensional import Objekt
+from object_table import ObjectTable, FORM_QUADER, FORM_ZYLINDER
+from stapel_partition import StapelPartitionierer, DEADLINE_SEKUNDEN
+from stapel_jit import dp_stapel_jit, extrahiere_ketten_jit
 # Konstanten für die Beschränkung
 TOP_K_BASEN = 12
 TIMEOUT_SEKUNDEN = 180 # 3 Minuten
+RELATION_BLOCK_ZEILEN = 512 # Zeilen pro Block beim Aufbau der exakten Relation
+
+
+def fuelle_hoehe_bitset(hoehen_mm, kapazitaet_mm):
+    """
+    Subset-Sum über ganzzahlige Höhen (mm) mit einem Python-Int als Bitset: Bit h ist
+    gesetzt, wenn Höhe h erreichbar ist. Gleiche Höhen werden gebündelt (binäre
+    Zerlegung der Stückzahl), Aufwand O(Kandidaten x Kapazität / Wortbreite).
+    Gibt (Indizes der gewählten Kandidaten, erreichte Höhe) zurück.
+    """
+    if kapazitaet_mm <= 0 or not hoehen_mm:
+        return [], 0
+    maske = (1 << (kapazitaet_mm + 1)) - 1
+    nach_hoehe = {}
+    for idx, h in enumerate(hoehen_mm):
+        if 0 < h <= kapazitaet_mm:
+            nach_hoehe.setdefault(h, []).append(idx)
+
+    # Binäre Zerlegung: Pakete aus 1, 2, 4, ... Stück derselben Höhe
+    pakete = []
+    for h, indizes in nach_hoehe.items():
+        rest = len(indizes); stueck = 1
+        while rest > 0:
+            k = min(stueck, rest)
+            pakete.append((h, k)); rest -= k; stueck *= 2
+
+    erreichbar = [1]
+    for h, k in pakete:
+        erreichbar.append((erreichbar[-1] | (erreichbar[-1] << (h * k))) & maske)
+    beste_hoehe = erreichbar[-1].bit_length() - 1
+
+    # Rückverfolgung: Paket genutzt, wenn die Höhe ohne es nicht erreichbar war
+    benoetigt = {}
+    hoehe = beste_hoehe
+    for p in range(len(pakete) - 1, -1, -1):
+        if not (erreichbar[p] >> hoehe) & 1:
+            h, k = pakete[p]
+            benoetigt[h] = benoetigt.get(h, 0) + k
+            hoehe -= h * k
+    gewaehlt = [idx for h, k in benoetigt.items() for idx in nach_hoehe[h][:k]]
+    return gewaehlt, beste_hoehe
+
+
+class TraegerRelation:
+    """
+    Implizite Träger-Relation ("unten kann 'oben' tragen") auf NumPy-Arrays statt
+    eines networkx-Graphen mit n² Kanten.
+
+    - Flächenregel (kann_traeger_sein_fuer): A_oben <= A_unten. Gespeichert wird nur
+      die nach Grundfläche sortierte Reihenfolge; eine Zeile ist ein Vergleich gegen
+      die Flächen (Dominanz-Index), es wird nichts pro Paar abgelegt.
+    - Exakte Geometrie (kann_traeger_sein_fuer_no_overlap): Die Relation wird
+      blockweise vektorisiert berechnet und als Bitset (np.packbits, n x n/8 Byte) gespeichert.
+
+    'objekte' ist eine Liste von Objekt-Instanzen oder eine ObjectTable (Spalten direkt).
+    """
+
+    def __init__(self, objekte, exakt=False):
+        self.objekte = objekte
+        self.exakt = exakt
+        self.anzahl = len(objekte)
+        if isinstance(objekte, ObjectTable):
+            self.flaechen = objekte.grundflaeche; self.hoehen = objekte.hoehe
+            self.ist_zylinder = objekte.form == FORM_ZYLINDER; self.ist_quader = objekte.form == FORM_QUADER
+            self.radius = objekte.radius; self.laenge = objekte.laenge; self.breite = objekte.breite
+        else:
+            self.flaechen = np.array([obj.grundflaeche for obj in objekte], dtype=float)
+            self.hoehen = np.array([obj.hoehe for obj in objekte], dtype=float)
+            self.ist_zylinder = np.array([obj.form == 'Zylinder' for obj in objekte], dtype=bool)
+            self.ist_quader = np.array([obj.form == 'Quader' for obj in objekte], dtype=bool)
+            self.radius = np.array([obj.abmessungen.get('radius', 0.0) for obj in objekte], dtype=float)
+            self.laenge = np.array([obj.abmessungen.get('laenge', 0.0) for obj in objekte], dtype=float)
+            self.breite = np.array([obj.abmessungen.get('breite', 0.0) for obj in objekte], dtype=float)
+        # Absteigend nach Grundfläche, stabil (wie sorted(..., reverse=True))
+        self.reihenfolge = np.argsort(-self.flaechen, kind="stable")
+        self.bits = self._erzeuge_bitset() if exakt else None
+
+    def _erzeuge_bitset(self):
+        """Berechnet kann_traeger_sein_fuer_no_overlap für alle Paare, blockweise."""
+        n = self.anzahl
+        ist_zylinder, ist_quader = self.ist_zylinder, self.ist_quader
+        radius, laenge, breite = self.radius, self.laenge, self.breite
+        halbdiagonale = np.sqrt((laenge / 2) ** 2 + (breite / 2) ** 2)
+
+        bits = np.zeros((n, (n + 7) // 8), dtype=np.uint8)
+        for start in range(0, n, RELATION_BLOCK_ZEILEN):
+            u = slice(start, min(n, start + RELATION_BLOCK_ZEILEN)) # Zeilen: unten, Spalten: oben
+            zz = ist_zylinder[u, None] & ist_zylinder[None, :]
+            qq = ist_quader[u, None] & ist_quader[None, :]
+            qz = ist_quader[u, None] & ist_zylinder[None, :]  # Zylinder auf Quader
+            zq = ist_zylinder[u, None] & ist_quader[None, :]  # Quader auf Zylinder
+            passt = np.ones(zz.shape, dtype=bool) # Unbekannte Formen: nur Flächenregel
+            passt[zz] = (radius[None, :] <= radius[u, None])[zz]
+            passt[qq] = ((laenge[None, :] <= laenge[u, None]) & (breite[None, :] <= breite[u, None]))[qq]
+            passt[qz] = ((2 * radius[None, :] <= laenge[u, None]) & (2 * radius[None, :] <= breite[u, None]))[qz]
+            passt[zq] = (halbdiagonale[None, :] <= radius[u, None])[zq]
+            passt &= self.flaechen[None, :] <= self.flaechen[u, None]
+            passt[np.arange(u.stop - start), np.arange(start, u.stop)] = False
+            bits[u] = np.packbits(passt, axis=1)
+        return bits
+
+    def traeger_maske(self, i):
+        """Bool-Maske aller Objekte j != i, die direkt auf Objekt i gestapelt werden können."""
+        if self.bits is not None:
+            return np.unpackbits(self.bits[i], count=self.anzahl).view(bool)
+        maske = self.flaechen <= self.flaechen[i]
+        maske[i] = False
+        return maske
+
+    def traeger_von(self, j):
+        """Bool-Maske aller Objekte i != j, auf die Objekt j direkt gestapelt werden kann (Spalte j)."""
+        if self.bits is not None:
+            return ((self.bits[:, j >> 3] >> (7 - (j & 7))) & 1).astype(bool)
+        maske = self.flaechen >= self.flaechen[j]
+        maske[j] = False
+        return maske
+
+    def traegt(self, i, j):
+        """Kann Objekt i direkt Objekt j tragen?"""
+        if i == j:
+            return False
+        if self.bits is not None:
+            return bool((self.bits[i, j >> 3] >> (7 - (j & 7))) & 1)
+        return self.flaechen[j] <= self.flaechen[i]
+
+    def nachfolger(self, i):
+        """Indizes der möglichen direkten Nachfolger von i (aufsteigend wie früher die Graphkanten)."""
+        return np.flatnonzero(self.traeger_maske(i))
 
 
 class StapelOptimierer:
-
-    def __init__(self, objekte, max_hoehe, verbose=False):
+    """
+    Stapelt Objekte bis max_hoehe. Mit 'anzahlen' steht jedes Objekt für einen
+    Produkttyp mit dieser Stückzahl (siehe JSONParser.get_object_types); gerechnet
+    wird dann auf Typ-Ebene und erst das Ergebnis zu Einzelstücken expandiert.
+    Für Einzelstücke wählt 'modus' das Verfahren: "partition" (alle Objekte in Ketten,
+    siehe StapelPartitionierer), "hoehe" (Stapel füllen max_hoehe per Bitset-DP aus)
+    oder "top_k" (bisherige DP mit TOP_K_BASEN).
+    Mit 'cache' (StapelCache) liefert loese_ketten wiederholte Bestellungen aus dem Cache.
+    """
+
+    def __init__(self, objekte, max_hoehe, verbose=False, exakte_geometrie=False, anzahlen=None,
+                 modus="partition", deadline_sekunden=DEADLINE_SEKUNDEN, cache=None):
         self.objekte = objekte
         self.max_hoehe = max_hoehe
         self.verbose = verbose
-        self.graph = nx.DiGraph()
-        self.erzeuge_graphen()
+        self.anzahlen = anzahlen
+        self.modus = modus
+        self.deadline_sekunden = deadline_sekunden
+        self.exakte_geometrie = exakte_geometrie
+        self.cache = cache
+        self._relation = None
+        self._graph = None
+
+    @property
+    def relation(self):
+        """TraegerRelation der Objekte; erst bei Bedarf erzeugt (Cache-Treffer brauchen sie nicht)."""
+        if self._relation is None:
+            self._relation = TraegerRelation(self.objekte, exakt=self.exakte_geometrie)
+        return self._relation
+
+    @property
+    def graph(self):
+        """networkx-Graph der Relation; wird nur noch bei Bedarf (Debug/Visualisierung) erzeugt."""
+        if self._graph is None:
+            self.erzeuge_graphen()
+        return self._graph
 
     def erzeuge_graphen(self):
-        """Erstellt den gerichteten Abhängigkeitsgraphen."""
-        self.graph.add_nodes_from(self.objekte)
-
-        for i in range(len(self.objekte)):
-            for j in range(len(self.objekte)):
-                if i == j:
-                    continue
-                unten = self.objekte[i]
+        """Erstellt den gerichteten Abhängigkeitsgraphen aus der Träger-Relation."""
+        import networkx as nx # Nicht im Hot-Path, daher erst hier importiert
+        self._graph = nx.DiGraph()
+        self._graph.add_nodes_from(self.objekte)
+
+        for i, unten in enumerate(self.objekte):
+            # Kante (unten -> oben) bedeutet: Objekt 'oben' kann direkt auf 'unten' gestapelt werden
+            for j in self.relation.nachfolger(i):
                 oben = self.objekte[j]
-
-                # Regel 1: Kann_Träger_sein_fuer muss erfüllt sein (A_oben <= A_unten)
-                if unten.kann_traeger_sein_fuer(oben):
-                    # Regel 2: Die Kante stellt nur einen möglichen direkten Schritt dar.
-                    # Die Höhenprüfung findet im Algorithmus (DP) statt, da sie vom gesamten Pfad abhängt.
-                    
-                    # Kante (unten -> oben) bedeutet: Objekt 'oben' kann direkt auf 'unten' gestapelt werden
-                    self.graph.add_edge(unten, oben, gewicht=oben.hoehe)
+                self._graph.add_edge(unten, oben, gewicht=oben.hoehe)
         if self.verbose:
             print("Erzeugter Stapelgraph mit Kanten:")
-            for u, v, data in self.graph.edges(data=True):
+            for u, v, data in self._graph.edges(data=True):
                 print(f"  {u.name} -> {v.name} (Gewicht: {data['gewicht']})")
 
-# ... (Klasse Objekt und Klasse StapelOptimierer initialisierung bleibt unverändert) ...
-
 # --------------------------------------------------------------------------------------------------
-# Der DP-Schritt (finde_optimale_stapel) bleibt unverändert, da er die Basis-Informationen berechnet
+# DP-Schritt: Stapel mit den meisten Objekten je Basisobjekt, kompiliert in stapel_jit.dp_stapel_jit
 # --------------------------------------------------------------------------------------------------
 
     def finde_optimale_stapel(self):
-        # ... (print-Ausgaben des Graphen) ...
-        
-        # Sortierung: Absteigend nach Grundfläche (größere Objekte zuerst)
-        objekte_sortiert = sorted(self.objekte, key=lambda o: o.grundflaeche, reverse=True)
-
-        # KORREKTUR: Jedes Objekt ist initial ein Stapel der Länge 1 mit seiner eigenen Höhe.
-        # DP-Speicher: Speichert (maximale_objekte, hoehe_verbraucht, nachfolger)
-        optimale_stapel_info = {obj: (1, obj.hoehe, None) for obj in objekte_sortiert} 
-
-        for i in range(len(objekte_sortiert) - 1, -1, -1):
-            unten = objekte_sortiert[i]
-            # Der beste Stapel muss mindestens das Objekt selbst sein (Länge 1, eigene Höhe)
-            beste_folgestapelung = (1, unten.hoehe, None) 
-
-            # Suche nach dem besten direkten Nachfolger J
-            for oben in self.graph.neighbors(unten):
-                anzahl_j, hoehe_j, nachfolger_j = optimale_stapel_info[oben]
-                
-                # Wenn der Folgestapel J die Länge 1 hat (Objekt J selbst), muss die Gesamthöhe geprüft werden.
-                # Wenn der Folgestapel länger ist, ist die Höhe J bereits die Höhe des Stapels, 
-                # der auf J beginnt.
-                
-                neue_gesamthoehe = unten.hoehe + (hoehe_j - oben.hoehe) + oben.hoehe # = unten.hoehe + hoehe_j (ist korrekt)
-                
-                neue_gesamthoehe = unten.hoehe + hoehe_j # (Formel ist logisch richtig, wenn hoehe_j die Höhe des Sub-Stapels ist)
-
-                neue_anzahl = anzahl_j + 1
-                
-                if neue_gesamthoehe <= self.max_hoehe:
-                    # Wähle den Nachfolger, der die meisten Objekte bringt
-                    # oder bei gleicher Anzahl den, der flacher ist (optional, aber stabilisiert)
-                    if neue_anzahl > beste_folgestapelung[0]:
-                        beste_folgestapelung = (neue_anzahl, neue_gesamthoehe, oben)
-                    # Optional: Bei gleicher Länge den flacheren wählen (kann die Lösung stabilisieren)
-                    # elif neue_anzahl == beste_folgestapelung[0] and neue_gesamthoehe < beste_folgestapelung[1]:
-                    #     beste_folgestapelung = (neue_anzahl, neue_gesamthoehe, oben)
-
-            
-            # Update des aktuellen Objekts:
-            anzahl_gesamter_stapel, hoehe_gesamter_stapel, nachfolger = beste_folgestapelung
-            
-            optimale_stapel_info[unten] = (
-                anzahl_gesamter_stapel, 
-                hoehe_gesamter_stapel,
-                nachfolger
-            )
-            # ... (Debug-Ausgaben)
-        return optimale_stapel_info
-# --------------------------------------------------------------------------------------------------
-# ANGEPASSTER loese_problem-Schritt mit TOP-K und TIMEOUT
-# --------------------------------------------------------------------------------------------------
-
-# ... (Klasse Objekt, StapelOptimierer.__init__, _erzeuge_graphen und finde_optimale_stapel bleiben unverändert) ...
+        """
+        DP über die Träger-Relation: Für jedes Objekt (von der kleinsten Grundfläche
+        aufwärts) wird der Nachfolger gewählt, der den Stapel mit den meisten Objekten
+        innerhalb von max_hoehe liefert. Bei gleicher Anzahl gewinnt der erste in
+        Objektreihenfolge. Gibt {obj: (anzahl, hoehe, nachfolger)} zurück.
+        """
+        anzahl, hoehe, nachfolger = self._dp_arrays()
+        objekte = self.objekte
+        return {
+            objekte[i]: (int(anzahl[i]), float(hoehe[i]), objekte[nachfolger[i]] if nachfolger[i] >= 0 else None)
+            for i in self.relation.reihenfolge # Schlüsselreihenfolge wie bisher (absteigende Grundfläche)
+        }
+
+    def _dp_arrays(self):
+        """DP als Arrays (anzahl, hoehe, nachfolger-Index), kompiliert in stapel_jit.dp_stapel_jit."""
+        relation = self.relation
+        bits = relation.bits if relation.bits is not None else np.zeros((1, 1), dtype=np.uint8)
+        return dp_stapel_jit(
+            relation.reihenfolge.astype(np.int64), relation.flaechen.astype(np.float64),
+            relation.hoehen.astype(np.float64), bits, relation.bits is not None, float(self.max_hoehe),
+        )
 
 # --------------------------------------------------------------------------------------------------
-# KORRIGIERTER loese_problem-Schritt mit Top-K, Timeout und disjunkter Stapelrekonstruktion
+# Stapelauswahl: modus "partition" (Standard), "hoehe" oder "top_k" (DP-Pfade der Top-K-Basen)
 # --------------------------------------------------------------------------------------------------
 
     def loese_problem(self):
-        """Wendet DP an und wählt gierig die Stapel aus (mit Top-K und Timeout-Beschränkung)."""
-        
+        """
+        Stapel im gewählten 'modus' als (stapel, gesamt_grundflaeche); mit 'anzahlen' auf
+        Typ-Ebene. "top_k" wählt gierig die DP-Pfade der TOP_K_BASEN effizientesten Basen,
+        der Rest wird zu Einzelstapeln.
+        """
+        if self.anzahlen is not None:
+            stapel_muster, gesamt_grundflaeche = self.loese_problem_typen()
+            return self.expandiere_stapel_muster(stapel_muster), gesamt_grundflaeche
+        if self.modus == "partition":
+            return self.loese_problem_partition()
+        if self.modus == "hoehe":
+            return self.loese_problem_hoehe()
+
         start_zeit = time.time()
-        
-        # 1. DP-Vorbereitung
-        optimale_stapel_info = self.finde_optimale_stapel()
-        
-        verbleibende_objekte = set(self.objekte)
-        fertige_stapel = [] # Enthält die Liste der Objekt-Instanzen
-        gesamt_grundflaeche = 0.0
 
-        # Sortieren der Basis-Kandidaten nach der Effizienz: ANZAHL OBJEKTE / GRUNDFLÄCHE
-        basis_kandidaten_sortiert = sorted(
-            optimale_stapel_info.keys(),
-            key=lambda o: optimale_stapel_info[o][0] / o.grundflaeche, # NEUES KRITERIUM
-            reverse=True
-        )
-        
-        # 2. Beschränkung auf die TOP-K=10 Basis-Kandidaten
-        basis_kandidaten_begrenzt = basis_kandidaten_sortiert[:TOP_K_BASEN]
+        # 1. DP (kompiliert, auf Indizes statt Objekt-Dicts)
+        anzahl, _, nachfolger = self._dp_arrays()
+        relation = self.relation
+
+        # 2. Basis-Kandidaten nach Effizienz ANZAHL OBJEKTE / GRUNDFLÄCHE (stabil wie sorted(reverse=True)),
+        #    beschränkt auf die TOP-K
+        effizienz = anzahl[relation.reihenfolge] / relation.flaechen[relation.reihenfolge]
+        basen = relation.reihenfolge[np.argsort(-effizienz, kind="stable")][:TOP_K_BASEN]
         if self.verbose:
             print(f"Beschränke die gierige Auswahl auf die Top-{TOP_K_BASEN} Stapelbasen.")
 
-        for basis in basis_kandidaten_begrenzt:
-            # 3. Timeout-Prüfung
-            if time.time() - start_zeit > TIMEOUT_SEKUNDEN:
-                print(f"⛔️ Timeout nach {TIMEOUT_SEKUNDEN} Sekunden erreicht. Beende gierige Stapelauswahl.")
-                break 
+        # 3. Disjunkte Stapelrekonstruktion entlang der DP-Pfade, Rest als Einzelstapel
+        elemente, laengen, anzahl_basis_stapel = extrahiere_ketten_jit(
+            basen.astype(np.int64), nachfolger, relation.hoehen.astype(np.float64), float(self.max_hoehe)
+        )
+        ketten = np.split(elemente, np.cumsum(laengen)[:-1]) if len(laengen) else []
+        fertige_stapel = [[self.objekte[i] for i in kette] for kette in ketten] # Listen von Objekt-Instanzen
+        gesamt_grundflaeche = float(sum(relation.flaechen[kette[0]] for kette in ketten))
 
-            # Prüfe, ob die Basis noch verfügbar ist
-            if basis not in verbleibende_objekte:
-                continue
+        if len(ketten) > anzahl_basis_stapel:
+            print(f"⚠️ {len(ketten) - anzahl_basis_stapel} Objekte konnten nicht in den Top-K Stapeln verwendet werden. Sie werden als Einzelstapel verpackt.")
 
-            # --- KORRIGIERTE STAPELREKONSTRUKTION (Iterative Verfügbarkeitsprüfung) ---
-            
-            aktueller_stapel = [basis]
-            aktuell_hoehe = basis.hoehe
-            
-            # Starte die Rekonstruktion mit dem optimalen Nachfolger aus der DP-Tabelle
-            _, _, naechster_knoten = optimale_stapel_info[basis]
-            
-            akt_knoten = naechster_knoten
-            
-            while akt_knoten:
-                # Wichtig: Prüfe, ob das Objekt verfügbar ist UND die Höhe noch passt
-                if akt_knoten in verbleibende_objekte and (aktuell_hoehe + akt_knoten.hoehe) <= self.max_hoehe:
-                    
-                    # Wenn verfügbar und stapelbar: Zum Stapel hinzufügen
-                    aktueller_stapel.append(akt_knoten)
-                    aktuell_hoehe += akt_knoten.hoehe
-                    
-                    # Gehe zum nächsten Knoten im optimalen DP-Pfad
-                    _, _, akt_knoten = optimale_stapel_info[akt_knoten]
-                else:
-                    # Der DP-Pfad ist unterbrochen (Objekt verbraucht oder Höhe überschritten)
-                    # Dies stellt sicher, dass Objekte nur einmal verwendet werden.
-                    break 
-
-            # Füge den Stapel zur Lösung hinzu und aktualisiere die Kosten
-            fertige_stapel.append(aktueller_stapel) # Füge die Liste der Objekt-Instanzen hinzu
-            gesamt_grundflaeche += basis.grundflaeche
-            
-            # Entferne ALLE verwendeten Objekte aus der Verfügbarkeitsmenge
-            for obj in aktueller_stapel:
-                verbleibende_objekte.discard(obj)
-                
-        # 4. Finalisierung: Verbleibende Objekte als Einzelstapel verpacken
-        if verbleibende_objekte:
-            print(f"⚠️ {len(verbleibende_objekte)} Objekte konnten nicht in den Top-K Stapeln verwendet werden. Sie werden als Einzelstapel verpackt.")
-            for obj in verbleibende_objekte:
-                 fertige_stapel.append([obj]) # [Objekt-Instanz]
-                 gesamt_grundflaeche += obj.grundflaeche
-        
         end_zeit = time.time()
         
         # --- KORRIGIERTE AUSGABE ---
@@ -195,6 +277,178 @@ class StapelOptimierer:
 
         return fertige_stapel, gesamt_grundflaeche            
 
+    def loese_ketten(self):
+        """
+        Stapel als Listen von Objekt-Indizes (von unten nach oben) im gewählten 'modus'
+        ("partition" oder "hoehe"). Arbeitet nur auf der Relation und eignet sich daher
+        auch für eine ObjectTable (siehe ObjectTable.setze_stapel).
+        """
+        if self.cache is None:
+            return self._berechne_ketten()
+        tabelle = self.objekte if isinstance(self.objekte, ObjectTable) else ObjectTable.from_objekte(self.objekte)
+        optionen = (self.modus, self.exakte_geometrie)
+        return self.cache.ketten(tabelle, self.max_hoehe, optionen, self._berechne_ketten)
+
+    def _berechne_ketten(self):
+        if self.modus == "hoehe":
+            return self._hoehe_ketten()
+        partitionierer = StapelPartitionierer(
+            self.objekte, self.relation, self.max_hoehe, self.deadline_sekunden, self.verbose
+        )
+        return partitionierer.partitioniere()
+
+    def loese_problem_partition(self):
+        """Zerlegt alle Objekte in höhenzulässige Stapel (StapelPartitionierer) statt Top-K + Einzelstapel."""
+        ketten = self.loese_ketten()
+        fertige_stapel = [[self.objekte[i] for i in kette] for kette in ketten]
+        gesamt_grundflaeche = sum(stapel[0].grundflaeche for stapel in fertige_stapel)
+        if self.verbose:
+            print(f"{len(fertige_stapel)} Stapel, gesamt genutzte Grundfläche: {gesamt_grundflaeche:.2f}")
+        return fertige_stapel, gesamt_grundflaeche
+
+    def loese_problem_hoehe(self):
+        """Wie loese_problem_partition, aber mit höhenfüllenden Stapeln (_hoehe_ketten)."""
+        ketten = self.loese_ketten()
+        fertige_stapel = [[self.objekte[i] for i in kette] for kette in ketten]
+        gesamt_grundflaeche = sum(stapel[0].grundflaeche for stapel in fertige_stapel)
+        if self.verbose:
+            fuellgrad = sum(sum(o.hoehe for o in stapel) for stapel in fertige_stapel) / (len(fertige_stapel) * self.max_hoehe)
+            print(f"{len(fertige_stapel)} Stapel, mittlere Höhenausnutzung {fuellgrad:.1%}, Grundfläche: {gesamt_grundflaeche:.2f}")
+        return fertige_stapel, gesamt_grundflaeche
+
+    def _hoehe_ketten(self):
+        """
+        Höhenfüllende Stapel: Jedes noch freie Objekt (absteigend nach Grundfläche) wird
+        Basis; darauf kommt die Teilmenge der von ihr tragbaren freien Objekte, die die
+        Resthöhe (in mm) am besten ausfüllt (fuelle_hoehe_bitset). Die Auswahl wird nach
+        Grundfläche geordnet; Objekte, die ihr Vorgänger nicht tragen kann (nur bei
+        exakter Geometrie möglich), bleiben frei.
+        """
+        relation = self.relation
+        # Aufrunden der Objekt- und Abrunden der Containerhöhe hält die Stapel zulässig
+        hoehen_mm = [math.ceil(h - 1e-9) for h in relation.hoehen]
+        max_hoehe_mm = math.floor(self.max_hoehe + 1e-9)
+        position = np.empty(relation.anzahl, dtype=np.int64)
+        position[relation.reihenfolge] = np.arange(relation.anzahl)
+        frei = np.ones(relation.anzahl, dtype=bool)
+        ketten = []
+
+        for basis in relation.reihenfolge:
+            if not frei[basis]:
+                continue
+            frei[basis] = False
+            kandidaten = np.flatnonzero(relation.traeger_maske(basis) & frei)
+            gewaehlt, _ = fuelle_hoehe_bitset([hoehen_mm[j] for j in kandidaten], max_hoehe_mm - hoehen_mm[basis])
+            kette = [basis]
+            for j in sorted(kandidaten[gewaehlt], key=lambda j: position[j]):
+                if relation.traegt(kette[-1], j):
+                    kette.append(j); frei[j] = False
+            ketten.append(kette)
+        return ketten
+
+    # --------------------------------------------------------------------------------------------------
+    # Typ-Ebene: Stapelmuster pro Typkombination statt pro Einzelstück
+    # --------------------------------------------------------------------------------------------------
+
+    def _finde_typ_muster(self, verfuegbar):
+        """
+        DP auf Typ-Ebene (von der kleinsten Grundfläche aufwärts): Für jeden Typ t der
+        Stapel mit den meisten Objekten, der mit k Stück von t beginnt und mit dem besten
+        Stapel eines tragbaren, später sortierten Typs weitergeht. Gibt je Typ
+        (anzahl, hoehe, [(typ, stueck), ...]) oder None zurück.
+        """
+        relation = self.relation
+        position = np.empty(relation.anzahl, dtype=np.int64)
+        position[relation.reihenfolge] = np.arange(relation.anzahl)
+        beste = [None] * relation.anzahl
+
+        for t in relation.reihenfolge[::-1]:
+            if verfuegbar[t] == 0:
+                continue
+            hoehe_t = self.objekte[t].hoehe
+
+            def stueck_bis(rest_hoehe):
+                # Wie viele Stück von t passen noch in 'rest_hoehe' (höchstens verfügbar)
+                if hoehe_t <= 0:
+                    return verfuegbar[t]
+                return min(verfuegbar[t], math.floor(rest_hoehe / hoehe_t + 1e-9))
+
+            # Ein einzelnes Objekt bildet immer einen Stapel, auch wenn es zu hoch ist
+            k = max(1, stueck_bis(self.max_hoehe))
+            bester = (k, k * hoehe_t, [(t, k)])
+            for u in relation.nachfolger(t):
+                if position[u] <= position[t] or beste[u] is None:
+                    continue # Nur bereits berechnete Typen (verhindert Zyklen bei gleicher Fläche)
+                anzahl_u, hoehe_u, muster_u = beste[u]
+                k = stueck_bis(self.max_hoehe - hoehe_u)
+                if k < 1:
+                    continue
+                kandidat = (k + anzahl_u, k * hoehe_t + hoehe_u, [(t, k)] + muster_u)
+                if kandidat[0] > bester[0] or (kandidat[0] == bester[0] and kandidat[1] < bester[1]):
+                    bester = kandidat
+            beste[t] = bester
+        return beste
+
+    def loese_problem_typen(self):
+        """
+        Gierige Auswahl auf Typ-Ebene: Das effizienteste Muster (Objekte / Grundfläche der
+        Basis) wird so oft wiederholt, wie die Stückzahlen es zulassen, danach wird mit den
+        Reststückzahlen neu gerechnet. Gibt ([(muster, wiederholungen), ...], gesamt_grundflaeche)
+        zurück, muster = [(typ_objekt, stueck), ...] von unten nach oben.
+        """
+        start_zeit = time.time()
+        verfuegbar = list(self.anzahlen)
+        stapel_muster = []
+        gesamt_grundflaeche = 0.0
+
+        while sum(verfuegbar) > 0:
+            if time.time() - start_zeit > TIMEOUT_SEKUNDEN:
+                print(f"⛔️ Timeout nach {TIMEOUT_SEKUNDEN} Sekunden erreicht. Restliche Objekte werden als Einzelstapel verpackt.")
+                break
+            beste = self._finde_typ_muster(verfuegbar)
+            basis = max(
+                (t for t in range(len(beste)) if beste[t] is not None),
+                key=lambda t: beste[t][0] / max(self.objekte[t].grundflaeche, 1e-12)
+            )
+            muster = beste[basis][2]
+            wiederholungen = min(verfuegbar[t] // stueck for t, stueck in muster)
+            for t, stueck in muster:
+                verfuegbar[t] -= stueck * wiederholungen
+            stapel_muster.append(([(self.objekte[t], stueck) for t, stueck in muster], wiederholungen))
+            gesamt_grundflaeche += self.objekte[basis].grundflaeche * wiederholungen
+
+        for t, rest in enumerate(verfuegbar):
+            if rest > 0:
+                stapel_muster.append(([(self.objekte[t], 1)], rest))
+                gesamt_grundflaeche += self.objekte[t].grundflaeche * rest
+
+        if self.verbose:
+            print(f"\n--- Ergebnis (Typ-Ebene, {time.time() - start_zeit:.4f} Sekunden) ---")
+            for muster, wiederholungen in stapel_muster:
+                print(f" {wiederholungen}x {[f'{stueck}x {typ.name}' for typ, stueck in muster]}")
+            print(f"Gesamt genutzte Grundfläche: {gesamt_grundflaeche:.2f}")
+
+        return stapel_muster, gesamt_grundflaeche
+
+    def expandiere_stapel_muster(self, stapel_muster):
+        """
+        Erzeugt aus den Mustern die konkreten Stapel (Listen von Objekt-Instanzen). Die
+        Instanzen werden wie in JSONParser.get_objects pro Typ fortlaufend benannt ("{name}_{i}").
+        """
+        zaehler = {}
+        fertige_stapel = []
+        for muster, wiederholungen in stapel_muster:
+            for _ in range(wiederholungen):
+                stapel = []
+                for typ, stueck in muster:
+                    for _ in range(stueck):
+                        zaehler[typ] = zaehler.get(typ, 0) + 1
+                        instanz = copy.copy(typ)
+                        instanz.name = f"{typ.name}_{zaehler[typ]}"
+                        stapel.append(instanz)
+                fertige_stapel.append(stapel)
+        return fertige_stapel
+
     def stapel_zu_objekten_aggregieren(self, fertige_stapel):
         """
         Aggregiert die gefundenen Stapel zu neuen, virtuellen Objekt-Instanzen.
@@ -0,0 +1,309 @@
+import numpy as np
+
+from three_dimensional import Objekt
+
+# Form-Codes (gleiche Werte wie GEOM_RECT / GEOM_CIRCLE im 2D-Packer)
+FORM_QUADER = 0
+FORM_ZYLINDER = 1
+FORM_NAMEN = {FORM_QUADER: "Quader", FORM_ZYLINDER: "Zylinder"}
+JSON_FORM_CODES = {"rectangle": FORM_QUADER, "cylinder": FORM_ZYLINDER}
+
+# Spaltenlayout der 2D-Packer-Zeilen (siehe IDX_* in "Algorithm2d - Kopie.py")
+NUM_PACKER_SPALTEN = 11
+
+
+class ObjectTable:
+    """
+    Struct-of-Arrays für alle Packstücke einer Bestellung: pro Spalte ein NumPy-Array
+    statt eines Objekt-Exemplars mit abmessungen-Dict pro Stück. Parsen, Stapeln
+    (TraegerRelation / StapelPartitionierer arbeiten auf Zeilenindizes), 2D-Packen
+    (packer_rows) und Export (stapel_ergebnis) lesen und schreiben dieselbe Tabelle.
+
+    Namen werden nicht pro Stück gespeichert, sondern aus Produkttyp und laufender
+    Nummer gebildet ("{produkt}_{instanz}", wie JSONParser.get_objects).
+    """
+
+    def __init__(self, typ_namen, typ, instanz, form, laenge, breite, radius, hoehe, gewicht,
+                 drehbar=None, stapelbar=None, max_stapel_gewicht=None, typ_ids=None):
+        n = len(typ)
+        self.typ_namen = list(typ_namen)
+        self.typ_ids = list(range(len(self.typ_namen))) if typ_ids is None else list(typ_ids) # "id" der Bestellposition
+        self.id = np.arange(n, dtype=np.int64)
+        self.typ = np.asarray(typ, dtype=np.int32)
+        self.instanz = np.asarray(instanz, dtype=np.int32)
+        self.form = np.asarray(form, dtype=np.int8)
+        self.laenge = np.asarray(laenge, dtype=float)
+        self.breite = np.asarray(breite, dtype=float)
+        self.radius = np.asarray(radius, dtype=float)
+        self.hoehe = np.asarray(hoehe, dtype=float)
+        self.gewicht = np.asarray(gewicht, dtype=float)
+        # Constraints aus der Bestellung (Standard: alles erlaubt)
+        self.drehbar = np.ones(n, dtype=bool) if drehbar is None else np.asarray(drehbar, dtype=bool)
+        self.stapelbar = np.ones(n, dtype=bool) if stapelbar is None else np.asarray(stapelbar, dtype=bool)
+        self.max_stapel_gewicht = (np.full(n, np.inf) if max_stapel_gewicht is None
+                                   else np.asarray(max_stapel_gewicht, dtype=float))
+        self.grundflaeche = np.where(self.form == FORM_ZYLINDER, np.pi * self.radius ** 2, self.laenge * self.breite)
+        # Ergebnis des Stapelns (setze_stapel)
+        self.stapel = np.arange(n, dtype=np.int32) # Ohne Stapeln: jedes Stück ein eigener Stapel
+        self.stapel_ebene = np.zeros(n, dtype=np.int32)
+        self.anzahl_stapel = n
+        # Ergebnis der 2D-Packung (setze_platzierung): untere linke Ecke, z-Offset, Drehung
+        self.position = np.full((n, 3), np.nan)
+        self.gedreht = np.zeros(n, dtype=bool)
+        self.container = np.full(n, -1, dtype=np.int64)  # Container-Instanz, -1 = nicht platziert
+
+    def __len__(self):
+        return len(self.id)
+
+    # --- Adapter: Eingabe ---
+
+    @classmethod
+    def from_order(cls, json_data):
+        """Baut die Tabelle aus dem Bestell-JSON ({"order": {"objects": [...]}}), eine Zeile je Stück."""
+        zeilen = json_data.get("order", {}).get("objects", [])
+        anzahl = np.array([zeile.get("quantity", 1) for zeile in zeilen], dtype=np.int64).reshape(-1)
+        anzahl = np.maximum(anzahl, 0)
+        formen, laenge, breite, radius, hoehe, gewicht, drehbar, stapelbar, max_gewicht = ([] for _ in range(9))
+        for zeile in zeilen:
+            form = zeile.get("form", {})
+            form_typ = str(form.get("type", "rectangle"))
+            if form_typ not in JSON_FORM_CODES:
+                raise ValueError(f"Unknown object type: Check JSON input for object", form_typ)
+            constraints = zeile.get("constraints", {})
+            formen.append(JSON_FORM_CODES[form_typ])
+            laenge.append(form.get("length", 0)); breite.append(form.get("width", 0))
+            radius.append(form.get("radius", 0)); hoehe.append(form.get("height", 0))
+            gewicht.append(zeile.get("weight_kg", 0))
+            drehbar.append(constraints.get("allow_rotation", True))
+            stapelbar.append(constraints.get("is_stackable", True))
+            max_stapel_gewicht = constraints.get("max_stack_weight_kg")
+            max_gewicht.append(np.inf if max_stapel_gewicht is None else max_stapel_gewicht)
+
+        # Eine Zeile pro Stück: Typ-Spalten per np.repeat expandieren
+        typ = np.repeat(np.arange(len(zeilen)), anzahl)
+        start = np.repeat(np.cumsum(anzahl) - anzahl, anzahl)
+        instanz = np.arange(len(typ)) - start + 1
+
+        def spalte(werte, dtype=float):
+            return np.asarray(werte, dtype=dtype).reshape(-1)[typ]
+
+        return cls(
+            [zeile.get("product_name", "Unnamed") for zeile in zeilen], typ, instanz,
+            spalte(formen, np.int8), spalte(laenge), spalte(breite), spalte(radius), spalte(hoehe),
+            spalte(gewicht), spalte(drehbar, bool), spalte(stapelbar, bool), spalte(max_gewicht),
+            [zeile.get("id", k) for k, zeile in enumerate(zeilen)],
+        )
+
+    @classmethod
+    def from_objekte(cls, objekte):
+        """Übernimmt eine Liste von Objekt-Instanzen (jede als eigener Typ mit Instanz 1)."""
+        form = [FORM_ZYLINDER if obj.form == 'Zylinder' else FORM_QUADER for obj in objekte]
+        return cls(
+            [obj.name for obj in objekte], np.arange(len(objekte)), np.ones(len(objekte)), form,
+            [obj.abmessungen.get('laenge', 0.0) for obj in objekte],
+            [obj.abmessungen.get('breite', 0.0) for obj in objekte],
+            [obj.abmessungen.get('radius', 0.0) for obj in objekte],
+            [obj.hoehe for obj in objekte], [obj.gewicht_kg for obj in objekte],
+        )
+
+    # --- Zugriff ---
+
+    def name(self, i):
+        return f"{self.typ_namen[self.typ[i]]}_{self.instanz[i]}"
+
+    def merkmale(self):
+        """
+        Physikalische Merkmale je Stück (ohne Namen/IDs) als (n, 6)-Matrix, z.B. für Fingerabdrücke.
+        Die Constraints fehlen, solange das Stapeln sie nicht auswertet.
+        """
+        return np.column_stack((
+            self.form, self.laenge, self.breite, self.radius, self.hoehe, self.gewicht,
+        )).astype(float)
+
+    def to_objekte(self, indizes=None):
+        """Objekt-Instanzen für Code, der noch mit Objekt arbeitet (nur bei Bedarf erzeugen)."""
+        indizes = range(len(self)) if indizes is None else indizes
+        return [
+            Objekt(self.name(i), FORM_NAMEN[int(self.form[i])],
+                   [self.radius[i]] if self.form[i] == FORM_ZYLINDER else [self.laenge[i], self.breite[i]],
+                   self.hoehe[i], self.gewicht[i])
+            for i in indizes
+        ]
+
+    # --- Stapeln ---
+
+    def setze_stapel(self, ketten):
+        """Trägt Stapel-ID und Ebene ein; 'ketten' sind Listen von Zeilenindizes von unten nach oben."""
+        for s, kette in enumerate(ketten):
+            kette = np.asarray(kette, dtype=np.int64)
+            self.stapel[kette] = s
+            self.stapel_ebene[kette] = np.arange(len(kette))
+        self.anzahl_stapel = len(ketten)
+
+    def z_im_stapel(self):
+        """z-Offset je Stück: Summe der Höhen darunter im selben Stapel."""
+        reihenfolge = np.lexsort((self.stapel_ebene, self.stapel))
+        hoehe_sortiert = self.hoehe[reihenfolge]
+        kumuliert = np.cumsum(hoehe_sortiert) - hoehe_sortiert
+        stapel_start = np.zeros(self.anzahl_stapel)
+        erste = np.flatnonzero(self.stapel_ebene[reihenfolge] == 0)
+        stapel_start[self.stapel[reihenfolge[erste]]] = kumuliert[erste]
+        z = np.empty(len(self)); z[reihenfolge] = kumuliert - stapel_start[self.stapel[reihenfolge]]
+        return z
+
+    def stapel_inhalte(self):
+        """
+        Kompakte Beschreibung der Stapel für Live-Ansichten: je Stapel eine Liste
+        [id der Bestellposition, Instanz, z-Offset, Höhe] von unten nach oben.
+        """
+        z = self.z_im_stapel()
+        inhalte = [[] for _ in range(self.anzahl_stapel)]
+        for i in np.lexsort((self.stapel_ebene, self.stapel)):
+            inhalte[self.stapel[i]].append([self.typ_ids[self.typ[i]], int(self.instanz[i]),
+                                            round(float(z[i]), 1), round(float(self.hoehe[i]), 1)])
+        return inhalte
+
+    def stapel_grundrisse(self):
+        """
+        Grundriss je Stapel, vektorisiert über alle Stücke: reine Stapel übernehmen die
+        Form der Basis, gemischte werden zum umschließenden Rechteck (wie
+        StapelOptimierer.stapel_zu_objekten_aggregieren). Gibt ein Dict von Arrays zurück.
+        """
+        s = self.stapel; k = self.anzahl_stapel
+        basis = np.empty(k, dtype=np.int64)
+        basis[s[self.stapel_ebene == 0]] = np.flatnonzero(self.stapel_ebene == 0)
+        # Ausdehnung je Stück (Zylinder über den Durchmesser)
+        ist_zyl = self.form == FORM_ZYLINDER
+        ausdehnung_l = np.where(ist_zyl, 2 * self.radius, self.laenge)
+        ausdehnung_b = np.where(ist_zyl, 2 * self.radius, self.breite)
+        max_l = np.zeros(k); max_b = np.zeros(k)
+        np.maximum.at(max_l, s, ausdehnung_l); np.maximum.at(max_b, s, ausdehnung_b)
+        formen_min = np.full(k, 127, dtype=np.int8); formen_max = np.full(k, -1, dtype=np.int8)
+        np.minimum.at(formen_min, s, self.form); np.maximum.at(formen_max, s, self.form)
+        rein = formen_min == formen_max
+
+        form = np.where(rein, self.form[basis], FORM_QUADER).astype(np.int8)
+        laenge = np.where(rein, self.laenge[basis], max_l)
+        breite = np.where(rein, self.breite[basis], max_b)
+        radius = np.where(rein, self.radius[basis], 0.0)
+        return {
+            "basis": basis, "form": form, "laenge": laenge, "breite": breite, "radius": radius,
+            "grundflaeche": np.where(rein, self.grundflaeche[basis], max_l * max_b),
+            "hoehe": np.bincount(s, weights=self.hoehe, minlength=k),
+            "gewicht": np.bincount(s, weights=self.gewicht, minlength=k),
+        }
+
+    # --- Adapter: 2D-Packer ---
+
+    def packer_rows(self, area_w, area_h):
+        """
+        Eine 11-Spalten-Zeile je Stapel im Layout des 2D-Packers (IDX_*), mit der
+        Stapel-ID als Typ. Wie im OrderParser: Breite -> W, Länge -> H.
+        Gibt (rows, Stapelnamen) für PackerEngine.from_item_rows zurück.
+        """
+        g = self.stapel_grundrisse()
+        ist_zyl = g["form"] == FORM_ZYLINDER
+        w = np.where(ist_zyl, 2 * g["radius"], g["breite"])
+        h = np.where(ist_zyl, 2 * g["radius"], g["laenge"])
+        rows = np.empty((self.anzahl_stapel, NUM_PACKER_SPALTEN))
+        rows[:, 0] = area_w / 2; rows[:, 1] = area_h / 2
+        rows[:, 2] = w; rows[:, 3] = h; rows[:, 4] = w; rows[:, 5] = h
+        rows[:, 6] = np.arange(self.anzahl_stapel)
+        rows[:, 7] = g["grundflaeche"]; rows[:, 8] = g["form"]
+        rows[:, 9] = np.where(ist_zyl, g["radius"], 0.0)
+        rows[:, 10] = g["gewicht"]
+        return rows, [f"Stapel_{s + 1}" for s in range(self.anzahl_stapel)]
+
+    def setze_platzierung(self, layout, container=0):
+        """
+        Überträgt das 2D-Ergebnis (Packer-Zeilen, Typ = Stapel-ID) auf alle Stücke:
+        Stücke werden auf dem Stapelmittelpunkt zentriert, z ist die Höhe darunter.
+        'container' ist die Container-Instanz (Skalar oder je Layout-Zeile).
+        Nicht platzierte Stapel behalten NaN-Positionen.
+        """
+        k = self.anzahl_stapel
+        mitte = np.full((k, 2), np.nan); gedreht = np.zeros(k, dtype=bool)
+        stapel_container = np.full(k, -1, dtype=np.int64)
+        s_ids = layout[:, 6].astype(np.int64)
+        mitte[s_ids] = layout[:, 0:2]
+        stapel_container[s_ids] = container
+        self.container = stapel_container[self.stapel]
+        gedreht[s_ids] = (layout[:, 8] == FORM_QUADER) & (layout[:, 2] != layout[:, 4])
+
+        z = self.z_im_stapel()
+
+        self.gedreht = gedreht[self.stapel] & (self.form == FORM_QUADER)
+        w, h = self.ausdehnung_2d()
+        self.position[:, 0] = mitte[self.stapel, 0] - w / 2
+        self.position[:, 1] = mitte[self.stapel, 1] - h / 2
+        self.position[:, 2] = np.where(np.isnan(mitte[self.stapel, 0]), np.nan, z)
+
+    def ausdehnung_2d(self):
+        """Ausdehnung je Stück in Packer-Achsen (W, H) unter Berücksichtigung der Drehung."""
+        ist_zyl = self.form == FORM_ZYLINDER
+        w = np.where(ist_zyl, 2 * self.radius, np.where(self.gedreht, self.laenge, self.breite))
+        h = np.where(ist_zyl, 2 * self.radius, np.where(self.gedreht, self.breite, self.laenge))
+        return w, h
+
+    # --- Adapter: Export ---
+
+    def stapel_ergebnis(self, container_dir):
+        """
+        Ergebnis im Format von JSONParser.create_stack_result_json
+        ({"Container": ..., "Stacks": {"Stapel_k": [...]}}) für alle platzierten Stapel.
+        """
+        w, h = self.ausdehnung_2d()
+        reihenfolge = np.lexsort((self.stapel_ebene, self.stapel))
+        stacks = {}
+        id_unten = 0
+        for i in reihenfolge:
+            if np.isnan(self.position[i, 0]):
+                continue
+            stack_objects = stacks.setdefault(f"Stapel_{self.stapel[i] + 1}", [])
+            if self.stapel_ebene[i] == 0:
+                id_unten = 0
+            if self.form[i] == FORM_ZYLINDER:
+                form_dir = {"type": "cylinder", "height": float(self.hoehe[i]), "radius": float(self.radius[i])}
+            else:
+                form_dir = {"type": "rectangle", "length": float(h[i]), "width": float(w[i]), "height": float(self.hoehe[i])}
+            stack_objects.append({
+                "id": int(self.instanz[i]),
+                "stack_level": id_unten,
+                "position": {"x": float(self.position[i, 0]), "y": float(self.position[i, 1]), "z": float(self.position[i, 2])},
+                "form": form_dir,
+                "gewicht_kg": float(self.gewicht[i]),
+                "name": self.name(i),
+            })
+            id_unten = int(self.instanz[i])
+        return {"Container": container_dir, "Stacks": stacks}
+
+    def platzierte_objekte(self, container=None):
+        """
+        Einträge für loading_plan.containers[].placed_objects: 'id' ist die id der
+        Bestellposition, 'stack_level' die id des Stücks darunter (0 = Boden).
+        Mit 'container' nur die Stücke dieser Container-Instanz.
+        """
+        reihenfolge = np.lexsort((self.stapel_ebene, self.stapel))
+        eintraege = []
+        id_unten = 0
+        for i in reihenfolge:
+            if np.isnan(self.position[i, 0]) or (container is not None and self.container[i] != container):
+                continue
+            if self.stapel_ebene[i] == 0:
+                id_unten = 0
+            obj_id = self.typ_ids[self.typ[i]]
+            eintraege.append({
+                "id": obj_id,
+                "instance": int(self.instanz[i]),
+                "name": self.name(i),
+                "stack_level": id_unten,
+                "position": {"x": round(float(self.position[i, 0]), 2), "y": round(float(self.position[i, 1]), 2),
+                             "z": round(float(self.position[i, 2]), 2)},
+                "rotation": {"x_axis": 0, "y_axis": 0, "z_axis": 90 if self.gedreht[i] else 0},
+            })
+            id_unten = obj_id
+        return eintraege
+
+    def platziert(self):
+        """Bool-Maske der platzierten Stücke."""
+        return ~np.isnan(self.position[:, 0])
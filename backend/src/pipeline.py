@@ -0,0 +1,276 @@
+import copy
+import importlib
+import json
+import multiprocessing
+import os
+import random
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from json_parser import JSONParser
+from make_3d_to_2d_problem import StapelOptimierer
+from object_table import NUM_PACKER_SPALTEN
+import stapel_jit
+from stapel_cache import StapelCache
+
+# Der 2D-Packer ("Algorithm2d - Kopie.py") ist über das Modul algorithm2d importierbar
+PACKER_MODULNAME = "algorithm2d"
+
+# Prozessweiter Cache für Stapel-Partitionen wiederholter Bestellungen
+STAPEL_CACHE = StapelCache()
+
+
+def lade_packer_modul():
+    """Der 2D-Packer als Modul (einmal pro Prozess importiert, auch in spawn-Workern)."""
+    return importlib.import_module(PACKER_MODULNAME)
+
+
+def warmup_kernels(verbose=True):
+    """
+    Lädt die Numba-Kernel von Stapel-DP und 2D-Packer (cache=True: kompiliert wird nur
+    beim allerersten Start, danach kommen sie aus dem Plattencache). Für den Serverstart
+    und als Initializer der Worker-Prozesse. Gibt die Dauer in Sekunden zurück.
+    """
+    start = time.perf_counter()
+    stapel_jit.warmup_kernels()
+    lade_packer_modul().warmup_kernels()
+    dauer = time.perf_counter() - start
+    if verbose:
+        print(f"Prozess {os.getpid()}: Numba-Kernel in {dauer:.2f}s bereit.")
+    return dauer
+
+
+# Anteil der Containerfläche, bis zu dem die Vorab-Zuordnung Stapel einplant
+FUELLGRAD = 0.85
+# Spalten der Packer-Zeilen (siehe IDX_* im 2D-Packer)
+_W, _H, _TYP, _FLAECHE, _GEWICHT = 2, 3, 6, 7, 10
+
+
+def run_pipeline(order_data, sink_dir=None, params=None, stapel_modus="partition", multi_container=False,
+                 stapel_cache=STAPEL_CACHE, progress=None, verbose=False):
+    """
+    Bestellung (Dict im Bestell-JSON-Format) rein, Bestellung mit gefülltem
+    loading_plan raus. Stapeln, 2D-Packung und Export laufen komplett im Speicher
+    über eine gemeinsame ObjectTable.
+
+    'params' überschreibt einzelne Packer-Parameter (default_parameters).
+    Mit 'multi_container' werden die Stapel auf alle nutzbaren Container-Instanzen
+    (use/numbers) verteilt und die Layouts parallel gelöst, sonst nur der erste Container.
+    'stapel_cache' (StapelCache oder None) spart das Stapeln bei wiederholten Bestellungen.
+    'progress' wird mit Dicts {"phase": "parsing" | "stacking" | "packing" | "export" | "done", ...}
+    aufgerufen. "packing" meldet zuerst die Stapelinhalte (ObjectTable.stapel_inhalte), danach
+    je Runde bzw. fertigem Container Runde, platzierte Stapel, beste Kosten, Restzeit und das
+    Layout als Zeilen [Stapel-ID, x, y, w, h] (Zentrum, Packer-Achsen) mit Container-Index.
+    Mit 'sink_dir' werden Ladeplan und Stapelergebnis zusätzlich als kompaktes JSON
+    abgelegt; der Dateiname enthält Bestell-ID und Lauf-ID, parallele Läufe kollidieren nicht.
+    """
+    start_zeit = time.time()
+    _melde(progress, "parsing")
+
+    parser = JSONParser()
+    parser.load_data(order_data)
+    container_liste = parser.get_container_list() if multi_container else [parser.get_container_dimensions()]
+    if not container_liste:
+        raise ValueError("Keine nutzbaren Container in der Bestellung.")
+    tabelle = parser.get_object_table()
+
+    # --- Stapeln (jeder Stapel muss in jede Instanz passen, der er zugeordnet werden kann) ---
+    _melde(progress, "stacking", pieces=len(tabelle))
+    max_hoehe = min(c.height for c in container_liste)
+    optimierer = StapelOptimierer(tabelle, max_hoehe, verbose=verbose, modus=stapel_modus, cache=stapel_cache)
+    tabelle.setze_stapel(optimierer.loese_ketten())
+
+    # --- 2D-Packung der Stapelgrundrisse ---
+    rows, _ = tabelle.packer_rows(container_liste[0].width, container_liste[0].length)
+    _melde(progress, "packing", stacks=tabelle.anzahl_stapel,
+           stack_contents=tabelle.stapel_inhalte() if progress is not None else None)
+    ergebnisse = packe_container(rows, container_liste, params, verteilen=multi_container, progress=progress)
+
+    # --- Export ---
+    _melde(progress, "export")
+    belegt = [c for c, ergebnis in enumerate(ergebnisse) if ergebnis is not None]
+    layout = np.vstack([ergebnisse[c][0] for c in belegt] + [np.empty((0, NUM_PACKER_SPALTEN))])
+    tabelle.setze_platzierung(layout, np.repeat(belegt, [len(ergebnisse[c][0]) for c in belegt]))
+    plan = erstelle_ladeplan(order_data, container_liste, tabelle, ergebnisse)
+
+    if sink_dir is not None:
+        schreibe_ergebnis(sink_dir, plan, tabelle.stapel_ergebnis(_container_definition(order_data)))
+    if verbose:
+        print(f"Pipeline: {int(tabelle.platziert().sum())}/{len(tabelle)} Stücke in {tabelle.anzahl_stapel} Stapeln "
+              f"auf {len(plan['order']['loading_plan']['containers'])} Container platziert "
+              f"({time.time() - start_zeit:.2f}s).")
+    _melde(progress, "done", elapsed=time.time() - start_zeit)
+    return plan
+
+
+def _melde(progress, phase, **info):
+    if progress is not None:
+        progress({"phase": phase, **info})
+
+
+def ordne_stapel_zu(rows, container_liste, fuellgrad=FUELLGRAD):
+    """
+    First-Fit-Decreasing nach Grundfläche: jeder Stapel kommt in die erste Instanz, die
+    ihn von den Maßen her aufnimmt und deren Gewichtslimit und Flächenbudget
+    (fuellgrad * Bodenfläche) noch reichen. Ein leerer Container nimmt jeden passenden
+    Stapel. Gibt je Instanz die Zeilenindizes zurück; nicht zuordenbare fehlen.
+    """
+    laenge = np.array([c.length for c in container_liste], dtype=float)
+    breite = np.array([c.width for c in container_liste], dtype=float)
+    flaeche_frei = fuellgrad * laenge * breite
+    gewicht_frei = np.array([c.max_weight for c in container_liste], dtype=float)
+    zuordnung = [[] for _ in container_liste]
+
+    for i in np.argsort(-rows[:, _FLAECHE], kind="stable"):
+        w, h = rows[i, _W], rows[i, _H]
+        passt = (((w <= breite) & (h <= laenge)) | ((h <= breite) & (w <= laenge))) \
+            & (gewicht_frei >= rows[i, _GEWICHT]) \
+            & ((flaeche_frei >= rows[i, _FLAECHE]) | np.array([not z for z in zuordnung]))
+        if passt.any():
+            k = int(np.argmax(passt))
+            zuordnung[k].append(i)
+            flaeche_frei[k] -= rows[i, _FLAECHE]; gewicht_frei[k] -= rows[i, _GEWICHT]
+    return [np.array(z, dtype=np.int64) for z in zuordnung]
+
+
+def packe_container(rows, container_liste, params=None, verteilen=True, progress=None):
+    """
+    Löst die Layouts je Container-Instanz. Mit 'verteilen' werden die Stapel per
+    ordne_stapel_zu auf die Instanzen verteilt und parallel gepackt; Stapel, die der
+    Packer in ihrem Container nicht unterbringt, gehen in der nächsten Runde an die noch
+    unbenutzten Instanzen. Gibt je Instanz (layout, gewicht) oder None zurück; None auch
+    für Instanzen, in denen der Packer nichts platziert hat.
+    """
+    ergebnisse = [None] * len(container_liste)
+    offen = np.arange(len(rows))
+    frei = list(range(len(container_liste)))
+
+    while len(offen) and frei:
+        if verteilen:
+            zuordnung = ordne_stapel_zu(rows[offen], [container_liste[c] for c in frei])
+        else:
+            zuordnung = [np.arange(len(offen))]
+        auftraege = [(frei[k], offen[idx]) for k, idx in enumerate(zuordnung) if len(idx)]
+        if not auftraege:
+            break
+
+        for (c, _), ergebnis in zip(auftraege, _loese_auftraege(rows, container_liste, auftraege, params, progress)):
+            # Ein leer gebliebener Container zählt nicht als benutzt und wird nicht erneut geöffnet
+            ergebnisse[c] = ergebnis if len(ergebnis[0]) else None
+        platziert = [ergebnisse[c][0][:, _TYP] for c, _ in auftraege if ergebnisse[c] is not None]
+        if platziert:
+            offen = np.setdiff1d(offen, np.concatenate(platziert).astype(np.int64))
+        benutzt = {c for c, _ in auftraege}
+        frei = [c for c in frei if c not in benutzt]
+        if not verteilen:
+            break
+    return ergebnisse
+
+
+def _loese_auftraege(rows, container_liste, auftraege, params, progress=None):
+    """
+    Packt mehrere Container gleichzeitig, je einer pro Worker (höchstens NUM_PROCESSES).
+    Die Packer in den Workern laufen mit einem Prozess und ohne eigenen SA-Pool, damit
+    keine Prozess-Pools verschachtelt werden. Fortschritt gibt es dann je fertigem
+    Container, bei nur einem Container je Packrunde.
+    """
+    if len(auftraege) == 1:
+        c, idx = auftraege[0]
+        je_runde = None if progress is None else (lambda info: progress({**info, "container": c}))
+        return [_packe_einen_container((rows[idx], container_liste[c], params), je_runde)]
+
+    verfuegbar = (params or {}).get("NUM_PROCESSES") or multiprocessing.cpu_count()
+    anteil = {**(params or {}), "NUM_PROCESSES": 1}
+    anteil.setdefault("NUM_SA_RUNS", 2)
+    with ProcessPoolExecutor(max_workers=min(len(auftraege), verfuegbar), initializer=warmup_kernels) as executor:
+        futures = {executor.submit(_packe_einen_container, (rows[idx], container_liste[c], anteil)): c
+                   for c, idx in auftraege}
+        for fertig, future in enumerate(as_completed(futures), start=1):
+            layout, _ = future.result()
+            _melde(progress, "packing", containers_done=fertig, containers=len(futures),
+                   container=futures[future], layout=_kompaktes_layout(layout))
+        return [future.result() for future in futures]
+
+
+def _kompaktes_layout(layout, stapel_ids=None):
+    """Layout-Zeilen auf [Stapel-ID, x, y, w, h] reduzieren; 'stapel_ids' bildet lokale Typ-IDs ab."""
+    typ = layout[:, _TYP].astype(np.int64)
+    return np.column_stack((typ if stapel_ids is None else stapel_ids[typ], layout[:, :4]))
+
+
+def _packe_einen_container(args, progress=None):
+    """Worker: 2D-Packung der gegebenen Stapel in einem Container. Typ-Spalte bleibt die Stapel-ID."""
+    rows, container, params = args
+    packer = lade_packer_modul()
+    parameter = packer.default_parameters(container.width, container.length)
+    if params:
+        parameter.update(params)
+    random.seed(parameter['RANDOM_SEED'])
+    np.random.seed(parameter['RANDOM_SEED'])
+
+    stapel_ids = rows[:, _TYP].astype(np.int64)
+    lokal = rows.copy()
+    lokal[:, _TYP] = np.arange(len(rows))
+    engine = packer.PackerEngine.from_item_rows(parameter, lokal, [f"Stapel_{s + 1}" for s in stapel_ids],
+                                                container.max_weight)
+    if progress is not None:
+        engine.progress_callback = lambda info: progress(
+            {**info, "phase": "packing", "layout": _kompaktes_layout(info["layout"], stapel_ids)}
+        )
+    ergebnis = engine.run_packing_process()
+    if ergebnis is None:
+        return np.empty((0, NUM_PACKER_SPALTEN)), 0.0
+    layout, gewicht = ergebnis
+    layout = np.array(layout, dtype=np.float64)
+    layout[:, _TYP] = stapel_ids[layout[:, _TYP].astype(np.int64)]
+    return layout, float(gewicht)
+
+
+def _container_definition(order_data):
+    return order_data.get("order", {}).get("container_definitions", [{}])[0]
+
+
+def erstelle_ladeplan(order_data, container_liste, tabelle, ergebnisse):
+    """Kopie der Bestellung mit loading_plan.containers im Format des PDF-Generators."""
+    plan = copy.deepcopy(order_data)
+    order = plan.setdefault("order", {})
+    volumen = tabelle.grundflaeche * tabelle.hoehe
+    eintraege = []
+    je_typ = {}
+
+    for c, container in enumerate(container_liste):
+        objekte = tabelle.platzierte_objekte(container=c)
+        if not objekte:
+            continue
+        je_typ[container.type] = je_typ.get(container.type, 0) + 1
+        container_volumen = container.length * container.width * container.height
+        eintraege.append({
+            "sequence": len(eintraege) + 1,
+            "instance_id": f"{container.type or 'container'}-{je_typ[container.type]}",
+            "type": container.type,
+            "total_weight_kg": round(ergebnisse[c][1], 2),
+            "efficiency_percent": round(100 * float(volumen[tabelle.container == c].sum()) / container_volumen, 2)
+            if container_volumen else 0.0,
+            "placed_objects": objekte,
+        })
+
+    order["loading_plan"] = {"containers": eintraege}
+    order["unplaced_objects"] = [tabelle.name(i) for i in np.flatnonzero(~tabelle.platziert())]
+    return plan
+
+
+def schreibe_ergebnis(sink_dir, plan, stapel_ergebnis):
+    """Schreibt Ladeplan und Stapelergebnis kompakt nach sink_dir; gibt die Pfade zurück."""
+    os.makedirs(sink_dir, exist_ok=True)
+    order_id = plan.get("order", {}).get("order_id") or "order"
+    lauf_id = f"{order_id}_{uuid.uuid4().hex[:8]}"
+    pfade = []
+    for suffix, daten in (("plan", plan), ("stacks", stapel_ergebnis)):
+        pfad = os.path.join(sink_dir, f"{lauf_id}_{suffix}.json")
+        with open(pfad, "w", encoding="utf-8") as f:
+            json.dump(daten, f, ensure_ascii=False, separators=(",", ":"))
+        pfade.append(pfad)
+    return pfade
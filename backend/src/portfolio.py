@@ -0,0 +1,161 @@
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from object_table import ObjectTable, FORM_ZYLINDER
+from pipeline import run_pipeline, warmup_kernels
+
+
+def container_kosten(definition):
+    """Kosten einer Container-Instanz; hier das Innenvolumen in m³ (volume_m3, sonst aus den Innenmaßen)."""
+    if definition.get("volume_m3"):
+        return float(definition["volume_m3"])
+    d = definition["inner_dimensions"]
+    return d["length"] * d["width"] * d["height"] / 1e9
+
+
+def _passt_in(tabelle, definition):
+    """
+    True, wenn jedes Stück mit seiner Grundfläche (ggf. gedreht) und seinem Gewicht in den
+    Containertyp passt. Die Höhe prüft die Pipeline wie das Stapeln nicht für Einzelstücke.
+    """
+    d = definition["inner_dimensions"]
+    ist_zyl = tabelle.form == FORM_ZYLINDER
+    w = np.where(ist_zyl, 2 * tabelle.radius, tabelle.breite)
+    l = np.where(ist_zyl, 2 * tabelle.radius, tabelle.laenge)
+    grundriss = ((w <= d["width"]) & (l <= d["length"])) | ((l <= d["width"]) & (w <= d["length"]))
+    return bool(np.all(grundriss & (tabelle.gewicht <= definition["max_weight_kg"])))
+
+
+def untere_schranke_anzahl(tabelle, definition):
+    """
+    Mindestanzahl Container eines Typs aus Volumen, Gewicht und Grundfläche. Für die
+    Fläche zählen nur Stücke höher als die halbe Innenhöhe: zwei davon passen nie
+    übereinander, jedes belegt also eigene Bodenfläche.
+    """
+    d = definition["inner_dimensions"]
+    volumen = float((tabelle.grundflaeche * tabelle.hoehe).sum())
+    hoch = tabelle.hoehe > d["height"] / 2
+    schranken = (
+        volumen / (d["length"] * d["width"] * d["height"]),
+        float(tabelle.gewicht.sum()) / definition["max_weight_kg"],
+        float(tabelle.grundflaeche[hoch].sum()) / (d["length"] * d["width"]),
+    )
+    return max(1, math.ceil(max(schranken) - 1e-9))
+
+
+class Kandidat:
+    """Eine Containermenge: Typen in Belegungsreihenfolge, je Typ höchstens 'anzahl' Instanzen."""
+
+    def __init__(self, name, definitionen, anzahl, untere_schranke):
+        self.name = name
+        self.definitionen = definitionen
+        self.anzahl = anzahl
+        self.untere_schranke = untere_schranke
+        self.status = "offen"
+        self.kosten = None
+        self.plan = None
+
+    def bestellung(self, order_data):
+        """Bestellung, die nur diese Typen (use = true, numbers = anzahl) anbietet."""
+        order = dict(order_data.get("order", {}))
+        order["container_definitions"] = [dict(d, use=True, numbers=n) for d, n in zip(self.definitionen, self.anzahl)]
+        return dict(order_data, order=order)
+
+    def zusammenfassung(self):
+        return {"name": self.name, "types": [d.get("type") for d in self.definitionen],
+                "lower_bound": round(self.untere_schranke, 3), "cost": self.kosten, "status": self.status}
+
+
+def erzeuge_kandidaten(order_data, tabelle):
+    """
+    Je geeignetem Typ eine reine Menge, dazu Mischungen aller geeigneten Typen (groß zuerst /
+    klein zuerst). Geeignet sind Typen mit use = true, in die jedes Stück passt; 'numbers'
+    bleibt die Obergrenze je Typ (wie in JSONParser.get_container_list, fehlend = 1). Reine
+    Mengen, deren untere Schranke mehr Container braucht, entfallen.
+    """
+    definitionen = [d for d in order_data.get("order", {}).get("container_definitions", [])
+                    if d.get("use", True) and _passt_in(tabelle, d)]
+    volumen = float((tabelle.grundflaeche * tabelle.hoehe).sum())
+    kandidaten = []
+    anzahlen = [int(d.get("numbers") or 1) for d in definitionen]
+    for d, anzahl in zip(definitionen, anzahlen):
+        n = untere_schranke_anzahl(tabelle, d)
+        if n <= anzahl:
+            kandidaten.append(Kandidat(d.get("type"), [d], [anzahl], n * container_kosten(d)))
+
+    if len(definitionen) > 1:
+        # Jede Mischung kostet mindestens das Objektvolumen zum günstigsten Preis je Volumeneinheit
+        preis = min(container_kosten(d) / (d["inner_dimensions"]["length"] * d["inner_dimensions"]["width"]
+                                           * d["inner_dimensions"]["height"]) for d in definitionen)
+        reihenfolge = sorted(range(len(definitionen)), key=lambda k: -container_kosten(definitionen[k]))
+        for name, ks in (("mix-gross-zuerst", reihenfolge), ("mix-klein-zuerst", reihenfolge[::-1])):
+            kandidaten.append(Kandidat(name, [definitionen[k] for k in ks], [anzahlen[k] for k in ks], volumen * preis))
+    return kandidaten
+
+
+def _bewerte_kandidat(args):
+    """Worker: volle Pipeline für eine Containermenge."""
+    order_data, params = args
+    return run_pipeline(order_data, params=params, multi_container=True)
+
+
+def _plan_kosten(plan, kandidat):
+    kosten_je_typ = {d.get("type"): container_kosten(d) for d in kandidat.definitionen}
+    return sum(kosten_je_typ[c["type"]] for c in plan["order"]["loading_plan"]["containers"])
+
+
+def run_portfolio(order_data, params=None, max_parallel=None, verbose=False):
+    """
+    Bewertet alle geeigneten Containertypen aus container_definitions und Mischungen
+    davon gleichzeitig und gibt die günstigste zulässige Menge zurück (alle Stücke
+    platziert, Kosten = container_kosten je benutzter Instanz).
+
+    Kandidaten starten in aufsteigender unterer Schranke; sobald eine zulässige Lösung
+    vorliegt, werden noch wartende Kandidaten, deren Schranke nicht darunter liegt,
+    abgebrochen. Schon laufende rechnen zu Ende (Future.cancel() greift nur vor dem Start).
+    Ergebnis: {"best", "cost", "plan", "candidates"}.
+    """
+    start_zeit = time.time()
+    tabelle = ObjectTable.from_order(order_data)
+    kandidaten = sorted(erzeuge_kandidaten(order_data, tabelle), key=lambda k: k.untere_schranke)
+    if not kandidaten:
+        raise ValueError("Kein Containertyp kann alle Stücke aufnehmen.")
+
+    parallel = max_parallel or min(len(kandidaten), multiprocessing.cpu_count())
+    prozesse = max(1, multiprocessing.cpu_count() // parallel)
+    kandidat_params = {"NUM_PROCESSES": prozesse, "NUM_SA_RUNS": prozesse * 2, **(params or {})}
+    bester = None
+
+    with ProcessPoolExecutor(max_workers=parallel, initializer=warmup_kernels) as executor:
+        futures = {executor.submit(_bewerte_kandidat, (k.bestellung(order_data), kandidat_params)): k
+                   for k in kandidaten}
+        for future in as_completed(futures):
+            kandidat = futures[future]
+            if future.cancelled():
+                continue
+            kandidat.plan = future.result()
+            kandidat.kosten = round(_plan_kosten(kandidat.plan, kandidat), 3)
+            if kandidat.plan["order"]["unplaced_objects"]:
+                kandidat.status = "unvollstaendig"
+                continue
+            kandidat.status = "zulaessig"
+            if bester is None or kandidat.kosten < bester.kosten:
+                bester = kandidat
+                for f, k in futures.items():
+                    if k.untere_schranke >= bester.kosten and f.cancel():
+                        k.status = "abgebrochen"
+
+    if verbose:
+        for k in kandidaten:
+            print(f"  {k.name}: Schranke {k.untere_schranke:.2f}, Kosten {k.kosten}, {k.status}")
+        print(f"Portfolio: {bester.name if bester else 'keine zulässige Menge'} ({time.time() - start_zeit:.2f}s).")
+    return {
+        "best": bester.name if bester else None,
+        "cost": bester.kosten if bester else None,
+        "plan": bester.plan if bester else None,
+        "candidates": [k.zusammenfassung() for k in kandidaten],
+    }
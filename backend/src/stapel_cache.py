@@ -0,0 +1,103 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Standardgröße des Speicher-Tiers (Anzahl Bestellungen)
+MAX_EINTRAEGE = 128
+
+
+class StapelCache:
+    """
+    Cache für Stapel-Partitionen (StapelOptimierer.loese_ketten), Schlüssel ist ein
+    kanonischer Fingerabdruck der Bestellung: Stückmerkmale (ObjectTable.merkmale)
+    als sortierte Typliste mit Stückzahlen, dazu max_hoehe und die Optionen.
+    Reihenfolge und Namen der Bestellpositionen spielen damit keine Rolle.
+
+    Gespeichert werden die Ketten kanonisch als (Typ, Rang innerhalb des Typs); bei einem
+    Treffer werden sie auf die Indizes der aktuellen Tabelle abgebildet. Identische
+    Stücke sind austauschbar, die Partition bleibt also gültig.
+
+    Speicher-Tier mit LRU-Verdrängung, optional ein Platten-Tier in 'verzeichnis'
+    (eine .npz-Datei je Schlüssel). Zähler: hits, disk_hits, misses.
+    """
+
+    def __init__(self, max_eintraege=MAX_EINTRAEGE, verzeichnis=None):
+        self.max_eintraege = max_eintraege
+        self.verzeichnis = verzeichnis
+        self._eintraege = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if verzeichnis is not None:
+            os.makedirs(verzeichnis, exist_ok=True)
+
+    @staticmethod
+    def fingerabdruck(tabelle, max_hoehe, optionen=()):
+        """Gibt (schluessel, typ je Stück) zurück; 'typ' indiziert die kanonisch sortierten Typen."""
+        typen, typ, anzahl = np.unique(tabelle.merkmale(), axis=0, return_inverse=True, return_counts=True)
+        h = hashlib.sha256()
+        h.update(np.ascontiguousarray(typen).tobytes())
+        h.update(anzahl.astype(np.int64).tobytes())
+        h.update(repr((float(max_hoehe), tuple(optionen))).encode())
+        return h.hexdigest(), typ.reshape(-1)
+
+    def ketten(self, tabelle, max_hoehe, optionen, berechne):
+        """Ketten aus dem Cache oder per berechne() (und dann eingetragen)."""
+        schluessel, typ = self.fingerabdruck(tabelle, max_hoehe, optionen)
+        # Stücke je kanonischem Typ in Tabellenreihenfolge: Rang k -> Index
+        sortiert = np.argsort(typ, kind="stable")
+        start = np.searchsorted(typ[sortiert], np.arange(typ.max() + 1 if len(typ) else 0))
+
+        kanonisch = self._lade(schluessel)
+        if kanonisch is not None:
+            k_typ, k_rang, laengen = kanonisch
+            indizes = sortiert[start[k_typ] + k_rang]
+            return [kette.tolist() for kette in np.split(indizes, np.cumsum(laengen)[:-1])] if len(laengen) else []
+
+        with self._lock:
+            self.misses += 1
+        ergebnis = berechne()
+        alle = np.fromiter((i for kette in ergebnis for i in kette), dtype=np.int64)
+        rang = np.empty(len(typ), dtype=np.int64)
+        rang[sortiert] = np.arange(len(typ)) - start[typ[sortiert]]
+        self._speichere(schluessel, (typ[alle], rang[alle], np.array([len(k) for k in ergebnis], dtype=np.int64)))
+        return ergebnis
+
+    def _lade(self, schluessel):
+        with self._lock:
+            if schluessel in self._eintraege:
+                self._eintraege.move_to_end(schluessel)
+                self.hits += 1
+                return self._eintraege[schluessel]
+        if self.verzeichnis is None:
+            return None
+        pfad = os.path.join(self.verzeichnis, f"{schluessel}.npz")
+        if not os.path.exists(pfad):
+            return None
+        with np.load(pfad) as daten:
+            wert = (daten["typ"], daten["rang"], daten["laengen"])
+        with self._lock:
+            self.disk_hits += 1
+            self._eintrag_setzen(schluessel, wert)
+        return wert
+
+    def _speichere(self, schluessel, wert):
+        with self._lock:
+            self._eintrag_setzen(schluessel, wert)
+        if self.verzeichnis is not None:
+            # Erst in eine temporäre Datei, damit parallele Leser nie eine halbe Datei sehen
+            pfad = os.path.join(self.verzeichnis, f"{schluessel}.npz")
+            tmp = f"{pfad}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                np.savez(f, typ=wert[0], rang=wert[1], laengen=wert[2])
+            os.replace(tmp, pfad)
+
+    def _eintrag_setzen(self, schluessel, wert):
+        self._eintraege[schluessel] = wert
+        self._eintraege.move_to_end(schluessel)
+        while len(self._eintraege) > self.max_eintraege:
+            self._eintraege.popitem(last=False)
@@ -0,0 +1,88 @@
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def _kann_tragen(i, j, flaechen, bits, exakt):
+    """Träger-Relation wie TraegerRelation.traegt: Bitset bei exakter Geometrie, sonst Flächenregel."""
+    if i == j:
+        return False
+    if exakt:
+        return ((bits[i, j >> 3] >> (7 - (j & 7))) & 1) == 1
+    return flaechen[j] <= flaechen[i]
+
+
+@njit(cache=True)
+def dp_stapel_jit(reihenfolge, flaechen, hoehen, bits, exakt, max_hoehe):
+    """
+    Kompilierte Fassung von StapelOptimierer.finde_optimale_stapel. Für jedes Objekt
+    (von der kleinsten Grundfläche aufwärts) wird der Nachfolger mit dem längsten
+    Teilstapel innerhalb max_hoehe gewählt, bei Gleichstand der kleinste Index.
+    Gibt (anzahl, hoehe, nachfolger) als Arrays zurück, nachfolger = -1 für keinen.
+    """
+    n = len(reihenfolge)
+    anzahl = np.ones(n, dtype=np.int64)
+    hoehe = hoehen.copy()
+    nachfolger = np.full(n, -1, dtype=np.int64)
+
+    for r in range(n - 1, -1, -1):
+        i = reihenfolge[r]
+        bester = -1
+        for j in range(n):
+            if hoehen[i] + hoehe[j] > max_hoehe or not _kann_tragen(i, j, flaechen, bits, exakt):
+                continue
+            if bester < 0 or anzahl[j] > anzahl[bester]:
+                bester = j
+        if bester >= 0:
+            anzahl[i] = anzahl[bester] + 1
+            hoehe[i] = hoehen[i] + hoehe[bester]
+            nachfolger[i] = bester
+    return anzahl, hoehe, nachfolger
+
+
+@njit(cache=True)
+def extrahiere_ketten_jit(basen, nachfolger, hoehen, max_hoehe):
+    """
+    Kompilierte disjunkte Stapelrekonstruktion aus loese_problem: Jede noch freie Basis
+    folgt ihrem DP-Pfad, bis ein Objekt verbraucht ist oder die Höhe nicht mehr passt.
+    Übrige Objekte werden in Indexreihenfolge zu Einzelstapeln.
+    Gibt (elemente, laengen, anzahl_basis_stapel) zurück: alle Stapel hintereinander,
+    ihre Längen und wie viele davon aus Basen entstanden sind.
+    """
+    n = len(nachfolger)
+    frei = np.ones(n, dtype=np.bool_)
+    elemente = np.empty(n, dtype=np.int64)
+    laengen = np.empty(n, dtype=np.int64)
+    anzahl_elemente = 0
+    anzahl_stapel = 0
+
+    for b in range(len(basen)):
+        basis = basen[b]
+        if not frei[basis]:
+            continue
+        start = anzahl_elemente
+        elemente[anzahl_elemente] = basis; anzahl_elemente += 1
+        frei[basis] = False
+        aktuell_hoehe = hoehen[basis]
+        k = nachfolger[basis]
+        while k >= 0 and frei[k] and aktuell_hoehe + hoehen[k] <= max_hoehe:
+            elemente[anzahl_elemente] = k; anzahl_elemente += 1
+            frei[k] = False
+            aktuell_hoehe += hoehen[k]
+            k = nachfolger[k]
+        laengen[anzahl_stapel] = anzahl_elemente - start; anzahl_stapel += 1
+
+    anzahl_basis_stapel = anzahl_stapel
+    for i in range(n):
+        if frei[i]:
+            elemente[anzahl_elemente] = i; anzahl_elemente += 1
+            laengen[anzahl_stapel] = 1; anzahl_stapel += 1
+    return elemente[:anzahl_elemente], laengen[:anzahl_stapel], anzahl_basis_stapel
+
+
+def warmup_kernels():
+    """Ruft beide Kernel einmal mit den Argumenttypen aus make_3d_to_2d_problem auf (kompilieren bzw. aus dem Cache laden)."""
+    reihenfolge = np.arange(2, dtype=np.int64)
+    werte = np.ones(2)
+    _, _, nachfolger = dp_stapel_jit(reihenfolge, werte, werte, np.zeros((1, 1), dtype=np.uint8), False, 2.0)
+    extrahiere_ketten_jit(reihenfolge, nachfolger, werte, 2.0)
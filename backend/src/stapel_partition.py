@@ -0,0 +1,107 @@
+import time
+
+import numpy as np
+
+# Standard-Zeitbudget für die lokale Suche
+DEADLINE_SEKUNDEN = 10
+
+
+class StapelPartitionierer:
+    """
+    Zerlegt ALLE Objekte in höhenzulässige Ketten (Stapel), statt nur die Top-K Basen
+    zu stapeln. Ziel ist eine minimale Anzahl an Stapeln, also möglichst wenige
+    Grundflächen für die 2D-Packung.
+
+    1. Gierige Kettenüberdeckung: Objekte absteigend nach Grundfläche; jedes Objekt
+       kommt auf den offenen Stapel, dessen oberstes Objekt es tragen kann und der
+       danach am wenigsten Resthöhe übrig lässt (Best-Fit), sonst beginnt es einen neuen.
+    2. Lokale Suche bis zur Deadline: Ein Stapel wird aufgelöst, wenn sich alle seine
+       Objekte an zulässigen Stellen in anderen Stapeln einfügen lassen.
+
+    Die Träger-Relation kommt aus make_3d_to_2d_problem.TraegerRelation.
+    """
+
+    def __init__(self, objekte, relation, max_hoehe, deadline_sekunden=DEADLINE_SEKUNDEN, verbose=False):
+        self.objekte = objekte
+        self.relation = relation
+        self.max_hoehe = max_hoehe
+        self.deadline_sekunden = deadline_sekunden
+        self.verbose = verbose
+
+    def partitioniere(self):
+        """Gibt die Stapel als Listen von Objekt-Indizes (von unten nach oben) zurück."""
+        start_zeit = time.time()
+        stapel = self._gierige_ketten()
+        anzahl_gierig = len(stapel)
+        stapel = self._lokale_suche(stapel, start_zeit + self.deadline_sekunden)
+        if self.verbose:
+            print(f"Stapel-Partition: {anzahl_gierig} Stapel gierig, {len(stapel)} nach lokaler Suche "
+                  f"({time.time() - start_zeit:.2f}s).")
+        return stapel
+
+    def _gierige_ketten(self):
+        relation = self.relation
+        hoehen = relation.hoehen
+        oben = np.empty(relation.anzahl, dtype=np.int64)      # Oberstes Objekt je Stapel
+        stapel_hoehe = np.empty(relation.anzahl, dtype=float)
+        stapel = []
+
+        for j in relation.reihenfolge:
+            if stapel:
+                anzahl = len(stapel)
+                neue_hoehe = stapel_hoehe[:anzahl] + hoehen[j]
+                gueltig = relation.traeger_von(j)[oben[:anzahl]] & (neue_hoehe <= self.max_hoehe)
+                if gueltig.any():
+                    k = int(np.argmin(np.where(gueltig, self.max_hoehe - neue_hoehe, np.inf)))
+                    stapel[k].append(j); oben[k] = j; stapel_hoehe[k] = neue_hoehe[k]
+                    continue
+            oben[len(stapel)] = j; stapel_hoehe[len(stapel)] = hoehen[j]
+            stapel.append([j])
+        return stapel
+
+    def _einfuege_position(self, kette, j):
+        """Erste Position in 'kette', an der j zwischen Träger und Getragenem liegen darf, sonst -1."""
+        traegt = self.relation.traegt
+        for p in range(len(kette) + 1):
+            if p > 0 and not traegt(kette[p - 1], j):
+                continue
+            if p < len(kette) and not traegt(j, kette[p]):
+                continue
+            return p
+        return -1
+
+    def _lokale_suche(self, stapel, deadline):
+        """Löst Stapel auf (kleinste zuerst), solange das bis zur Deadline gelingt."""
+        hoehen = self.relation.hoehen
+        stapel_hoehe = [float(hoehen[kette].sum()) for kette in stapel]
+        gescheitert = set() # Stapel-IDs, deren Auflösung am aktuellen Stand schon scheiterte
+        ids = list(range(len(stapel)))
+
+        while time.time() < deadline:
+            kandidaten = [c for c in sorted(ids, key=lambda c: len(stapel[c])) if c not in gescheitert]
+            if not kandidaten:
+                break
+            c = kandidaten[0]
+            # Tentativ einfügen; bei Misserfolg werden die Züge rückgängig gemacht
+            zuege = []
+            for j in sorted(stapel[c], key=lambda j: -hoehen[j]):
+                bestes = None
+                for d in ids:
+                    if d == c or stapel_hoehe[d] + hoehen[j] > self.max_hoehe:
+                        continue
+                    p = self._einfuege_position(stapel[d], j)
+                    if p >= 0 and (bestes is None or stapel_hoehe[d] > stapel_hoehe[bestes[0]]):
+                        bestes = (d, p)
+                if bestes is None or time.time() >= deadline:
+                    break
+                d, p = bestes
+                stapel[d].insert(p, j); stapel_hoehe[d] += hoehen[j]
+                zuege.append((d, j))
+            if len(zuege) == len(stapel[c]):
+                ids.remove(c); gescheitert.clear()
+            else:
+                for d, j in reversed(zuege):
+                    stapel[d].remove(j); stapel_hoehe[d] -= hoehen[j]
+                gescheitert.add(c)
+
+        return [stapel[c] for c in ids]
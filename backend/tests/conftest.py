@@ -0,0 +1,16 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Die Module in src importieren sich gegenseitig als Skripte ("from pipeline import ...")
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC)
+
+
+@pytest.fixture
+def bestellung():
+    """Die Beispielbestellung aus src (20 Stücke, mehrere Containertypen)."""
+    with open(os.path.join(SRC, "beispiel.json"), encoding="utf-8") as f:
+        return json.load(f)
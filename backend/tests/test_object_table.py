@@ -0,0 +1,41 @@
+import numpy as np
+
+from json_parser import JSONParser
+from object_table import ObjectTable
+
+
+def test_tabelle_entspricht_objektliste(bestellung):
+    parser = JSONParser()
+    parser.load_data(bestellung)
+    objekte = parser.get_objects()
+    tabelle = parser.get_object_table()
+
+    assert len(tabelle) == len(objekte)
+    assert [tabelle.name(i) for i in range(len(tabelle))] == [o.name for o in objekte]
+    for obj, kopie in zip(objekte, tabelle.to_objekte()):
+        assert (kopie.form, kopie.hoehe, kopie.gewicht_kg) == (obj.form, obj.hoehe, obj.gewicht_kg)
+        assert kopie.abmessungen == obj.abmessungen
+
+
+def test_constraints_in_der_tabelle_aber_nicht_in_den_merkmalen(bestellung):
+    ohne = ObjectTable.from_order(bestellung).merkmale()
+    for o in bestellung["order"]["objects"]:
+        o["constraints"] = {"allow_rotation": False, "is_stackable": False, "max_stack_weight_kg": 0}
+    bestellung["order"]["objects"][0]["constraints"] = {}
+    tabelle = ObjectTable.from_order(bestellung)
+
+    erste = tabelle.typ == 0 # Ohne Angaben: alles erlaubt
+    assert np.all(tabelle.drehbar == erste) and np.all(tabelle.stapelbar == erste)
+    assert np.all(tabelle.max_stapel_gewicht == np.where(erste, np.inf, 0.0))
+    # Das Stapeln wertet die Constraints nicht aus, sie ändern also auch den Fingerabdruck nicht
+    assert np.array_equal(tabelle.merkmale(), ohne)
+
+
+def test_stapel_z_offsets(bestellung):
+    tabelle = ObjectTable.from_order(bestellung)
+    tabelle.setze_stapel([[0, 1, 2]] + [[i] for i in range(3, len(tabelle))])
+
+    z = tabelle.z_im_stapel()
+    assert tabelle.anzahl_stapel == len(tabelle) - 2
+    assert np.allclose(z[:3], [0.0, tabelle.hoehe[0], tabelle.hoehe[0] + tabelle.hoehe[1]])
+    assert np.all(z[3:] == 0.0)
@@ -0,0 +1,315 @@
+import numpy as np
+import pytest
+
+from pipeline import lade_packer_modul
+
+packer = lade_packer_modul()
+
+
+def zeile(x, y, w, h, typ, kreis=False, gewicht=1.0):
+    """Eine Item-Zeile in der Spaltenbelegung der PackerEngine (IDX_*)."""
+    z = np.zeros(packer.IDX_WEIGHT + 1)
+    z[[packer.IDX_X, packer.IDX_Y, packer.IDX_W, packer.IDX_H, packer.IDX_W_ORIG, packer.IDX_H_ORIG]] = x, y, w, h, w, h
+    z[packer.IDX_TYPE_ID] = typ
+    z[packer.IDX_AREA] = np.pi * (w / 2) ** 2 if kreis else w * h
+    z[packer.IDX_GEOM_TYPE] = packer.GEOM_CIRCLE if kreis else packer.GEOM_RECT
+    z[packer.IDX_RADIUS] = w / 2 if kreis else 0.0
+    z[packer.IDX_WEIGHT] = gewicht
+    return z
+
+
+def belegung(rng, area_w=20.0, area_h=10.0, spalten=6, reihen=3):
+    """Überschneidungsfreies Layout: je Rasterzelle ein zufälliges Rechteck oder ein Kreis."""
+    zw, zh = area_w / spalten, area_h / reihen
+    zeilen = []
+    for k in range(spalten * reihen):
+        cx, cy = (k % spalten + 0.5) * zw, (k // spalten + 0.5) * zh
+        if rng.random() < 0.3:
+            d = rng.uniform(0.5, min(zw, zh) - 0.1)
+            zeilen.append(zeile(cx, cy, d, d, k % 4, kreis=True))
+        else:
+            zeilen.append(zeile(cx, cy, rng.uniform(0.5, zw - 0.1), rng.uniform(0.5, zh - 0.1), k % 4))
+    return np.array(zeilen)
+
+
+def engine(area_w=20.0, area_h=10.0, **params):
+    """PackerEngine ohne Bestelldatei, nur mit den Parametern für die Platzierung."""
+    e = packer.PackerEngine.__new__(packer.PackerEngine)
+    e.params = dict(packer.default_parameters(area_w, area_h, num_cpus=1), **params)
+    e.max_container_weight = 1e9
+    return e
+
+
+@pytest.mark.parametrize("strategie", ["corner", "random"])
+def test_best_fit_bewertet_gleiche_formen_einmal(monkeypatch, strategie):
+    e = engine(PLACEMENT_STRATEGY=strategie)
+    layout = np.array([zeile(2.0, 1.0, 4.0, 2.0, 0)])
+    pool = [zeile(0, 0, 3.0, 2.0, 1)] * 5 + [zeile(0, 0, 2.0, 2.0, 2, kreis=True)] * 3 + [zeile(0, 0, 3.0, 2.0, 1, gewicht=2.0)]
+
+    aufrufe = []
+    original = e._find_position
+    monkeypatch.setattr(e, "_find_position", lambda item, *args: aufrufe.append(item) or original(item, *args))
+    np.random.seed(0)
+    ergebnis, _ = e._find_best_insertion(layout, pool, 0.0)
+
+    # Drei Formen: zwei Rechtecke (je zwei Ausrichtungen) und ein Kreis
+    assert len(aufrufe) == 5
+    # Ergebnis wie ein Scan ohne Deduplizierung: erstes Item der besten Form
+    neues_item, index, metrik, _ = ergebnis
+    einzeln = [original(item, layout, packer.create_spatial_grid(layout, 20.0, 10.0),
+                        e._compute_corner_points_jit(layout) if strategie == "corner" else None)[1]
+               for item in pool]
+    if strategie == "corner":
+        assert index == int(np.argmin(einzeln)) and metrik <= min(einzeln)
+    assert not packer.check_overlap_jit(neues_item, layout, -1)
+
+
+def test_ohne_placement_strategy_gilt_der_gemeinsame_default(monkeypatch):
+    e = engine()
+    del e.params["PLACEMENT_STRATEGY"]
+    assert packer.default_parameters(20.0, 10.0)["PLACEMENT_STRATEGY"] == packer.DEFAULT_PLACEMENT_STRATEGY == "corner"
+
+    ecken = []
+    original = e._find_position
+    monkeypatch.setattr(e, "_find_position", lambda item, layout, grid, corners: ecken.append(corners) or original(item, layout, grid, corners))
+    e._find_best_insertion(np.array([zeile(2.0, 1.0, 4.0, 2.0, 0)]), [zeile(0, 0, 2.0, 2.0, 1)], 0.0)
+    assert ecken and all(c is not None for c in ecken)
+
+
+def _sa_lauf(**params):
+    layout = np.array([zeile(2.0, 1.0, 4.0, 2.0, 0), zeile(7.0, 1.0, 3.0, 2.0, 1), zeile(11.0, 1.5, 3.0, 3.0, 2, kreis=True)])
+    return packer._run_sa_worker((layout, 3, dict(packer.default_parameters(20.0, 10.0, num_cpus=1), **params)))
+
+
+def test_abbruchkriterien_sind_standardmaessig_aus():
+    params = packer.default_parameters(20.0, 10.0, num_cpus=1)
+    assert {k: params[k] for k in packer.SA_PARAM_DEFAULTS} == packer.SA_PARAM_DEFAULTS
+
+    _, _, stats = _sa_lauf(ITER_LIMIT=5000)
+    assert stats[packer.STAT_ITERATIONS] == 5000
+    assert stats[packer.STAT_STOP_REASON] == packer.STOP_ITER_LIMIT
+
+
+def test_stagnation_und_mindesttemperatur_beenden_den_lauf():
+    _, _, stats = _sa_lauf(ITER_LIMIT=100000, STALL_ITERATIONS=500)
+    assert stats[packer.STAT_STOP_REASON] == packer.STOP_STALL and stats[packer.STAT_ITERATIONS] < 100000
+
+    _, _, stats = _sa_lauf(ITER_LIMIT=100000, MIN_TEMP=0.5)
+    assert stats[packer.STAT_STOP_REASON] == packer.STOP_MIN_TEMP and stats[packer.STAT_FINAL_TEMP] < 0.5
+
+
+def test_gitter_findet_dieselben_ueberlappungen_wie_linearer_scan():
+    rng = np.random.default_rng(1)
+    layout = belegung(rng)
+    grid = packer.create_spatial_grid(layout, 20.0, 10.0)
+    for _ in range(500):
+        w = rng.uniform(0.3, 6.0); kreis = rng.random() < 0.3
+        probe = zeile(rng.uniform(-1.0, 21.0), rng.uniform(-1.0, 11.0), w, w if kreis else rng.uniform(0.3, 6.0), 0, kreis)
+        assert packer.check_overlap_grid_jit(probe, layout, -1, grid) == packer.check_overlap_jit(probe, layout, -1)
+
+    # Gitter nach Verschieben und Drehen einzelner Items nachgeführt
+    for _ in range(200):
+        i = int(rng.integers(len(layout)))
+        layout[i, packer.IDX_X] = rng.uniform(0.0, 20.0); layout[i, packer.IDX_Y] = rng.uniform(0.0, 10.0)
+        if layout[i, packer.IDX_GEOM_TYPE] == packer.GEOM_RECT and rng.random() < 0.5:
+            layout[i, [packer.IDX_W, packer.IDX_H]] = layout[i, [packer.IDX_H, packer.IDX_W]]
+        packer.grid_update_item_jit(grid, layout, i)
+        for j in range(len(layout)):
+            assert packer.check_overlap_grid_jit(layout[j], layout, j, grid) == packer.check_overlap_jit(layout[j], layout, j)
+
+
+SA = packer.make_sa_params(packer.default_parameters(20.0, 10.0, num_cpus=1))
+GEWICHTE = (SA.WEIGHT_Y, SA.WEIGHT_X, SA.WEIGHT_BOX_AREA, SA.WEIGHT_GROUPING)
+
+
+def _volle_kosten(layout, num_types=4):
+    return packer.bottom_left_density_cost_jit(layout, num_types, SA.AREA_W, SA.AREA_H, *GEWICHTE)
+
+
+def _inkrementelle_kosten(state, layout, num_types=4):
+    return packer.cost_state_total_jit(state, layout, num_types, *GEWICHTE)
+
+
+def test_inkrementelle_kosten_gleich_voller_berechnung():
+    rng = np.random.default_rng(2)
+    layout = belegung(rng)
+    state = packer.create_cost_state(layout, 4)
+    assert _inkrementelle_kosten(state, layout) == pytest.approx(_volle_kosten(layout), rel=1e-9)
+
+    for _ in range(300):
+        i = int(rng.integers(len(layout)))
+        alt = layout[i].copy()
+        if rng.random() < 0.2: # Randitem, damit auch die Bounding Box neu berechnet werden muss
+            i = int(np.argmin(layout[:, packer.IDX_X])); alt = layout[i].copy()
+        layout[i, packer.IDX_X] = rng.uniform(0.5, 19.5); layout[i, packer.IDX_Y] = rng.uniform(0.5, 9.5)
+        packer.cost_state_remove_jit(state, alt)
+        packer.cost_state_add_jit(state, layout[i])
+        assert _inkrementelle_kosten(state, layout) == pytest.approx(_volle_kosten(layout), rel=1e-9)
+
+
+def test_abgelehnte_mutation_stellt_layout_gitter_und_kosten_wieder_her():
+    rng = np.random.default_rng(3)
+    layout = belegung(rng)
+    grid = packer.create_spatial_grid(layout, SA.AREA_W, SA.AREA_H)
+    state = packer.create_cost_state(layout, 4)
+    undo_rows = np.empty((2, layout.shape[1]))
+    kosten, temp = _volle_kosten(layout), 0.5
+    akzeptiert = abgelehnt = 0
+
+    for _ in range(400):
+        vorher = layout.copy()
+        kosten, temp, angenommen = packer.try_mutation_sa_jit(
+            layout, kosten, temp, 4, SA.AREA_W, SA.AREA_H, SA.COOLING_RATE,
+            SA.SWAP_PROBABILITY, SA.TELEPORT_PROBABILITY, SA.ROTATE_PROBABILITY, SA.MAX_MOVE_MULTIPLIER,
+            *GEWICHTE, grid, state, undo_rows,
+        )
+        if angenommen:
+            akzeptiert += 1
+        else:
+            abgelehnt += 1
+            assert np.array_equal(layout, vorher)
+        # Kosten, Kostenzustand und Gitter bilden immer den aktuellen Stand ab
+        assert kosten == pytest.approx(_volle_kosten(layout), rel=1e-9)
+        assert _inkrementelle_kosten(state, layout) == pytest.approx(kosten, rel=1e-9)
+        for j in range(len(layout)):
+            assert not packer.check_overlap_jit(layout[j], layout, j)
+            assert not packer.check_overlap_grid_jit(layout[j], layout, j, grid)
+        probe = zeile(rng.uniform(0.0, 20.0), rng.uniform(0.0, 10.0), 2.0, 2.0, 0)
+        assert packer.check_overlap_grid_jit(probe, layout, -1, grid) == packer.check_overlap_jit(probe, layout, -1)
+    assert akzeptiert and abgelehnt
+
+
+def _sa_jit_lauf(layout, seed, **params):
+    sa = SA._replace(**params)
+    config = layout.copy()
+    grid = packer.create_spatial_grid(config, sa.AREA_W, sa.AREA_H)
+    return packer.run_sa_jit(config, 4, sa, grid, packer.create_cost_state(config, 4), seed)
+
+
+def test_kompilierter_sa_lauf_liefert_gueltiges_bestes_layout():
+    layout = belegung(np.random.default_rng(4))
+    best_conf, best_cost, stats = _sa_jit_lauf(layout, 7, ITER_LIMIT=3000)
+
+    assert stats[packer.STAT_ITERATIONS] == 3000
+    assert best_cost == pytest.approx(_volle_kosten(best_conf), rel=1e-9)
+    assert best_cost <= _volle_kosten(layout)
+    assert np.array_equal(np.sort(best_conf[:, packer.IDX_TYPE_ID]), np.sort(layout[:, packer.IDX_TYPE_ID]))
+    for j, it in enumerate(best_conf):
+        assert not packer.check_overlap_jit(it, best_conf, j)
+        halb_w, halb_h = it[packer.IDX_W] / 2, it[packer.IDX_H] / 2
+        assert halb_w - 1e-9 <= it[packer.IDX_X] <= SA.AREA_W - halb_w + 1e-9
+        assert halb_h - 1e-9 <= it[packer.IDX_Y] <= SA.AREA_H - halb_h + 1e-9
+
+    # Gleicher Seed, gleicher Lauf
+    wiederholt, kosten, _ = _sa_jit_lauf(layout, 7, ITER_LIMIT=3000)
+    assert kosten == best_cost and np.array_equal(wiederholt, best_conf)
+
+
+@pytest.mark.parametrize("prozesse", [1, 2])
+def test_shared_memory_runner_haengt_items_an_und_liest_bestes_layout(prozesse):
+    layout = belegung(np.random.default_rng(5))
+    params = dict(packer.default_parameters(20.0, 10.0, num_cpus=1), NUM_SA_RUNS=2, ITER_LIMIT=500)
+
+    with packer.SharedMemorySARunner(layout[:10], 4, params, prozesse, capacity=len(layout)) as runner:
+        best_conf, best_cost, stats = runner.optimize()
+        assert best_conf.shape == (10, layout.shape[1]) and len(stats) == 2
+        for zeile_neu in layout[10:]:
+            runner.add_item(zeile_neu)
+        best_conf, best_cost, stats = runner.optimize(iter_limit=200)
+
+    assert best_conf.shape == layout.shape
+    assert all(s[packer.STAT_ITERATIONS] == 200 for s in stats)
+    assert best_cost == pytest.approx(_volle_kosten(best_conf), rel=1e-9)
+    assert np.array_equal(np.sort(best_conf[:, packer.IDX_AREA]), np.sort(layout[:, packer.IDX_AREA]))
+
+
+def test_shared_memory_runner_inline_ohne_zweites_handle():
+    layout = belegung(np.random.default_rng(5))
+    params = dict(packer.default_parameters(20.0, 10.0, num_cpus=1), NUM_SA_RUNS=2, ITER_LIMIT=200)
+
+    with packer.SharedMemorySARunner(layout, 4, params, 1, capacity=len(layout)) as runner:
+        assert packer._shared_worker_state["shm"] is None
+        assert packer._shared_worker_state["slots"] is runner.slots
+        runner.optimize()
+    assert packer._shared_worker_state == {}
+
+
+def _packe(item_rows, **params):
+    params = dict(packer.default_parameters(20.0, 10.0, num_cpus=1), NUM_SA_RUNS=1, ITER_LIMIT=300, **params)
+    e = packer.PackerEngine.from_item_rows(params, item_rows, ["a", "b", "c", "d"], None)
+    layout, _ = e.run_packing_process()
+    return e, layout
+
+
+def test_batch_modus_fuegt_mehrere_items_pro_runde_ein():
+    items = [zeile(0, 0, 2.0, 1.5, k % 4) for k in range(12)]
+    e, layout = _packe(items, BATCH_INSERTION=True, BATCH_MAX_ITEMS=4, BATCH_MIN_ITER=100)
+
+    assert len(layout) == 12
+    hinzugefuegt = [r["items_added"] for r in e.round_report]
+    assert sum(hinzugefuegt) == 11 and max(hinzugefuegt) == 4
+    assert len(e.round_report) < len(_packe(items)[0].round_report)
+
+    # Budget nach Flächenanteil der neuen Items, mindestens BATCH_MIN_ITER
+    assert e._batch_iteration_budget(18.0, layout) == 150
+    assert e._batch_iteration_budget(3.0, layout) == 100
+    assert e._batch_iteration_budget(100.0, layout) == 300
+    # BATCH_MIN_ITER über ITER_LIMIT hebt das Budget nicht über ITER_LIMIT
+    e.params = dict(e.params, BATCH_MIN_ITER=2000)
+    assert e._batch_iteration_budget(3.0, layout) == 300
+
+
+def _ecke(item, layout, area_w=20.0, area_h=10.0):
+    grid = packer.create_spatial_grid(layout, area_w, area_h)
+    corners = packer.PackerEngine._compute_corner_points_jit(layout)
+    return packer.PackerEngine._find_corner_position_jit(item, layout, grid, corners, area_w, area_h)
+
+
+def test_eckpunkt_platzierer_waehlt_den_untersten_linken_freien_punkt():
+    item = zeile(0, 0, 3.0, 2.0, 1)
+    # Neben das erste Item an der Wand
+    pos, metrik = _ecke(item, np.array([zeile(2.0, 1.0, 4.0, 2.0, 0)]))
+    assert tuple(pos) == (5.5, 1.0) and metrik == pytest.approx(1.0 + 0.55)
+    # Untere Reihe voll: auf das linke Item, nicht in die Lücke darüber rechts
+    reihe = np.array([zeile(2.0 + 4.0 * k, 1.0, 4.0, 2.0, 0) for k in range(5)])
+    pos, _ = _ecke(item, reihe)
+    assert tuple(pos) == (1.5, 3.0)
+    # Zu groß für die Fläche
+    pos, metrik = _ecke(zeile(0, 0, 21.0, 2.0, 1), reihe)
+    assert pos[0] == -1.0 and metrik == 9e18
+
+
+def test_eckpunkt_platzierer_ist_gueltig_und_deterministisch():
+    rng = np.random.default_rng(7)
+    layout = belegung(rng)[::2].copy()
+    for _ in range(50):
+        w = rng.uniform(0.5, 4.0); kreis = rng.random() < 0.3
+        item = zeile(0, 0, w, w if kreis else rng.uniform(0.5, 4.0), 1, kreis)
+        pos, metrik = _ecke(item, layout)
+        assert tuple(_ecke(item, layout)[0]) == tuple(pos)
+        if pos[0] == -1.0:
+            continue
+        item[packer.IDX_X], item[packer.IDX_Y] = pos
+        assert not packer.check_overlap_jit(item, layout, -1)
+        assert item[packer.IDX_X] + item[packer.IDX_W] / 2 <= 20.0 and item[packer.IDX_Y] + item[packer.IDX_H] / 2 <= 10.0
+        assert metrik == pytest.approx(pos[1] + 0.1 * pos[0])
+
+
+def test_parallel_tempering_runner():
+    layout = belegung(np.random.default_rng(9))
+    params = dict(packer.default_parameters(20.0, 10.0, num_cpus=1), NUM_SA_RUNS=3, PT_SEGMENT_ITER=200)
+
+    with packer.TemperingSARunner(layout, 4, params, 1) as runner:
+        assert np.allclose(runner.temps, [0.01, 0.1, 1.0])
+        best_conf, best_cost, stats = runner.optimize(iter_limit=1000)
+
+        assert len(stats) == 3 and [s[packer.STAT_FINAL_TEMP] for s in stats] == list(runner.temps)
+        assert all(s[packer.STAT_ITERATIONS] == 1000 for s in stats)
+        assert best_cost == pytest.approx(_volle_kosten(best_conf), rel=1e-9)
+        assert best_cost <= _volle_kosten(layout)
+        assert runner.swaps_tried == 5 # Ein Tauschversuch je Segment, abwechselnd Paar (0,1) und (1,2)
+
+        # Eine kältere Replika mit höheren Kosten wird immer getauscht
+        replikas, kosten = ["kalt", "mittel", "heiss"], [5.0, 1.0, 3.0]
+        runner._exchange(replikas, kosten, 0)
+        assert replikas == ["mittel", "kalt", "heiss"] and kosten == [1.0, 5.0, 3.0]
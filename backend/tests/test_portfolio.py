@@ -0,0 +1,62 @@
+import pytest
+
+from object_table import ObjectTable
+from portfolio import container_kosten, erzeuge_kandidaten, run_portfolio, untere_schranke_anzahl
+
+SCHNELL = {"ITER_LIMIT": 300, "NUM_SA_RUNS": 1, "NUM_PROCESSES": 1}
+
+
+def test_untere_schranke_aus_volumen_gewicht_und_grundflaeche(bestellung):
+    tabelle = ObjectTable.from_order(bestellung)
+    d = bestellung["order"]["container_definitions"][0]
+    assert untere_schranke_anzahl(tabelle, d) == 1
+
+    # Gewicht: zehnfache Bestellung braucht mindestens gewicht / max_weight Container
+    for o in bestellung["order"]["objects"]:
+        o["quantity"] *= 10
+    tabelle = ObjectTable.from_order(bestellung)
+    assert untere_schranke_anzahl(tabelle, d) >= tabelle.gewicht.sum() / d["max_weight_kg"]
+
+
+def test_kandidaten_je_typ_und_mischungen(bestellung):
+    tabelle = ObjectTable.from_order(bestellung)
+    definitionen = bestellung["order"]["container_definitions"]
+    kandidaten = erzeuge_kandidaten(bestellung, tabelle)
+
+    # Nur Typen mit use = true, je Typ höchstens 'numbers' Instanzen
+    genutzt = [d for d in definitionen if d["use"]]
+    assert len(genutzt) < len(definitionen)
+    assert [k.name for k in kandidaten] == [d["type"] for d in genutzt] + ["mix-gross-zuerst", "mix-klein-zuerst"]
+    assert [k.anzahl for k in kandidaten[:len(genutzt)]] == [[d["numbers"]] for d in genutzt]
+    rein = kandidaten[0]
+    assert rein.untere_schranke == untere_schranke_anzahl(tabelle, genutzt[0]) * container_kosten(genutzt[0])
+    bestellung_rein = rein.bestellung(bestellung)
+    assert bestellung_rein["order"]["container_definitions"] == [dict(genutzt[0], use=True, numbers=rein.anzahl[0])]
+    assert bestellung["order"]["container_definitions"] == definitionen # Original unverändert
+
+    # Braucht ein Typ laut Schranke mehr Container als 'numbers', entfällt seine reine Menge
+    for o in bestellung["order"]["objects"]:
+        o["quantity"] *= 10
+    zehnfach = ObjectTable.from_order(bestellung)
+    genutzt[0]["numbers"] = untere_schranke_anzahl(zehnfach, genutzt[0]) - 1
+    assert genutzt[0]["numbers"] >= 1
+    namen = [k.name for k in erzeuge_kandidaten(bestellung, zehnfach)]
+    assert genutzt[0]["type"] not in namen and "mix-gross-zuerst" in namen
+
+    # Ein Stück, das nirgends hineinpasst, lässt keinen Kandidaten übrig
+    bestellung["order"]["objects"][0]["form"]["length"] = 50000
+    assert erzeuge_kandidaten(bestellung, ObjectTable.from_order(bestellung)) == []
+
+
+def test_portfolio_waehlt_die_guenstigste_zulaessige_menge(bestellung):
+    ergebnis = run_portfolio(bestellung, params=SCHNELL, max_parallel=2)
+    kandidaten = {k["name"]: k for k in ergebnis["candidates"]}
+
+    zulaessig = [k for k in kandidaten.values() if k["status"] == "zulaessig"]
+    assert ergebnis["best"] in kandidaten and ergebnis["plan"]["order"]["unplaced_objects"] == []
+    assert ergebnis["cost"] == min(k["cost"] for k in zulaessig)
+    for k in kandidaten.values():
+        if k["status"] == "abgebrochen":
+            assert k["lower_bound"] >= ergebnis["cost"]
+        elif k["status"] == "zulaessig":
+            assert k["lower_bound"] <= k["cost"] + 1e-3
@@ -0,0 +1,162 @@
+import itertools
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from make_3d_to_2d_problem import TOP_K_BASEN, StapelOptimierer, TraegerRelation, fuelle_hoehe_bitset
+from stapel_jit import extrahiere_ketten_jit
+from object_table import ObjectTable
+from three_dimensional import Objekt
+
+
+def zufallsobjekte(rng, n):
+    """Quader und Zylinder aus wenigen Maßen, damit gleiche Grundflächen vorkommen."""
+    objekte = []
+    for k in range(n):
+        hoehe = float(rng.choice([0.3, 0.5, 0.8, 1.2]))
+        if rng.random() < 0.3:
+            objekte.append(Objekt(f"z_{k}", 'Zylinder', [float(rng.choice([0.4, 0.6, 1.0]))], hoehe, 10.0))
+        else:
+            objekte.append(Objekt(f"q_{k}", 'Quader', [float(rng.choice([0.8, 1.2, 2.0])), float(rng.choice([0.6, 1.2]))], hoehe, 10.0))
+    return objekte
+
+
+def networkx_dp(objekte, max_hoehe, exakt):
+    """Die frühere Graph-Fassung von finde_optimale_stapel als Referenz."""
+    graph = nx.DiGraph()
+    graph.add_nodes_from(objekte)
+    for unten in objekte:
+        for oben in objekte:
+            traegt = unten.kann_traeger_sein_fuer_no_overlap(oben) if exakt else unten.kann_traeger_sein_fuer(oben)
+            if unten is not oben and traegt:
+                graph.add_edge(unten, oben)
+    info = {obj: (1, obj.hoehe, None) for obj in objekte}
+    for unten in sorted(objekte, key=lambda o: o.grundflaeche, reverse=True)[::-1]:
+        bester = (1, unten.hoehe, None)
+        for oben in graph.neighbors(unten):
+            anzahl, hoehe, _ = info[oben]
+            if unten.hoehe + hoehe <= max_hoehe and anzahl + 1 > bester[0]:
+                bester = (anzahl + 1, unten.hoehe + hoehe, oben)
+        info[unten] = bester
+    return info
+
+
+def pruefe_stapel(stapel, max_hoehe, exakt=False):
+    """Jeder Stapel passt in max_hoehe (Einzelobjekte immer) und jedes Objekt trägt das nächste."""
+    for s in stapel:
+        assert len(s) == 1 or sum(o.hoehe for o in s) <= max_hoehe + 1e-9
+        for unten, oben in zip(s, s[1:]):
+            assert unten.kann_traeger_sein_fuer_no_overlap(oben) if exakt else unten.kann_traeger_sein_fuer(oben)
+
+
+@pytest.mark.parametrize("exakt", [False, True])
+def test_relation_gleich_paarweiser_pruefung(exakt):
+    objekte = zufallsobjekte(np.random.default_rng(11), 40)
+    relation = TraegerRelation(objekte, exakt=exakt)
+    erwartet = np.array([[i != j and (unten.kann_traeger_sein_fuer_no_overlap(oben) if exakt else unten.kann_traeger_sein_fuer(oben))
+                          for j, oben in enumerate(objekte)] for i, unten in enumerate(objekte)])
+
+    assert np.array_equal([relation.traeger_maske(i) for i in range(len(objekte))], erwartet)
+    assert np.array_equal(np.column_stack([relation.traeger_von(j) for j in range(len(objekte))]), erwartet)
+    assert all(relation.traegt(i, j) == erwartet[i, j] for i in range(len(objekte)) for j in range(len(objekte)))
+
+
+@pytest.mark.parametrize("exakt", [False, True])
+def test_dp_gleich_networkx_fassung(exakt):
+    objekte = zufallsobjekte(np.random.default_rng(12), 60)
+    optimierer = StapelOptimierer(objekte, 2.5, exakte_geometrie=exakt)
+    assert optimierer.finde_optimale_stapel() == networkx_dp(objekte, 2.5, exakt)
+
+
+def test_typ_ebene_stapelt_alle_stuecke_mit_fortlaufenden_namen():
+    typen = zufallsobjekte(np.random.default_rng(12), 6)
+    anzahlen = [7, 1, 12, 3, 5, 9]
+    stapel, grundflaeche = StapelOptimierer(typen, 2.5, anzahlen=anzahlen).loese_problem()
+
+    pruefe_stapel(stapel, 2.5)
+    namen = [o.name for s in stapel for o in s]
+    assert sorted(namen) == sorted(f"{t.name}_{i + 1}" for t, k in zip(typen, anzahlen) for i in range(k))
+    assert grundflaeche == pytest.approx(sum(s[0].grundflaeche for s in stapel))
+    # Stapeln auf Typ-Ebene spart gegenüber Einzelstapeln Grundfläche
+    assert len(stapel) < sum(anzahlen)
+
+
+@pytest.mark.parametrize("exakt", [False, True])
+def test_partition_stapelt_jedes_objekt_genau_einmal(exakt):
+    objekte = zufallsobjekte(np.random.default_rng(13), 80)
+    top_k, _ = StapelOptimierer(objekte, 2.5, exakte_geometrie=exakt, modus="top_k").loese_problem()
+    nur_gierig, _ = StapelOptimierer(objekte, 2.5, exakte_geometrie=exakt, deadline_sekunden=0).loese_problem()
+    stapel, grundflaeche = StapelOptimierer(objekte, 2.5, exakte_geometrie=exakt, deadline_sekunden=1).loese_problem()
+
+    for ergebnis in (nur_gierig, stapel):
+        pruefe_stapel(ergebnis, 2.5, exakt)
+        assert sorted(id(o) for s in ergebnis for o in s) == sorted(id(o) for o in objekte)
+    assert len(stapel) <= len(nur_gierig) <= len(top_k)
+    assert grundflaeche == pytest.approx(sum(s[0].grundflaeche for s in stapel))
+
+
+def test_bitset_dp_erreicht_die_beste_teilsumme():
+    rng = np.random.default_rng(14)
+    for _ in range(50):
+        hoehen = [int(h) for h in rng.choice([0, 150, 300, 450, 800, 1200, 2700], size=int(rng.integers(0, 11)))]
+        kapazitaet = int(rng.integers(-100, 3000))
+        gewaehlt, hoehe = fuelle_hoehe_bitset(hoehen, kapazitaet)
+
+        beste = max((sum(t) for k in range(len(hoehen) + 1) for t in itertools.combinations(hoehen, k)
+                     if sum(t) <= kapazitaet), default=0)
+        assert hoehe == beste
+        assert len(set(gewaehlt)) == len(gewaehlt) and sum(hoehen[i] for i in gewaehlt) == hoehe
+
+
+@pytest.mark.parametrize("exakt", [False, True])
+def test_hoehenmodus_fuellt_stapel(exakt):
+    objekte = zufallsobjekte(np.random.default_rng(15), 80)
+    stapel, _ = StapelOptimierer(objekte, 2.5, exakte_geometrie=exakt, modus="hoehe").loese_problem()
+
+    pruefe_stapel(stapel, 2.5, exakt)
+    assert sorted(id(o) for s in stapel for o in s) == sorted(id(o) for o in objekte)
+    top_k, _ = StapelOptimierer(objekte, 2.5, exakte_geometrie=exakt, modus="top_k").loese_problem()
+    assert len(stapel) < len(top_k)
+
+
+def numpy_dp(relation, max_hoehe):
+    """Die vektorisierte NumPy-DP vor stapel_jit als Referenz."""
+    anzahl = np.ones(relation.anzahl, dtype=np.int64)
+    hoehe = relation.hoehen.copy()
+    nachfolger = np.full(relation.anzahl, -1, dtype=np.int64)
+    for i in relation.reihenfolge[::-1]:
+        neue_hoehe = relation.hoehen[i] + hoehe
+        gueltig = relation.traeger_maske(i) & (neue_hoehe <= max_hoehe)
+        if gueltig.any():
+            j = int(np.argmax(np.where(gueltig, anzahl, 0)))
+            anzahl[i] = anzahl[j] + 1; hoehe[i] = neue_hoehe[j]; nachfolger[i] = j
+    return anzahl, hoehe, nachfolger
+
+
+@pytest.mark.parametrize("exakt", [False, True])
+def test_kompilierte_dp_gleich_numpy_fassung(exakt):
+    objekte = zufallsobjekte(np.random.default_rng(20), 300)
+    optimierer = StapelOptimierer(ObjectTable.from_objekte(objekte), 2.5, exakte_geometrie=exakt)
+    for kompiliert, referenz in zip(optimierer._dp_arrays(), numpy_dp(optimierer.relation, 2.5)):
+        assert np.array_equal(kompiliert, referenz)
+
+
+def test_kettenextraktion_verwendet_jedes_objekt_einmal():
+    objekte = zufallsobjekte(np.random.default_rng(21), 120)
+    optimierer = StapelOptimierer(objekte, 2.5, modus="top_k")
+    _, _, nachfolger = optimierer._dp_arrays()
+    basen = optimierer.relation.reihenfolge[:TOP_K_BASEN].astype(np.int64)
+    elemente, laengen, anzahl_basis = extrahiere_ketten_jit(basen, nachfolger, optimierer.relation.hoehen, 2.5)
+
+    assert sorted(elemente.tolist()) == list(range(len(objekte)))
+    assert laengen.sum() == len(objekte) and np.all(laengen[anzahl_basis:] == 1)
+    ketten = np.split(elemente, np.cumsum(laengen)[:-1])
+    erste = [int(k[0]) for k in ketten[:anzahl_basis]] # Genutzte Basen in Basis-Reihenfolge
+    assert erste == [int(b) for b in basen if b in erste]
+    for k in ketten[:anzahl_basis]:
+        assert all(nachfolger[unten] == oben for unten, oben in zip(k, k[1:]))
+
+    stapel, _ = optimierer.loese_problem()
+    pruefe_stapel(stapel, 2.5)
+    assert sorted(id(o) for s in stapel for o in s) == sorted(id(o) for o in objekte)
@@ -0,0 +1,49 @@
+import numpy as np
+
+from make_3d_to_2d_problem import StapelOptimierer, TraegerRelation
+from object_table import ObjectTable
+from stapel_cache import StapelCache
+
+
+def ketten(bestellung, cache, max_hoehe=2350):
+    tabelle = ObjectTable.from_order(bestellung)
+    return tabelle, StapelOptimierer(tabelle, max_hoehe, cache=cache).loese_ketten()
+
+
+def pruefe_ketten(tabelle, ketten, max_hoehe=2350):
+    relation = TraegerRelation(tabelle)
+    assert sorted(i for k in ketten for i in k) == list(range(len(tabelle)))
+    for k in ketten:
+        assert len(k) == 1 or tabelle.hoehe[k].sum() <= max_hoehe
+        assert all(relation.traegt(unten, oben) for unten, oben in zip(k, k[1:]))
+
+
+def test_treffer_bei_umsortierter_bestellung(bestellung):
+    cache = StapelCache()
+    tabelle, erste = ketten(bestellung, cache)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    # Andere Reihenfolge, andere IDs und Namen: gleicher Fingerabdruck, Ketten auf die neuen Indizes abgebildet
+    objekte = bestellung["order"]["objects"][::-1]
+    for k, o in enumerate(objekte):
+        o["id"] = 100 + k; o["product_name"] = f"Artikel {k}"
+    bestellung["order"]["objects"] = objekte
+    umsortiert, zweite = ketten(bestellung, cache)
+    assert (cache.hits, cache.misses) == (1, 1)
+    pruefe_ketten(umsortiert, zweite)
+    assert sorted(map(len, zweite)) == sorted(map(len, erste))
+
+    # Andere Höhe ist ein anderer Schlüssel
+    ketten(bestellung, cache, max_hoehe=2000)
+    assert cache.misses == 2
+
+
+def test_platten_tier_und_lru(bestellung, tmp_path):
+    _, erste = ketten(bestellung, StapelCache(verzeichnis=str(tmp_path)))
+    neu = StapelCache(max_eintraege=1, verzeichnis=str(tmp_path))
+    _, zweite = ketten(bestellung, neu)
+    assert (neu.disk_hits, neu.misses) == (1, 0) and zweite == erste
+
+    ketten(bestellung, neu, max_hoehe=2000)
+    assert len(neu._eintraege) == 1 and len(list(tmp_path.glob("*.npz"))) == 2
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,39 @@
+import stapel_jit
+from pipeline import lade_packer_modul, warmup_kernels
+
+
+def test_warmup_kompiliert_alle_kernel_und_meldet_dauer():
+    dauer = warmup_kernels(verbose=False)
+    assert dauer > 0
+
+    packer = lade_packer_modul()
+    # Einstiege, die aus Python aufgerufen werden (innere Kernel kompilieren mit ihnen)
+    einstiege = [packer.run_sa_jit, packer.cost_state_total_jit, packer.cost_state_reset_jit,
+                 packer.grid_insert_all_jit, packer.bottom_left_density_cost_jit,
+                 packer.PackerEngine._find_best_position_jit, packer.PackerEngine._find_corner_position_jit,
+                 packer.PackerEngine._compute_corner_points_jit,
+                 stapel_jit.dp_stapel_jit, stapel_jit.extrahiere_ketten_jit]
+    assert [k.py_func.__name__ for k in einstiege if not k.signatures] == []
+
+def test_platzierer_nutzen_die_signatur_des_warmups():
+    warmup_kernels(verbose=False)
+    packer = lade_packer_modul()
+    vorher = len(packer.PackerEngine._find_corner_position_jit.signatures)
+
+    engine = packer.PackerEngine.__new__(packer.PackerEngine)
+    engine.params = {"AREA_W": 10, "AREA_H": 10, "MAX_PLACEMENT_TRIES": 10} # Ganzzahlen wie aus dem JSON
+    layout = packer._warmup_layout()
+    grid = packer.create_spatial_grid(layout, 10.0, 10.0)
+    engine._find_position(layout[0].copy(), layout, grid, engine._compute_corner_points_jit(layout))
+
+    assert len(packer.PackerEngine._find_corner_position_jit.signatures) == vorher
+
+
+def test_sa_worker_waermt_nur_einmal_pro_prozess(monkeypatch, capsys):
+    packer = lade_packer_modul()
+    packer._init_sa_worker()
+    aufrufe = []
+    monkeypatch.setattr(packer, "warmup_kernels", lambda: aufrufe.append(1))
+    for _ in range(3):
+        packer._create_pool(1)
+    assert aufrufe == [] and capsys.readouterr().out == ""
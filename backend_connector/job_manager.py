@@ -0,0 +1,176 @@
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from backend_connector.layout_stream import LayoutStream
+from backend_connector.order_fingerprint import order_fingerprint, plan_schluessel
+from pipeline import run_pipeline
+
+# Gleichzeitig laufende Optimierungen (jede nutzt intern selbst alle CPU-Kerne)
+MAX_WORKERS = 2
+# Fertige Jobs, die für Status-Abfragen aufgehoben werden
+MAX_FERTIGE_JOBS = 100
+
+# Anteil am Gesamtfortschritt, den eine Phase beim Start erreicht hat
+PHASEN_FORTSCHRITT = {"queued": 0.0, "parsing": 0.02, "stacking": 0.05, "packing": 0.1, "export": 0.95, "done": 1.0}
+PHASEN_TEXT = {
+    "queued": "Wartet auf einen freien Worker",
+    "parsing": "Bestellung wird eingelesen",
+    "stacking": "Objekte werden gestapelt",
+    "packing": "Stapel werden im Container angeordnet",
+    "export": "Ladeplan wird erstellt",
+    "done": "Fertig",
+    "failed": "Fehlgeschlagen",
+}
+# Verwaltungsfelder eines Jobs, die status() nicht ausgibt
+INTERNE_FELDER = ("stream", "schluessel", "folger", "bestellung")
+# Felder, die ein Folge-Job beim Anhängen vom laufenden Job übernimmt
+GETEILTE_FELDER = ("state", "phase", "message", "progress", "round", "placed", "total", "best_cost",
+                   "eta_seconds", "started_at", "stream")
+
+
+class JobManager:
+    """
+    Führt run_pipeline im Hintergrund aus (Thread-Pool; die Rechenarbeit läuft in den
+    Prozess-Pools der Pipeline). submit() gibt sofort eine Job-ID zurück, status() den
+    aktuellen Stand: Phase, Fortschritt (0..1), beste Kosten und geschätzte Restzeit.
+    stream() liefert den LayoutStream mit den Zwischenständen für Server-Sent Events.
+    Fertige Pläne landen im ResultStore; der Status nennt dann ihre plan_id.
+
+    Single-Flight: Eine Bestellung, deren Fingerabdruck (order_fingerprint) schon in einem
+    wartenden oder laufenden Job steckt, startet keine zweite Optimierung; submit()
+    gibt die Job-ID des laufenden Jobs zurück und zählt dort 'requests' hoch. Unterscheidet
+    sich die Bestellung nur in order_id, Zeitstempeln o. Ä. (anderer plan_schluessel), wird
+    sie ein Folge-Job: eigene Job-ID, Fortschritt und Stream des laufenden Jobs, am Ende
+    eine eigene plan_id mit ihren Kennungen. Liegt ein
+    Plan mit diesem Fingerabdruck schon im ResultStore, ist der neue Job sofort fertig
+    (mit eigener plan_id, siehe ResultStore.plan_fuer).
+    """
+
+    def __init__(self, result_store, max_workers=MAX_WORKERS, pipeline_kwargs=None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="optimize")
+        self._pipeline_kwargs = pipeline_kwargs or {}
+        self._results = result_store
+        self._jobs = {}
+        self._laufend = {} # Fingerabdruck -> Job-ID der wartenden/laufenden Jobs
+        self._lock = threading.Lock()
+
+    def submit(self, order_data):
+        fingerabdruck = order_fingerprint(order_data)
+        schluessel = plan_schluessel(order_data)
+        plan_id = self._results.plan_fuer(order_data)
+        with self._lock:
+            leiter_id = self._laufend.get(fingerabdruck)
+            if leiter_id is not None:
+                leiter = self._jobs[leiter_id]
+                leiter["requests"] += 1
+                if leiter["schluessel"] == schluessel:
+                    return leiter_id
+            job_id = uuid.uuid4().hex
+            jetzt = time.time()
+            job = self._jobs[job_id] = {
+                "job_id": job_id, "state": "queued", "phase": "queued", "message": PHASEN_TEXT["queued"],
+                "progress": 0.0, "round": None, "placed": None, "total": None, "best_cost": None,
+                "eta_seconds": None, "created_at": jetzt, "started_at": None, "finished_at": None,
+                "error": None, "plan_id": None, "requests": 1, "stream": LayoutStream(),
+                "schluessel": schluessel, "folger": [],
+            }
+            if leiter_id is not None:
+                # Bisheriger Stand des laufenden Jobs; _aktualisiere hält ihn danach synchron
+                job.update({k: leiter[k] for k in GETEILTE_FELDER}, bestellung=order_data)
+                leiter["folger"].append(job_id)
+            elif plan_id is not None:
+                job.update(state="done", phase="done", message=PHASEN_TEXT["done"], progress=1.0, eta_seconds=0.0,
+                           plan_id=plan_id, started_at=jetzt, finished_at=jetzt)
+            else:
+                self._laufend[fingerabdruck] = job_id
+            self._aufraeumen()
+        if leiter_id is not None:
+            return job_id
+        if plan_id is not None:
+            job["stream"].schliessen({"state": "done", "error": None})
+        else:
+            self._executor.submit(self._ausfuehren, job_id, fingerabdruck, order_data)
+        return job_id
+
+    def status(self, job_id):
+        """Status des Jobs (None für unbekannte Jobs)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            status = {k: v for k, v in job.items() if k not in INTERNE_FELDER}
+        laufzeit_ende = status["finished_at"] or time.time()
+        status["elapsed_seconds"] = laufzeit_ende - (status["started_at"] or laufzeit_ende)
+        return status
+
+    def stream(self, job_id):
+        """LayoutStream eines Jobs, sonst None."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job["stream"] if job is not None else None
+
+    def _ausfuehren(self, job_id, fingerabdruck, order_data):
+        self._aktualisiere(job_id, state="running", started_at=time.time())
+        try:
+            plan = run_pipeline(order_data, progress=lambda info: self._fortschritt(job_id, info),
+                                **self._pipeline_kwargs)
+            plan_id = self._results.speichere(order_data, plan)
+        except Exception as e:
+            traceback.print_exc()
+            ende = dict(state="failed", phase="failed", message=PHASEN_TEXT["failed"], error=str(e), eta_seconds=None)
+        else:
+            ende = dict(state="done", phase="done", message=PHASEN_TEXT["done"], progress=1.0, eta_seconds=0.0,
+                        plan_id=plan_id)
+        with self._lock:
+            del self._laufend[fingerabdruck]
+            folger = [self._jobs[f] for f in self._jobs[job_id]["folger"] if f in self._jobs]
+        if ende["state"] == "done":
+            # Folge-Jobs bekommen den Plan mit ihren eigenen Kennungen, bevor sie als fertig gelten
+            for job in folger:
+                self._aktualisiere(job["job_id"], plan_id=self._results.plan_fuer(job["bestellung"]))
+        self._aktualisiere(job_id, finished_at=time.time(), **ende)
+        status = self.status(job_id)
+        self.stream(job_id).schliessen({"state": status["state"], "error": status["error"]})
+
+    def _fortschritt(self, job_id, info):
+        """Übersetzt Pipeline-Meldungen in den Job-Status."""
+        phase = info["phase"]
+        stream = self.stream(job_id)
+        stream.setze_phase(phase)
+        if info.get("stack_contents") is not None:
+            stream.setze_stapel(info["stack_contents"])
+        if info.get("layout") is not None:
+            stream.setze_layout(info.get("container", 0), info["layout"])
+        felder = {"phase": phase, "message": PHASEN_TEXT.get(phase, phase), "progress": PHASEN_FORTSCHRITT.get(phase, 0.0)}
+        if phase == "packing":
+            start, ende = PHASEN_FORTSCHRITT["packing"], PHASEN_FORTSCHRITT["export"]
+            if "placed" in info:
+                felder.update(round=info["round"], placed=info["placed"], total=info["total"],
+                              best_cost=info["best_cost"], eta_seconds=info["eta"],
+                              progress=start + (ende - start) * info["placed"] / max(1, info["total"]))
+                felder["message"] = f"Packrunde {info['round']}: {info['placed']} von {info['total']} Stapeln platziert"
+            elif "containers_done" in info:
+                felder["progress"] = start + (ende - start) * info["containers_done"] / max(1, info["containers"])
+                felder["message"] = f"{info['containers_done']} von {info['containers']} Containern gepackt"
+        self._aktualisiere(job_id, **felder)
+
+    def _aktualisiere(self, job_id, **felder):
+        """Setzt Felder des Jobs und (bis auf die plan_id) seiner Folge-Jobs."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(felder)
+            felder.pop("plan_id", None)
+            for folger_id in job["folger"]:
+                if folger_id in self._jobs:
+                    self._jobs[folger_id].update(felder)
+
+    def _aufraeumen(self):
+        """Verwirft die ältesten fertigen Jobs über MAX_FERTIGE_JOBS (Lock wird vom Aufrufer gehalten)."""
+        fertig = [j for j in self._jobs.values() if j["state"] in ("done", "failed")]
+        for job in sorted(fertig, key=lambda j: j["finished_at"])[:max(0, len(fertig) - MAX_FERTIGE_JOBS)]:
+            del self._jobs[job["job_id"]]
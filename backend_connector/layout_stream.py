@@ -0,0 +1,100 @@
+import json
+import threading
+import time
+
+# Mindestabstand zwischen zwei Updates an denselben Client (Sekunden)
+MIN_INTERVALL = 0.5
+# Kommentarzeile, damit Proxies eine ruhige Verbindung nicht schließen
+KEEPALIVE_SEKUNDEN = 15
+
+
+def _sse(event, daten):
+    return f"event: {event}\ndata: {json.dumps(daten, separators=(',', ':'))}\n\n"
+
+
+class LayoutStream:
+    """
+    Zwischenstände eines Jobs für Server-Sent Events. Die Pipeline ersetzt nur den
+    aktuellen Stand (Phase, Stapelinhalte, Layout je Container) und erhöht die Version;
+    sie wartet nie auf Clients. Jeder Client (events()) merkt sich, was er schon
+    gesendet hat, und bekommt höchstens alle MIN_INTERVALL Sekunden ein Delta:
+    neu platzierte oder verschobene Stapel und entfernte Stapel-IDs. Zwischenstände, die
+    ein langsamer Client verpasst, werden dabei zusammengefasst.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.version = 0
+        self.phase = None
+        self.stapel_inhalte = None
+        self.layout = {} # Stapel-ID -> (Container, x, y, w, h)
+        self.abschluss = None # Status-Dict, sobald der Job fertig ist
+
+    def setze_phase(self, phase):
+        with self._cond:
+            if phase != self.phase:
+                self.phase = phase
+                self._neue_version()
+
+    def setze_stapel(self, inhalte):
+        with self._cond:
+            self.stapel_inhalte = inhalte
+            self._neue_version()
+
+    def setze_layout(self, container, zeilen):
+        """Ersetzt das Layout eines Containers; 'zeilen' sind [Stapel-ID, x, y, w, h]."""
+        neu = {int(z[0]): (int(container), round(float(z[1])), round(float(z[2])), round(float(z[3])), round(float(z[4])))
+               for z in zeilen}
+        with self._cond:
+            self.layout = {s: v for s, v in self.layout.items() if v[0] != container}
+            self.layout.update(neu)
+            self._neue_version()
+
+    def schliessen(self, status):
+        with self._cond:
+            self.abschluss = status
+            self._neue_version()
+
+    def _neue_version(self):
+        self.version += 1
+        self._cond.notify_all()
+
+    def events(self, min_intervall=MIN_INTERVALL, keepalive=KEEPALIVE_SEKUNDEN):
+        """
+        Generator für text/event-stream: Events 'phase', 'stacks' (Stapelinhalte),
+        'layout' ({"version", "placed": [[Stapel-ID, Container, x, y, w, h], ...], "removed": [...]})
+        und zuletzt 'done' mit dem Job-Status.
+        """
+        gesendet = {}
+        phase_gesendet = None
+        stapel_gesendet = False
+        version_gesendet = -1
+
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self.version != version_gesendet, timeout=keepalive)
+                version = self.version
+                phase, inhalte, abschluss = self.phase, self.stapel_inhalte, self.abschluss
+                layout = dict(self.layout)
+            if version == version_gesendet:
+                yield ": keepalive\n\n"
+                continue
+
+            if phase is not None and phase != phase_gesendet:
+                yield _sse("phase", {"phase": phase})
+                phase_gesendet = phase
+            if inhalte is not None and not stapel_gesendet:
+                yield _sse("stacks", inhalte)
+                stapel_gesendet = True
+
+            platziert = [[s, *v] for s, v in layout.items() if gesendet.get(s) != v]
+            entfernt = [s for s in gesendet if s not in layout]
+            if platziert or entfernt:
+                yield _sse("layout", {"version": version, "placed": platziert, "removed": entfernt})
+                gesendet = layout
+            version_gesendet = version
+
+            if abschluss is not None:
+                yield _sse("done", abschluss)
+                return
+            time.sleep(min_intervall)
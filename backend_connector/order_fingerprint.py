@@ -0,0 +1,54 @@
+import copy
+import hashlib
+import json
+
+# Objektfelder, die den Ladeplan nicht beeinflussen (Ergebnisfelder). Die id bleibt im
+# Fingerabdruck, weil placed_objects[].id sie übernimmt.
+IGNORIERTE_OBJEKT_FELDER = ("placement",)
+# Felder der Bestellung, die der Planer schreibt
+PLAN_FELDER = ("loading_plan", "unplaced_objects")
+
+
+def _kanonisch(wert):
+    return json.dumps(wert, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def _container_definition(definition):
+    # Wie JSONParser.get_container_list: fehlendes 'use' zählt als True, fehlende 'numbers' als 1
+    return dict(definition, use=bool(definition.get("use", True)), numbers=definition.get("numbers") or 1)
+
+
+def order_fingerprint(order_data):
+    """
+    SHA-256 über die planrelevanten Teile einer Bestellung: container_definitions und
+    objects, jeweils normalisiert und sortiert. order_id, created_at/updated_at, placement
+    und loading_plan fließen nicht ein; ein erneut gesendetes Formular mit neuen
+    Zeitstempeln hat also denselben Fingerabdruck.
+    """
+    order = order_data.get("order", {})
+    container = sorted(_kanonisch(_container_definition(d)) for d in order.get("container_definitions", []))
+    objekte = sorted(
+        # Ohne id nummeriert ObjectTable.from_order die Positionen durch
+        _kanonisch(dict({k: v for k, v in o.items() if k not in IGNORIERTE_OBJEKT_FELDER}, id=o.get("id", pos)))
+        for pos, o in enumerate(order.get("objects", []))
+    )
+    return hashlib.sha256(_kanonisch([container, objekte]).encode("utf-8")).hexdigest()
+
+
+def plan_schluessel(order_data):
+    """
+    plan_id des Ladeplans zu genau dieser Bestellung: SHA-256 über alles außer den
+    PLAN_FELDERN, also auch order_id und Zeitstempel. Bestellungen mit gleichem
+    order_fingerprint teilen sich die Rechnung, aber nicht die plan_id.
+    """
+    order = {k: v for k, v in order_data.get("order", {}).items() if k not in PLAN_FELDER}
+    return hashlib.sha256(_kanonisch(dict(order_data, order=order)).encode("utf-8")).hexdigest()
+
+
+def uebertrage_plan(plan, order_data):
+    """Plan einer inhaltsgleichen Bestellung auf 'order_data' übertragen (deren order_id, Zeitstempel usw.)."""
+    neu = copy.deepcopy(order_data)
+    for feld in PLAN_FELDER:
+        if feld in plan.get("order", {}):
+            neu.setdefault("order", {})[feld] = copy.deepcopy(plan["order"][feld])
+    return neu
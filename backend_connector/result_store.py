@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from backend_connector.order_fingerprint import order_fingerprint, plan_schluessel, uebertrage_plan
+
+# Ladepläne, die zusätzlich serialisiert im Speicher gehalten werden
+MAX_EINTRAEGE = 64
+
+
+class ResultStore:
+    """
+    Ablage fertiger Ladepläne. Jeder Plan liegt unter seiner plan_id (plan_schluessel, mit
+    order_id und Zeitstempeln) und zusätzlich unter dem order_fingerprint als Vorlage für
+    inhaltsgleiche Bestellungen; plan_fuer() überträgt diese auf die neue Bestellung. Pläne
+    werden einmal kompakt serialisiert (ohne Einrückung) und als {schluessel}.json in
+    'verzeichnis' abgelegt; die zuletzt benutzten Bytes hält ein LRU-Tier im Speicher. Zu
+    jedem Plan gehört ein ETag (Hash der Bytes), damit wiederholte Abrufe mit 304 beantwortet werden.
+    """
+
+    def __init__(self, verzeichnis, max_eintraege=MAX_EINTRAEGE):
+        self.verzeichnis = verzeichnis
+        self.max_eintraege = max_eintraege
+        self._eintraege = OrderedDict() # plan_id -> (bytes, etag)
+        self._lock = threading.Lock()
+        os.makedirs(verzeichnis, exist_ok=True)
+
+    def speichere(self, order_data, plan):
+        """Legt den Plan zur Bestellung ab und gibt seine plan_id zurück."""
+        daten = json.dumps(plan, separators=(',', ':'), ensure_ascii=False).encode("utf-8")
+        plan_id = plan_schluessel(order_data)
+        self._schreibe(order_fingerprint(order_data), daten)
+        self._schreibe(plan_id, daten)
+        return plan_id
+
+    def plan_fuer(self, order_data):
+        """
+        plan_id eines fertigen Plans für 'order_data' oder None. Liegt nur der Plan einer
+        inhaltsgleichen Bestellung vor (andere order_id, neue Zeitstempel), wird er auf
+        diese Bestellung übertragen und unter ihrer plan_id abgelegt.
+        """
+        plan_id = plan_schluessel(order_data)
+        if plan_id in self:
+            return plan_id
+        vorlage = self.lade_plan(order_fingerprint(order_data))
+        if vorlage is None:
+            return None
+        return self.speichere(order_data, uebertrage_plan(vorlage, order_data))
+
+    def lade(self, schluessel):
+        """(bytes, etag) des Plans oder None."""
+        if not self._gueltig(schluessel):
+            return None
+        with self._lock:
+            if schluessel in self._eintraege:
+                self._eintraege.move_to_end(schluessel)
+                return self._eintraege[schluessel]
+        try:
+            with open(self._pfad(schluessel), "rb") as f:
+                daten = f.read()
+        except FileNotFoundError:
+            return None
+        wert = (daten, self._etag(daten))
+        with self._lock:
+            self._eintrag_setzen(schluessel, wert)
+        return wert
+
+    def lade_plan(self, schluessel):
+        """Plan als Dict oder None."""
+        wert = self.lade(schluessel)
+        return json.loads(wert[0]) if wert is not None else None
+
+    def __contains__(self, schluessel):
+        return self.lade(schluessel) is not None
+
+    @staticmethod
+    def _etag(daten):
+        return hashlib.sha256(daten).hexdigest()[:32]
+
+    @staticmethod
+    def _gueltig(schluessel):
+        # Nur Hex-Hashes, damit keine fremden Pfade gelesen werden
+        return len(schluessel) == 64 and all(c in "0123456789abcdef" for c in schluessel)
+
+    def _schreibe(self, schluessel, daten):
+        # Erst in eine temporäre Datei, damit parallele Leser nie eine halbe Datei sehen
+        pfad = self._pfad(schluessel)
+        tmp = f"{pfad}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(daten)
+        os.replace(tmp, pfad)
+        with self._lock:
+            self._eintrag_setzen(schluessel, (daten, self._etag(daten)))
+
+    def _pfad(self, schluessel):
+        return os.path.join(self.verzeichnis, f"{schluessel}.json")
+
+    def _eintrag_setzen(self, schluessel, wert):
+        self._eintraege[schluessel] = wert
+        self._eintraege.move_to_end(schluessel)
+        while len(self._eintraege) > self.max_eintraege:
+            self._eintraege.popitem(last=False)
@@ -0,0 +1,19 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Wie app.py: Repo-Wurzel für backend_connector, backend/src für die Skript-Importe der Optimierung
+WURZEL = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, WURZEL)
+sys.path.insert(0, os.path.join(WURZEL, "backend", "src"))
+
+BEISPIEL = os.path.join(WURZEL, "backend", "src", "beispiel.json")
+
+
+@pytest.fixture
+def bestellung():
+    """Die Beispielbestellung aus backend/src (20 Stücke, mehrere Containertypen)."""
+    with open(BEISPIEL, encoding="utf-8") as f:
+        return json.load(f)
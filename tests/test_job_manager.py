@@ -0,0 +1,158 @@
+import copy
+import threading
+
+import pytest
+
+import app as app_modul
+from backend_connector import job_manager
+from backend_connector.job_manager import JobManager
+from backend_connector.result_store import ResultStore
+
+
+@pytest.fixture
+def blockierte_pipeline(monkeypatch):
+    """Ersetzt run_pipeline durch eine Attrappe, die bis zur Freigabe wartet und ihre Aufrufe zählt."""
+    freigabe = threading.Event()
+    aufrufe = []
+
+    def run_pipeline(order_data, progress=None, **kwargs):
+        aufrufe.append(order_data)
+        freigabe.wait(10)
+        return {"order": {"order_id": order_data["order"].get("order_id"), "loading_plan": {"containers": []}}}
+
+    monkeypatch.setattr(job_manager, "run_pipeline", run_pipeline)
+    return freigabe, aufrufe
+
+
+def _warte_auf_ende(jobs, job_id):
+    for _ in range(1000):
+        if jobs.status(job_id)["state"] in ("done", "failed"):
+            return jobs.status(job_id)
+        threading.Event().wait(0.01)
+    raise AssertionError("Job wurde nicht fertig")
+
+
+def test_gleiche_bestellung_teilt_die_rechnung(tmp_path, bestellung, blockierte_pipeline):
+    freigabe, aufrufe = blockierte_pipeline
+    jobs = JobManager(ResultStore(str(tmp_path)))
+    erneut = copy.deepcopy(bestellung)
+    erneut["order"]["order_id"] = "ORD-ERNEUT"
+    erneut["order"]["created_at"] = erneut["order"]["updated_at"] = "2030-01-01T00:00:00.000Z"
+
+    erster = jobs.submit(bestellung)
+    assert jobs.submit(copy.deepcopy(bestellung)) == erster
+    folge = jobs.submit(erneut)
+    assert folge != erster and jobs.status(folge)["state"] in ("queued", "running")
+    assert jobs.stream(folge) is jobs.stream(erster)
+    freigabe.set()
+
+    status, folge_status = _warte_auf_ende(jobs, erster), _warte_auf_ende(jobs, folge)
+    assert status["state"] == folge_status["state"] == "done" and status["requests"] == 3
+    assert len(aufrufe) == 1
+    # Der Folge-Job bekommt den Plan mit seinen eigenen Kennungen
+    assert folge_status["plan_id"] not in (None, status["plan_id"])
+    plan = jobs._results.lade_plan(folge_status["plan_id"])
+    assert plan["order"]["order_id"] == "ORD-ERNEUT" and plan["order"]["created_at"] == "2030-01-01T00:00:00.000Z"
+    assert "bestellung" not in folge_status and "folger" not in status
+
+
+def test_geaenderte_bestellung_startet_eigenen_job(tmp_path, bestellung, blockierte_pipeline):
+    freigabe, aufrufe = blockierte_pipeline
+    jobs = JobManager(ResultStore(str(tmp_path)))
+    geaendert = copy.deepcopy(bestellung)
+    geaendert["order"]["objects"][0]["quantity"] += 1
+
+    erster = jobs.submit(bestellung)
+    zweiter = jobs.submit(geaendert)
+    freigabe.set()
+
+    assert zweiter != erster
+    _warte_auf_ende(jobs, erster); _warte_auf_ende(jobs, zweiter)
+    assert len(aufrufe) == 2
+
+
+def test_fertiger_plan_kommt_aus_dem_store(tmp_path, bestellung, blockierte_pipeline):
+    freigabe, aufrufe = blockierte_pipeline
+    freigabe.set()
+    jobs = JobManager(ResultStore(str(tmp_path)))
+
+    erster = jobs.submit(bestellung)
+    plan_id = _warte_auf_ende(jobs, erster)["plan_id"]
+    assert jobs.status(jobs.submit(bestellung))["plan_id"] == plan_id
+    erneut = copy.deepcopy(bestellung)
+    erneut["order"]["order_id"] = "ORD-ERNEUT"
+    zweiter = jobs.submit(erneut)
+
+    assert zweiter != erster
+    status = jobs.status(zweiter)
+    assert status["state"] == "done" and status["plan_id"] not in (None, plan_id)
+    assert jobs._results.lade_plan(status["plan_id"])["order"]["order_id"] == "ORD-ERNEUT"
+    assert len(aufrufe) == 1
+
+
+def test_fortschritt_folgt_den_pipeline_phasen(tmp_path, bestellung, monkeypatch):
+    start = threading.Event()
+    jobs = JobManager(ResultStore(str(tmp_path)))
+    verlauf = []
+
+    def run_pipeline(order_data, progress=None, **kwargs):
+        start.wait(10)
+        for info in ({"phase": "parsing"}, {"phase": "stacking", "pieces": 20},
+                     {"phase": "packing", "stacks": 4, "stack_contents": None},
+                     {"phase": "packing", "round": 1, "placed": 1, "total": 4, "best_cost": 9.0, "eta": 3.0, "layout": []},
+                     {"phase": "packing", "round": 2, "placed": 3, "total": 4, "best_cost": 7.0, "eta": 1.0, "layout": []},
+                     {"phase": "export"}, {"phase": "done", "elapsed": 1.0}):
+            progress(info)
+            verlauf.append(jobs.status(job_id))
+        return {"order": {"loading_plan": {"containers": []}}}
+
+    monkeypatch.setattr(job_manager, "run_pipeline", run_pipeline)
+    job_id = jobs.submit(bestellung)
+    assert jobs.status(job_id)["state"] in ("queued", "running")
+    start.set()
+    status = _warte_auf_ende(jobs, job_id)
+
+    assert [s["phase"] for s in verlauf] == ["parsing", "stacking", "packing", "packing", "packing", "export", "done"]
+    assert all(s["state"] == "running" for s in verlauf)
+    fortschritt = [s["progress"] for s in verlauf]
+    assert fortschritt == sorted(fortschritt) and fortschritt[4] == pytest.approx(0.1 + 0.85 * 3 / 4)
+    assert (verlauf[4]["round"], verlauf[4]["placed"], verlauf[4]["best_cost"], verlauf[4]["eta_seconds"]) == (2, 3, 7.0, 1.0)
+    assert status["state"] == "done" and status["progress"] == 1.0 and status["plan_id"] is not None
+
+
+def test_fehler_beendet_den_job(tmp_path, bestellung, monkeypatch):
+    def run_pipeline(order_data, progress=None, **kwargs):
+        progress({"phase": "parsing"})
+        raise ValueError("Keine nutzbaren Container in der Bestellung.")
+
+    monkeypatch.setattr(job_manager, "run_pipeline", run_pipeline)
+    jobs = JobManager(ResultStore(str(tmp_path)))
+    job_id = jobs.submit(bestellung)
+    status = _warte_auf_ende(jobs, job_id)
+
+    assert status["state"] == "failed" and status["error"] == "Keine nutzbaren Container in der Bestellung."
+    assert status["plan_id"] is None
+    # Nach einem Fehler startet dieselbe Bestellung einen neuen Versuch
+    assert jobs.submit(bestellung) != job_id
+
+
+def test_optimize_api_antwortet_sofort_mit_job(tmp_path, bestellung, blockierte_pipeline, monkeypatch):
+    freigabe, _ = blockierte_pipeline
+    store = ResultStore(str(tmp_path))
+    jobs = JobManager(store)
+    monkeypatch.setattr(app_modul, "results", store)
+    monkeypatch.setattr(app_modul, "jobs", jobs)
+    client = app_modul.app.test_client()
+
+    antwort = client.post("/api/optimize", json=bestellung)
+    assert antwort.status_code == 202
+    job = antwort.get_json()
+    assert client.get(job["status_url"]).get_json()["state"] in ("queued", "running")
+    assert client.get(job["result_url"]).status_code == 409
+
+    freigabe.set()
+    _warte_auf_ende(jobs, job["job_id"])
+    ergebnis = client.get(job["result_url"])
+    assert ergebnis.status_code == 200 and ergebnis.get_json()["order"]["order_id"] == bestellung["order"]["order_id"]
+    assert client.get("/api/optimize/unbekannt").status_code == 404
+    assert client.post("/api/optimize", json={"kein": "order"}).status_code == 400
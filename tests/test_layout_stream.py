@@ -0,0 +1,64 @@
+import json
+import time
+
+import app as app_modul
+from backend_connector.job_manager import JobManager
+from backend_connector.layout_stream import LayoutStream
+from backend_connector.result_store import ResultStore
+
+
+def ereignis(text):
+    """(event, data) einer SSE-Nachricht."""
+    kopf, daten = text.strip().split("\n")
+    return kopf.removeprefix("event: "), json.loads(daten.removeprefix("data: "))
+
+
+def test_deltas_und_zusammengefasste_zwischenstaende():
+    stream = LayoutStream()
+    stream.setze_phase("packing")
+    stream.setze_stapel([[[1, 1, 0.0, 500.0]], [[2, 1, 0.0, 300.0]]])
+    stream.setze_layout(0, [[0, 10.2, 20.0, 5.0, 5.0], [1, 30.0, 20.0, 5.0, 5.0]])
+    events = stream.events(min_intervall=0, keepalive=0.05)
+
+    assert ereignis(next(events)) == ("phase", {"phase": "packing"})
+    assert ereignis(next(events))[0] == "stacks"
+    assert ereignis(next(events)) == ("layout", {"version": 3, "placed": [[0, 0, 10, 20, 5, 5], [1, 0, 30, 20, 5, 5]], "removed": []})
+
+    # Ein langsamer Client bekommt nur den letzten Stand als Delta: Stapel 1 ist zwischendurch verschoben und dann entfernt
+    stream.setze_layout(0, [[0, 10.2, 20.0, 5.0, 5.0], [1, 40.0, 20.0, 5.0, 5.0]])
+    stream.setze_layout(1, [[2, 5.0, 5.0, 5.0, 5.0]])
+    stream.setze_layout(0, [[0, 10.4, 20.0, 5.0, 5.0]]) # Rundung: keine sichtbare Änderung
+    assert ereignis(next(events)) == ("layout", {"version": 6, "placed": [[2, 1, 5, 5, 5, 5]], "removed": [1]})
+
+    assert next(events) == ": keepalive\n\n"
+    stream.schliessen({"state": "done", "error": None})
+    assert ereignis(next(events)) == ("done", {"state": "done", "error": None})
+    assert next(events, None) is None
+
+
+def test_drosselung_auf_min_intervall():
+    stream = LayoutStream()
+    events = stream.events(min_intervall=0.2, keepalive=5)
+    stream.setze_layout(0, [[0, 1.0, 1.0, 1.0, 1.0]])
+    next(events)
+    gesendet = time.monotonic()
+
+    # Updates während der Pause landen gesammelt im nächsten Event
+    for x in (2.0, 3.0, 4.0):
+        stream.setze_layout(0, [[0, x, 1.0, 1.0, 1.0]])
+    assert ereignis(next(events))[1]["placed"] == [[0, 0, 4, 1, 1, 1]]
+    assert time.monotonic() - gesendet >= 0.2
+
+
+def test_sse_route_fuer_fertigen_job(tmp_path, bestellung, monkeypatch):
+    store = ResultStore(str(tmp_path))
+    store.speichere(bestellung, {"order": {}})
+    jobs = JobManager(store)
+    monkeypatch.setattr(app_modul, "jobs", jobs)
+    client = app_modul.app.test_client()
+
+    job_id = jobs.submit(bestellung) # Plan liegt schon im Store: Job und Stream sind sofort fertig
+    antwort = client.get(f"/api/optimize/{job_id}/stream")
+    assert antwort.mimetype == "text/event-stream" and antwort.headers["Cache-Control"] == "no-cache"
+    assert [ereignis(t) for t in antwort.get_data(as_text=True).split("\n\n") if t] == [("done", {"state": "done", "error": None})]
+    assert client.get("/api/optimize/unbekannt/stream").status_code == 404
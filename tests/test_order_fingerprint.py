@@ -0,0 +1,39 @@
+import copy
+
+from backend_connector.order_fingerprint import order_fingerprint
+
+
+def test_zeitstempel_und_reihenfolge_aendern_nichts(bestellung):
+    original = bestellung
+    variante = copy.deepcopy(original)
+    order = variante["order"]
+    order["created_at"] = order["updated_at"] = "2030-01-01T00:00:00.000Z"
+    order["order_id"] = "ANDERE-ID"
+    order["objects"].reverse()
+    order["container_definitions"].reverse()
+    for o in order["objects"]:
+        o.pop("placement", None)
+    order["loading_plan"] = {}
+    assert order_fingerprint(variante) == order_fingerprint(original)
+
+
+def test_planrelevante_felder_aendern_den_fingerabdruck(bestellung):
+    original = bestellung
+    menge = copy.deepcopy(original)
+    menge["order"]["objects"][0]["quantity"] += 1
+    container = copy.deepcopy(original)
+    container["order"]["container_definitions"][0]["use"] = not container["order"]["container_definitions"][0]["use"]
+    # Die id landet in placed_objects[].id, vertauschte IDs ergeben also einen anderen Plan
+    ids = copy.deepcopy(original)
+    erste, zweite = ids["order"]["objects"][:2]
+    erste["id"], zweite["id"] = zweite["id"], erste["id"]
+    for variante in (menge, container, ids):
+        assert order_fingerprint(variante) != order_fingerprint(original)
+
+
+def test_fehlendes_use_zaehlt_wie_json_parser(bestellung):
+    ohne_use = copy.deepcopy(bestellung)
+    for definition in ohne_use["order"]["container_definitions"]:
+        if definition["use"]:
+            del definition["use"]
+    assert order_fingerprint(ohne_use) == order_fingerprint(bestellung)
@@ -0,0 +1,91 @@
+import copy
+
+import pytest
+
+import app as app_modul
+from backend_connector.order_fingerprint import order_fingerprint, plan_schluessel
+from backend_connector.result_store import ResultStore
+
+PLAN = {"order": {"order_id": "ORD-1", "loading_plan": {"containers": [{"sequence": 1, "placed_objects": []}]}}}
+
+
+def test_speichern_und_laden(tmp_path, bestellung):
+    store = ResultStore(str(tmp_path))
+    plan_id = store.speichere(bestellung, PLAN)
+
+    assert plan_id == plan_schluessel(bestellung) != order_fingerprint(bestellung)
+    assert (tmp_path / f"{plan_id}.json").read_bytes() == b'{"order":{"order_id":"ORD-1","loading_plan":{"containers":[{"sequence":1,"placed_objects":[]}]}}}'
+    assert store.lade_plan(plan_id) == PLAN
+
+
+def test_inhaltsgleiche_bestellung_bekommt_eigenen_plan(tmp_path, bestellung):
+    store = ResultStore(str(tmp_path))
+    plan = copy.deepcopy(bestellung)
+    plan["order"].update(loading_plan={"containers": [{"sequence": 1, "placed_objects": [{"id": 1}]}]}, unplaced_objects=[])
+    plan_id = store.speichere(bestellung, plan)
+    assert store.plan_fuer(bestellung) == plan_id
+
+    andere = copy.deepcopy(bestellung)
+    andere["order"].update(order_id="ORD-ANDERE", updated_at="2030-01-01T00:00:00.000Z")
+    andere["order"]["objects"].reverse()
+    andere_id = store.plan_fuer(andere)
+
+    assert andere_id not in (None, plan_id)
+    uebertragen = store.lade_plan(andere_id)
+    assert uebertragen["order"]["order_id"] == "ORD-ANDERE" and uebertragen["order"]["objects"] == andere["order"]["objects"]
+    assert uebertragen["order"]["loading_plan"] == plan["order"]["loading_plan"]
+    assert store.lade_plan(plan_id) == plan
+
+    geaendert = copy.deepcopy(bestellung)
+    geaendert["order"]["objects"][0]["quantity"] += 1
+    assert store.plan_fuer(geaendert) is None
+
+
+def test_lru_verdraengt_und_laedt_von_platte(tmp_path, bestellung):
+    store = ResultStore(str(tmp_path), max_eintraege=1)
+    andere = copy.deepcopy(bestellung)
+    andere["order"]["objects"][0]["quantity"] += 1
+    erste_id = store.speichere(bestellung, PLAN)
+    store.speichere(andere, PLAN)
+
+    assert erste_id not in store._eintraege
+    assert store.lade_plan(erste_id) == PLAN
+    assert list(store._eintraege) == [erste_id]
+
+
+def test_ungueltige_ids(tmp_path):
+    store = ResultStore(str(tmp_path))
+    assert store.lade("../app.py") is None
+    assert store.lade("0" * 64) is None
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    store = ResultStore(str(tmp_path))
+    monkeypatch.setattr(app_modul, "results", store)
+    return app_modul.app.test_client(), store
+
+
+def test_etag_und_304(client, bestellung):
+    client, store = client
+    plan_id = store.speichere(bestellung, PLAN)
+
+    antwort = client.get(f"/api/plans/{plan_id}")
+    assert antwort.status_code == 200 and antwort.get_json() == PLAN
+    etag = antwort.headers["ETag"]
+
+    erneut = client.get(f"/api/plans/{plan_id}", headers={"If-None-Match": etag})
+    assert erneut.status_code == 304 and erneut.data == b""
+    assert client.get("/api/plans/" + "0" * 64).status_code == 404
+
+
+def test_3d_view_mit_order_id_und_plan_id(client, bestellung):
+    client, store = client
+    plan_id = store.speichere(bestellung, PLAN)
+
+    alt = client.get("/api/3d-view?order_id=ORD-1&container_id=C1")
+    assert alt.status_code == 302 and alt.headers["Location"] == f"{app_modul.VIEWER_URL}/ORD-1"
+    neu = client.get(f"/api/3d-view?plan_id={plan_id}")
+    assert neu.status_code == 302 and neu.headers["Location"] == f"{app_modul.VIEWER_URL}/ORD-1?plan=/api/plans/{plan_id}"
+    assert client.get("/api/3d-view").status_code == 400
+    assert client.get("/api/3d-view?plan_id=" + "0" * 64).status_code == 404